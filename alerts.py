@@ -0,0 +1,402 @@
+"""
+알림 규칙 엔진
+Declarative alert rules, evaluated once per data refresh
+
+alert_rules.json 의 규칙("TNX > 0 and SPX < 0" 같은 조건식)을 기동 시 한 번 numpy 식으로 컴파일하고,
+백그라운드 갱신기가 새 스냅샷을 게시할 때마다 서버에서 한 번만 평가합니다.
+같은 봉에서 같은 규칙이 다시 맞아도 (규칙, 봉 시각) 기준으로 한 번만 기록·전송하며,
+각 세션은 미리 계산된 결과(AlertEngine.current)를 읽기만 합니다.
+
+환경 변수:
+    DQ_ALERT_RULES     규칙 파일 경로 (기본: ./alert_rules.json)
+    DQ_ALERT_FILE      지정 시 새 알림을 JSON Lines 로 추가
+    DQ_ALERT_WEBHOOK   지정 시 새 알림을 JSON 으로 POST
+
+실행 방법:
+    python alerts.py validate                # 규칙 컴파일 확인
+    python alerts.py stub --port 8765        # 웹훅 수신 확인용 로컬 서버 (받은 알림을 출력)
+"""
+
+import argparse
+import ast
+import json
+import os
+import sqlite3
+import sys
+import threading
+import urllib.request
+from contextlib import closing
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from metrics import METRICS
+from price_store import DATA_DIR
+
+RULES_FILE    = Path(os.environ.get("DQ_ALERT_RULES", Path(__file__).resolve().parent / "alert_rules.json"))
+ALERT_DB      = DATA_DIR / "alerts.sqlite"
+ALERT_FILE    = os.environ.get("DQ_ALERT_FILE")
+ALERT_WEBHOOK = os.environ.get("DQ_ALERT_WEBHOOK")
+LEVELS        = ("danger", "warning", "success", "info")
+
+
+# ── 조건식 컴파일 ─────────────────────────────────────────────────────────────
+class _Vectorize(ast.NodeTransformer):
+    """
+    조건식 → 배열 연산 식. and / or / not 은 & / | / ~ 로, 연쇄 비교(a < X < b)는 비교의 & 로 바꿉니다.
+    허용: 이름, 숫자, 비교, 사칙연산, 부호, abs() — 그 밖의 구문은 ValueError
+    """
+
+    def __init__(self):
+        self.names = set()
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_BoolOp(self, node):
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        values = [self.visit(v) for v in node.values]
+        out = values[0]
+        for v in values[1:]:
+            out = ast.BinOp(out, op, v)
+        return out
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(ast.Invert(), operand)
+        if isinstance(node.op, (ast.USub, ast.UAdd)):
+            return ast.UnaryOp(node.op, operand)
+        raise ValueError(f"허용되지 않는 연산: {type(node.op).__name__}")
+
+    def visit_Compare(self, node):
+        left = self.visit(node.left)
+        parts = []
+        for op, right in zip(node.ops, node.comparators):
+            if not isinstance(op, (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)):
+                raise ValueError(f"허용되지 않는 비교: {type(op).__name__}")
+            right = self.visit(right)
+            parts.append(ast.Compare(left, [op], [right]))
+            left = right
+        out = parts[0]
+        for p in parts[1:]:
+            out = ast.BinOp(out, ast.BitAnd(), p)
+        return out
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div)):
+            raise ValueError(f"허용되지 않는 연산: {type(node.op).__name__}")
+        return ast.BinOp(self.visit(node.left), node.op, self.visit(node.right))
+
+    def visit_Call(self, node):
+        if not (isinstance(node.func, ast.Name) and node.func.id == "abs" and len(node.args) == 1 and not node.keywords):
+            raise ValueError("함수는 abs(x) 만 사용할 수 있습니다")
+        return ast.Call(ast.Name("abs", ast.Load()), [self.visit(node.args[0])], [])
+
+    def visit_Name(self, node):
+        self.names.add(node.id)
+        return node
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"허용되지 않는 상수: {node.value!r}")
+        return node
+
+    def generic_visit(self, node):
+        raise ValueError(f"허용되지 않는 구문: {type(node).__name__}")
+
+
+def compile_condition(expr: str, label: str = "<rule>"):
+    """조건식 → (코드 객체, 참조 이름 집합)"""
+    tree = ast.parse(expr, mode="eval")
+    v = _Vectorize()
+    tree = ast.fix_missing_locations(v.visit(tree))
+    return compile(tree, label, "eval"), frozenset(v.names)
+
+
+# ── 규칙 ──────────────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    group: str
+    level: str
+    message: str
+    when: str                      # 조건식, "else" 는 그룹 안에서 앞 규칙이 모두 안 맞을 때
+    notify: bool = True
+    names: frozenset = frozenset()
+    code: object = field(default=None, repr=False, compare=False)
+
+
+@dataclass(frozen=True)
+class Alert:
+    rule: str
+    level: str
+    message: str
+    as_of: str                     # 평가한 봉 시각 (ISO)
+    fired_at: str
+    values: dict                   # 조건식이 참조한 값
+    notify: bool = True
+
+
+class RuleSet:
+    def __init__(self, groups: list, fallback: Optional[Rule] = None):
+        """groups: [(그룹 id, requires, [Rule, ...])]"""
+        self.groups = groups
+        self.fallback = fallback
+        self.rules = [r for _, _, rules in groups for r in rules]
+
+    @classmethod
+    def load(cls, path=None) -> "RuleSet":
+        raw = json.loads(Path(path or RULES_FILE).read_text(encoding="utf-8"))
+        groups, seen = [], set()
+        for g in raw["groups"]:
+            rules = []
+            for d in g["rules"]:
+                if d["id"] in seen:
+                    raise ValueError(f"규칙 id 중복: {d['id']}")
+                if d["level"] not in LEVELS:
+                    raise ValueError(f"{d['id']}: level 은 {', '.join(LEVELS)} 중 하나")
+                seen.add(d["id"])
+                code, names = (None, frozenset()) if d["when"] == "else" else \
+                    compile_condition(d["when"], f"<rule {d['id']}>")
+                rules.append(Rule(d["id"], g["id"], d["level"], d["message"], d["when"],
+                                  d.get("notify", True), names, code))
+            requires = frozenset(g.get("requires") or set().union(*(r.names for r in rules)))
+            groups.append((g["id"], requires, rules))
+        fb = raw.get("fallback")
+        fallback = Rule(fb["id"], "", fb["level"], fb["message"], "else", fb.get("notify", False)) if fb else None
+        return cls(groups, fallback)
+
+    def fires(self, values: dict) -> np.ndarray:
+        """
+        {이름: 값 배열 [n]} → 규칙별 발생 여부 bool 행렬 [n, 규칙] (fallback 제외, self.rules 순서).
+        값이 NaN 인 이름을 참조하는 규칙과, requires 중 하나라도 NaN 인 그룹은 발생하지 않습니다.
+        """
+        arrays = {k: np.atleast_1d(np.asarray(v, dtype=float)) for k, v in values.items()}
+        n = max((len(a) for a in arrays.values()), default=1)
+        nan = np.full(n, np.nan)
+
+        def finite(names):
+            ok = np.ones(n, dtype=bool)
+            for name in names:
+                ok &= np.isfinite(arrays.get(name, nan))
+            return ok
+
+        cols = []
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for _, requires, rules in self.groups:
+                ok, taken = finite(requires), np.zeros(n, dtype=bool)
+                for r in rules:
+                    if r.code is None:
+                        hit = ok & ~taken
+                    else:
+                        scope = {name: arrays.get(name, nan) for name in r.names}
+                        cond = np.broadcast_to(eval(r.code, {"__builtins__": {}, "abs": np.abs}, scope), (n,))
+                        hit = ok & ~taken & finite(r.names) & cond.astype(bool)
+                    cols.append(hit)
+                    taken |= hit
+        return np.column_stack(cols) if cols else np.zeros((n, 0), dtype=bool)
+
+    def evaluate(self, values: dict, as_of=None) -> list:
+        """값 한 줄(스칼라 dict) → 발생한 [Alert] (아무것도 없으면 fallback 하나)"""
+        hit = self.fires(values)[0]
+        now = datetime.now().isoformat(timespec="seconds")
+        as_of = pd.Timestamp(as_of).isoformat() if as_of is not None else now
+        fired = [r for r, h in zip(self.rules, hit) if h] or ([self.fallback] if self.fallback else [])
+        out = []
+        for r in fired:
+            vals = {k: values.get(k) for k in sorted(r.names)}
+            fmt = {k: (v if v is not None else float("nan")) for k, v in values.items()}
+            out.append(Alert(r.id, r.level, r.message.format(**fmt), as_of, now, vals, r.notify))
+        return out
+
+    def messages(self, values: dict) -> list:
+        """[(알림 종류, 메시지)] — 화면 표시용"""
+        return [(a.level, a.message) for a in self.evaluate(values)]
+
+
+# ── 기록 · 전송 ───────────────────────────────────────────────────────────────
+class AlertStore:
+    """발생 알림 기록 (SQLite) — (규칙, 봉 시각)이 기본 키라 재시작 후에도 중복 기록되지 않음"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else ALERT_DB
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    rule     TEXT NOT NULL,
+                    as_of    TEXT NOT NULL,
+                    fired_at TEXT NOT NULL,
+                    level    TEXT NOT NULL,
+                    message  TEXT NOT NULL,
+                    vals     TEXT,              -- 조건식이 참조한 값 (JSON)
+                    PRIMARY KEY (rule, as_of)
+                )""")
+
+    def record(self, alerts) -> list:
+        """처음 보는 알림만 추가하고 그 목록을 반환"""
+        new = []
+        with self._lock, closing(sqlite3.connect(self.path, timeout=5.0)) as conn, conn:
+            for a in alerts:
+                cur = conn.execute("INSERT OR IGNORE INTO alerts VALUES (?, ?, ?, ?, ?, ?)",
+                                   (a.rule, a.as_of, a.fired_at, a.level, a.message, json.dumps(a.values)))
+                if cur.rowcount:
+                    new.append(a)
+        return new
+
+    def recent(self, limit: int = 50) -> pd.DataFrame:
+        with closing(sqlite3.connect(self.path, timeout=5.0)) as conn:
+            return pd.read_sql_query("SELECT fired_at, as_of, rule, level, message FROM alerts "
+                                     "ORDER BY fired_at DESC, rowid DESC LIMIT ?", conn, params=(limit,))
+
+
+class JsonlSink:
+    name = "file"
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def send(self, alerts):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for a in alerts:
+                f.write(json.dumps(asdict(a), ensure_ascii=False) + "\n")
+
+
+class WebhookSink:
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 3.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alerts):
+        body = json.dumps({"alerts": [asdict(a) for a in alerts]}, ensure_ascii=False).encode()
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            resp.read()
+
+
+def default_sinks() -> list:
+    sinks = []
+    if ALERT_FILE:
+        sinks.append(JsonlSink(ALERT_FILE))
+    if ALERT_WEBHOOK:
+        sinks.append(WebhookSink(ALERT_WEBHOOK))
+    return sinks
+
+
+# ── 엔진 ──────────────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class AlertResult:
+    as_of: Optional[pd.Timestamp]
+    fingerprint: str
+    alerts: tuple
+    evaluated_at: datetime
+
+
+class AlertEngine:
+    def __init__(self, rules: RuleSet = None, store: AlertStore = None, sinks=None):
+        self.rules  = rules or RuleSet.load()
+        self.store  = store
+        self.sinks  = default_sinks() if sinks is None else list(sinks)
+        self._lock  = threading.Lock()
+        self.current: Optional[AlertResult] = None
+        self.last_error: Optional[str] = None
+
+    def on_snapshot(self, snapshot):
+        """
+        MarketRefresher 구독 콜백 — 데이터 내용이 바뀐 스냅샷마다 한 번 평가·기록·전송.
+        싱크 전송(웹훅 등 느릴 수 있음)은 잠금을 놓은 뒤에 하므로 current 조회를 막지 않습니다.
+        """
+        with self._lock:
+            if self.current is not None and self.current.fingerprint == snapshot.fingerprint:
+                return self.current
+            result = self._evaluate(snapshot)
+            new = [a for a in result.alerts if a.notify]
+            if self.store is not None and new:
+                new = self.store.record(new)   # 같은 (규칙, 봉)은 한 번만
+            for a in new:
+                METRICS.inc("dq_alerts_fired_total", rule=a.rule)
+            self.current = result
+        self._deliver(new)
+        return result
+
+    def result_for(self, snapshot) -> AlertResult:
+        """
+        화면용 — 이 스냅샷의 평가 결과. 보통은 갱신 스레드가 만든 current 를 그대로 돌려주고,
+        아직 반영 전이면 기록·전송 없이 평가만 합니다 (잠금을 잡지 않음).
+        """
+        current = self.current
+        if current is not None and current.fingerprint == snapshot.fingerprint:
+            return current
+        return self._evaluate(snapshot)
+
+    def _evaluate(self, snapshot) -> AlertResult:
+        frame = snapshot.frame
+        as_of = frame.as_of
+        with METRICS.timer("dq_compute_seconds", stage="alerts"):
+            alerts = self.rules.evaluate(frame.deltas(), as_of=as_of) if as_of is not None else []
+        return AlertResult(as_of, snapshot.fingerprint, tuple(alerts), datetime.now())
+
+    def _deliver(self, new):
+        for sink in self.sinks if new else ():
+            try:
+                sink.send(new)
+            except Exception as e:
+                METRICS.inc("dq_alert_sink_errors_total", sink=sink.name)
+                self.last_error = f"{sink.name}: {e!r}"
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+def _stub(port: int):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            for a in json.loads(body or b"{}").get("alerts", []):
+                print(f"[{a['level']}] {a['as_of']} {a['rule']}: {a['message']}", flush=True)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"웹훅 수신 대기: http://127.0.0.1:{port}/  (DQ_ALERT_WEBHOOK 에 이 주소 지정)", flush=True)
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="알림 규칙 도구")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    val = sub.add_parser("validate", help="규칙 파일 컴파일 확인")
+    val.add_argument("--rules", default=None)
+    stub = sub.add_parser("stub", help="웹훅 수신 확인용 로컬 서버")
+    stub.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "stub":
+        _stub(args.port)
+        return 0
+    try:
+        rules = RuleSet.load(args.rules)
+    except (OSError, ValueError, SyntaxError, KeyError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    for gid, requires, group in rules.groups:
+        print(f"{gid} (requires {', '.join(sorted(requires))})")
+        for r in group:
+            print(f"  {r.id:<18} {r.level:<8} {r.when}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
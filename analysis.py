@@ -0,0 +1,506 @@
+"""
+달러 품질 판정 계산 모듈
+Pure compute core for the dollar quality dashboard
+
+대시보드(탭1 알림, 탭2 CIP, 탭3 점수·판정)와 CLI 가 같은 규칙을 쓰도록 계산만 모아 둔 모듈입니다.
+streamlit / plotly 를 import 하지 않습니다.
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# ── 탭2 CIP 계산기 기본 입력값 ─────────────────────────────────────────────────
+DEFAULT_SPOT     = 1440.0
+DEFAULT_US_3M    = 3.69     # IRX 수집 실패 시
+DEFAULT_KR_3M    = 2.70
+DEFAULT_DAYS     = 90
+DEFAULT_SWAP_BID = -720.0
+DEFAULT_SWAP_ASK = -220.0
+
+SCORE_KEYS = ("TNX", "SPX", "EEM", "EMB", "DXY")
+
+
+# ── 시계열 헬퍼 ────────────────────────────────────────────────────────────────
+def normalize(series: pd.Series) -> pd.Series:
+    s = series.dropna()
+    if s.empty: return s
+    return (s - s.min()) / (s.max() - s.min()) * 100
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링 — 차트 모양(고점·저점)을 유지하는 n_out 개 점의 위치.
+    첫 점과 마지막 점은 항상 포함하며, 점 수가 이미 n_out 이하이면 전체를 반환합니다.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)   # 처음·끝을 뺀 n_out-2 개 구간 경계
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        # 직전 선택점 a, 다음 구간 평균점, 현재 구간 후보점이 이루는 삼각형 넓이가 최대인 점 선택
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample(series: pd.Series, max_points: int) -> pd.Series:
+    """시계열을 max_points 개 이하로 LTTB 다운샘플링 (이미 작으면 그대로)"""
+    if len(series) <= max_points:
+        return series
+    idx = lttb_indices(series.index.asi8, series.to_numpy(dtype=float), max_points)
+    return series.iloc[idx]
+
+
+def data_fingerprint(data: dict) -> str:
+    """{name: Series} 내용(날짜·값)의 해시 — 같은 데이터면 같은 값 (차트 캐시 키)"""
+    h = hashlib.blake2b(digest_size=12)
+    for name in sorted(data):
+        h.update(name.encode())
+        h.update(pd.util.hash_pandas_object(data[name], index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# ── 정렬된 가격·수익률 행렬 ────────────────────────────────────────────────────
+CALENDAR_KEY = "SPX"   # 공통 거래일 기준 종목
+
+
+@dataclass(frozen=True)
+class MarketFrame:
+    """
+    데이터 갱신마다 한 번 만드는 공통 거래일 기준 가격·수익률 행렬 (기본 float64, 읽기 전용).
+    수익률 행렬(타임라인·상관계수)은 모든 종목의 '전일'이 같은 날짜를 가리키고, 최근값·전일값·변화율은
+    종목별 자체 마지막 두 봉으로 미리 계산해 O(1) 로 조회합니다 (기준 종목 휴장·장 마감 후에 들어온
+    DXY·KRW 등의 새 봉도 카드·알림·판정에 바로 반영).
+    """
+    index:       pd.DatetimeIndex
+    columns:     tuple
+    prices:      np.ndarray   # [일, 종목] as-of 정렬 종가
+    returns_pct: np.ndarray   # [일, 종목] 일간 변화율(%), 첫 행 NaN
+    last:        np.ndarray   # [종목] 종목별 마지막 봉
+    prev:        np.ndarray   # [종목] 종목별 그 직전 봉
+    delta:       np.ndarray   # [종목] (last - prev) / prev × 100, 계산 불가 시 NaN
+    pos:         Mapping = field(repr=False)
+    as_of:       Optional[pd.Timestamp] = None   # 전 종목 중 가장 최근 봉 날짜 (데이터 없으면 None)
+
+    def _get(self, arr, key):
+        i = self.pos.get(key)
+        if i is None or np.isnan(arr[i]):
+            return None
+        return float(arr[i])
+
+    def last_of(self, key):
+        return self._get(self.last, key)
+
+    def prev_of(self, key):
+        return self._get(self.prev, key)
+
+    def delta_of(self, key):
+        return self._get(self.delta, key)
+
+    def deltas(self, keys=None) -> dict:
+        return {k: self.delta_of(k) for k in (keys or self.columns)}
+
+    def returns(self, keys=None, start=None) -> pd.DataFrame:
+        """일간 변화율(%) DataFrame — 요청한 열 순서, start 이후 구간 (없는 종목은 NaN 열)"""
+        i0 = self.index.searchsorted(start) if start is not None else 0
+        keys = list(keys or self.columns)
+        cols = np.array([self.pos.get(k, -1) for k in keys], dtype=np.intp)
+        # 열 선택을 fancy indexing 한 번으로 — 종목이 수백 개여도 파이썬 루프 없음
+        out = self.returns_pct[i0:].take(np.maximum(cols, 0), axis=1) if self.returns_pct.shape[1] \
+            else np.full((len(self.index) - i0, len(keys)), np.nan)
+        out[:, cols < 0] = np.nan
+        return pd.DataFrame(out, index=self.index[i0:], columns=keys)
+
+
+def build_market_frame(data: dict, calendar_key: str = CALENDAR_KEY, dtype=np.float64) -> MarketFrame:
+    """
+    {name: 종가 Series} → MarketFrame.
+    기준 종목(SPX)의 거래일을 공통 인덱스로 삼고 나머지는 각 날짜 시점의 직전 관측치(as-of)로 맞춥니다.
+    기준 종목이 없으면 전 종목 날짜의 합집합을 사용합니다. dtype=np.float32 면 행렬 메모리가 절반.
+    last / prev / delta 는 공통 인덱스와 무관하게 각 종목의 마지막 두 봉 기준입니다.
+    """
+    series = {k: s.dropna().sort_index() for k, s in data.items()}
+    series = {k: s[~s.index.duplicated(keep="last")] for k, s in series.items() if not s.empty}
+    cols = tuple(series)
+    if calendar_key in series:
+        index = series[calendar_key].index
+    else:
+        index = pd.DatetimeIndex(sorted(set().union(*(s.index for s in series.values())))) \
+            if series else pd.DatetimeIndex([])
+
+    prices = np.full((len(index), len(cols)), np.nan, dtype=dtype)
+    last = np.full(len(cols), np.nan, dtype=dtype)
+    prev = np.full(len(cols), np.nan, dtype=dtype)
+    for j, k in enumerate(cols):
+        # as-of 정렬 = 정렬된 날짜 배열 이진 탐색 (reindex(method="ffill") 와 같은 결과, 종목이 많을 때 더 빠름)
+        s = series[k]
+        values = s.to_numpy(dtype=dtype)
+        pos = s.index.searchsorted(index, side="right") - 1
+        prices[:, j] = np.where(pos >= 0, values[np.maximum(pos, 0)], np.nan)
+        last[j] = values[-1]
+        if len(values) >= 2:
+            prev[j] = values[-2]
+
+    returns_pct = np.full_like(prices, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns_pct[1:] = (prices[1:] / prices[:-1] - 1) * 100
+        # 기존 delta_pct 와 같이 최근값·전일값 중 하나라도 0 이면 계산하지 않음
+        delta = np.where((last != 0) & (prev != 0), (last - prev) / prev * 100, np.nan)
+
+    for arr in (prices, returns_pct, last, prev, delta):
+        arr.flags.writeable = False
+    as_of = max((s.index[-1] for s in series.values()), default=None)
+    return MarketFrame(index, cols, prices, returns_pct, last, prev, delta,
+                       MappingProxyType({k: j for j, k in enumerate(cols)}), as_of)
+
+
+# ── CIP (탭2) ─────────────────────────────────────────────────────────────────
+class CipResult(NamedTuple):
+    theoretical_rate: float
+    swap_mid: float
+    basis: float
+    friction: float
+    deviation_pct: float
+
+
+def compute_cip(spot, us_3m, kr_3m, days, swap_bid, swap_ask) -> CipResult:
+    """
+    이론 스왑 = Spot × (국내금리 − 해외금리) / (1 + 해외금리) × (Days/360)
+    베이시스 = 실제 Bid − 이론 스왑, 마찰계수 = 실제 Ask − 실제 Bid
+    """
+    t                = days / 360
+    domestic         = kr_3m / 100
+    foreign          = us_3m / 100
+    theoretical_rate = spot * (domestic - foreign) / (1 + foreign) * t
+    swap_mid         = (swap_bid + swap_ask) / 2
+    basis            = swap_bid - theoretical_rate
+    friction         = swap_ask - swap_bid
+    deviation_pct    = (basis / abs(theoretical_rate) * 100) if theoretical_rate != 0 else 0
+    return CipResult(theoretical_rate, swap_mid, basis, friction, deviation_pct)
+
+
+def compute_cip_array(spot, us_3m, kr_3m, days, swap_bid, swap_ask) -> CipResult:
+    """compute_cip 의 배열판 — 각 인자는 같은 길이의 배열(또는 스칼라), 결과 필드도 배열"""
+    spot, us_3m, kr_3m, days, swap_bid, swap_ask = (
+        np.asarray(a, dtype=float) for a in (spot, us_3m, kr_3m, days, swap_bid, swap_ask))
+    foreign          = us_3m / 100
+    theoretical_rate = spot * (kr_3m / 100 - foreign) / (1 + foreign) * (days / 360)
+    basis            = swap_bid - theoretical_rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviation_pct = np.where(theoretical_rate != 0, basis / np.abs(theoretical_rate) * 100, 0.0)
+    return CipResult(theoretical_rate, (swap_bid + swap_ask) / 2, basis, swap_ask - swap_bid, deviation_pct)
+
+
+TENOR_GRID      = np.arange(30, 366)              # 만기 (일), 1일 간격
+SPOT_SHOCKS_PCT = np.linspace(-10, 10, 21)        # 현물 환율 충격 (%)
+RATE_SHOCKS_BP  = np.linspace(-100, 100, 21)      # 금리차(한국−미국) 충격 (bp)
+
+
+class CipSurface(NamedTuple):
+    tenors: np.ndarray          # [만기]
+    spot_shocks: np.ndarray     # [현물 충격] (%)
+    rate_shocks: np.ndarray     # [금리차 충격] (bp)
+    theoretical: np.ndarray     # [금리차 충격, 현물 충격, 만기]
+    swap_bid: np.ndarray        # [만기] — 입력 만기의 호가를 만기 비례로 환산
+    friction: np.ndarray        # [만기]
+    basis: np.ndarray           # [금리차 충격, 현물 충격, 만기]
+    deviation_pct: np.ndarray   # [금리차 충격, 현물 충격, 만기]
+
+
+def cip_surface(spot, us_3m, kr_3m, days, swap_bid, swap_ask,
+                tenors=TENOR_GRID, spot_shocks_pct=SPOT_SHOCKS_PCT,
+                rate_shocks_bp=RATE_SHOCKS_BP) -> CipSurface:
+    """
+    compute_cip 을 만기 × 현물 충격 × 금리차 충격 격자 전체에 브로드캐스팅으로 한 번에 계산.
+    입력 호가는 days 만기 기준이므로 다른 만기에는 이론가와 같은 Days/360 비례로 환산합니다.
+    충격이 0 이고 만기가 days 인 칸은 compute_cip 결과와 같습니다.
+    """
+    tenors = np.asarray(tenors, dtype=float)
+    spot_shocks_pct = np.asarray(spot_shocks_pct, dtype=float)
+    rate_shocks_bp = np.asarray(rate_shocks_bp, dtype=float)
+
+    t        = tenors / 360
+    spots    = spot * (1 + spot_shocks_pct / 100)
+    foreign  = us_3m / 100
+    spread   = kr_3m / 100 - foreign + rate_shocks_bp / 10000
+    theoretical = (spread[:, None, None] * spots[None, :, None] / (1 + foreign)) * t[None, None, :]
+
+    scale    = tenors / days
+    bid      = swap_bid * scale
+    friction = (swap_ask - swap_bid) * scale
+    basis    = bid[None, None, :] - theoretical
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviation = np.where(theoretical != 0, basis / np.abs(theoretical) * 100, 0.0)
+    return CipSurface(tenors, spot_shocks_pct, rate_shocks_bp, theoretical, bid, friction, basis, deviation)
+
+
+def liquidity_level(basis, friction) -> str:
+    """유동성 골절 판정: tight(경색) / fracture(골절) / normal(정상) / watch(관찰)"""
+    if basis < -200 or friction > 300:
+        return "tight"
+    if basis < -50 or friction > 150:
+        return "fracture"
+    if basis > 0:
+        return "normal"
+    return "watch"
+
+
+# ── 자동 판독 알림 (탭1) ──────────────────────────────────────────────────────
+_RULES = None
+
+
+def build_alerts(deltas: dict) -> list:
+    """
+    deltas: {name: 일간 변화율(%) 또는 None} → [(알림 종류, 메시지), ...]
+    규칙은 alert_rules.json 에 있으며 처음 호출할 때 한 번만 컴파일합니다 (alerts.RuleSet).
+    """
+    global _RULES
+    if _RULES is None:
+        from alerts import RuleSet
+        _RULES = RuleSet.load()
+    return _RULES.messages(deltas)
+
+
+# ── 점수 · 종합 판정 (탭3) ────────────────────────────────────────────────────
+# 규칙은 배열 단위로 한 번만 정의하고, 오늘 하루(스칼라) 판정과 기간 전체 타임라인이 함께 사용
+VERDICTS = ("growth", "fear", "tight", "neutral")
+
+
+class Thresholds(NamedTuple):
+    """점수 규칙의 기준값 (백테스트 스윕 대상)"""
+    eem_crash:         float = -1.0    # EEM 변화율 < 이 값 → 공포 +2
+    eem_up:            float = 0.5     # EEM 변화율 > 이 값 → 성장 +1
+    emb_crash:         float = -1.0    # EMB 변화율 < 이 값 → 공포 +2
+    dxy_move:          float = 0.5     # DXY |변화율| > 이 값 → 상승 시 공포 +1, 하락 시 성장 +1
+    basis_tight:       float = -200.0  # 베이시스 < 이 값 → 경색 +3
+    basis_fracture:    float = -50.0   # 베이시스 < 이 값 → 경색 +2
+    friction_tight:    float = 300.0   # 마찰계수 > 이 값 → 경색 +2
+    friction_fracture: float = 150.0   # 마찰계수 > 이 값 → 경색 +1
+    fear_min:          int   = 2       # 공포 판정 최소 점수
+    tight_min:         int   = 3       # 경색 판정 최소 점수
+
+
+DEFAULT_THRESHOLDS = Thresholds()
+
+
+def score_arrays(tnx, spx, eem, emb, dxy, basis, friction, th: Thresholds = DEFAULT_THRESHOLDS):
+    """
+    일간 변화율(%) 배열 → (growth, fear, tight) 점수 배열.
+    모든 인자는 스칼라 또는 같은 길이로 브로드캐스트되는 배열, NaN 은 0(변화 없음)으로 간주.
+    """
+    tnx, spx, eem, emb, dxy = (np.nan_to_num(np.asarray(x, dtype=float)) for x in (tnx, spx, eem, emb, dxy))
+    basis, friction = np.asarray(basis, dtype=float), np.asarray(friction, dtype=float)
+
+    growth = (
+        np.where((tnx > 0) & (spx > 0), 2, 0)
+        + (eem > th.eem_up)
+        + (dxy < -th.dxy_move)
+    )
+    fear = (
+        np.select([(tnx > 0) & (spx > 0), (tnx > 0) & (spx < 0), (tnx < 0) & (spx < 0)], [0, 2, 1], 0)
+        + np.select([eem < th.eem_crash, eem < 0], [2, 1], 0)
+        + np.select([emb < th.emb_crash, emb < 0], [2, 1], 0)
+        + (dxy > th.dxy_move)
+    )
+    tight = (
+        np.select([basis < th.basis_tight, basis < th.basis_fracture, basis < 0], [3, 2, 1], 0)
+        + np.select([friction > th.friction_tight, friction > th.friction_fracture], [2, 1], 0)
+    )
+    return growth.astype(int), fear.astype(int), np.broadcast_to(tight, growth.shape).astype(int)
+
+
+def verdict_array(growth, fear, tight, th: Thresholds = DEFAULT_THRESHOLDS):
+    total = growth + fear + tight
+    return np.select(
+        [total == 0, tight >= th.tight_min, (fear > growth) & (fear >= th.fear_min), growth > fear],
+        ["neutral", "tight", "fear", "growth"],
+        "neutral",
+    )
+
+
+def compute_scores(deltas: dict, basis, friction):
+    """(growth_score, fear_score, tight_score) — 변화율이 없으면 0 으로 간주"""
+    g, f, t = score_arrays(*(deltas.get(k) or 0 for k in SCORE_KEYS), basis, friction)
+    return int(g), int(f), int(t)
+
+
+def decide_verdict(growth_score, fear_score, tight_score) -> str:
+    """growth / fear / tight / neutral"""
+    return str(verdict_array(np.asarray(growth_score), np.asarray(fear_score), np.asarray(tight_score)))
+
+
+def verdict_timeline(returns_pct: pd.DataFrame, basis=0.0, friction=0.0,
+                     th: Thresholds = DEFAULT_THRESHOLDS) -> pd.DataFrame:
+    """
+    기간 전체의 일별 점수·판정을 한 번의 배열 연산으로 계산.
+    basis / friction 은 스칼라(전 기간 동일 적용) 또는 returns_pct 와 같은 인덱스의 Series.
+    """
+    r = returns_pct[returns_pct[list(SCORE_KEYS)].notna().any(axis=1)]   # 판정 종목 변화율이 하나도 없는 행만 제외
+    if isinstance(basis, pd.Series):
+        basis = basis.reindex(r.index).ffill().fillna(0).to_numpy()
+    if isinstance(friction, pd.Series):
+        friction = friction.reindex(r.index).ffill().fillna(0).to_numpy()
+    g, f, t = score_arrays(*(r[k].to_numpy() for k in SCORE_KEYS), basis, friction, th)
+    return pd.DataFrame({"growth": g, "fear": f, "tight": t,
+                         "verdict": verdict_array(g, f, t, th)}, index=r.index)
+
+
+def regime_runs(verdicts: pd.Series) -> pd.DataFrame:
+    """연속된 같은 판정 구간 → [start, end, verdict, days] (run-length 인코딩)"""
+    if verdicts.empty:
+        return pd.DataFrame(columns=["start", "end", "verdict", "days"])
+    run_id = (verdicts != verdicts.shift()).cumsum().to_numpy()
+    dates = verdicts.index.to_series()
+    runs = pd.DataFrame({"date": dates.to_numpy(), "verdict": verdicts.to_numpy(), "run": run_id})
+    out = runs.groupby("run", sort=True).agg(
+        start=("date", "first"), end=("date", "last"), verdict=("verdict", "first"), days=("date", "size"),
+    )
+    return out.reset_index(drop=True)
+
+
+# ── 롤링 상관관계 (탭1 히트맵) ────────────────────────────────────────────────
+class RollingCorrelation:
+    """
+    최근 window 개 행의 상관계수 행렬을 누적합으로 유지하는 증분 계산기.
+
+    쌍별 유효 관측치(pandas .corr 와 같은 pairwise-complete 방식)의 개수·합·제곱합·곱의 합을
+    n×n 행렬로 들고 있으므로 새 행 추가·오래된 행 제거가 각각 O(n²) 입니다.
+    누적 오차는 rebase_every 행마다 버퍼에서 다시 합산해 제거합니다.
+    """
+
+    def __init__(self, window: int, n: int, rebase_every: int = 1000):
+        self.window, self.n, self.rebase_every = window, n, rebase_every
+        self._rows = []          # 창 안의 행 (원형 버퍼 대신 리스트 — window 가 작음)
+        self._since_rebase = 0
+        self._reset_sums()
+
+    def _reset_sums(self):
+        z = lambda: np.zeros((self.n, self.n))
+        self._cnt, self._sx, self._sxx, self._sxy = z(), z(), z(), z()
+
+    def _accumulate(self, x: np.ndarray, sign: float):
+        m  = (~np.isnan(x)).astype(float)
+        xv = np.nan_to_num(x)
+        self._cnt += sign * np.outer(m, m)
+        self._sx  += sign * np.outer(xv, m)        # [i, j] = j 도 유효한 날의 x_i 합
+        self._sxx += sign * np.outer(xv * xv, m)
+        self._sxy += sign * np.outer(xv, xv)
+
+    def copy(self) -> "RollingCorrelation":
+        other = RollingCorrelation.__new__(RollingCorrelation)
+        other.__dict__.update(self.__dict__)
+        other._rows = list(self._rows)
+        other._cnt, other._sx, other._sxx, other._sxy = (a.copy() for a in (self._cnt, self._sx, self._sxx, self._sxy))
+        return other
+
+    def push(self, x):
+        x = np.asarray(x, dtype=float)
+        self._rows.append(x)
+        self._accumulate(x, 1.0)
+        if len(self._rows) > self.window:
+            self._accumulate(self._rows.pop(0), -1.0)
+        self._since_rebase += 1
+        if self._since_rebase >= self.rebase_every:
+            self._reset_sums()
+            for row in self._rows:
+                self._accumulate(row, 1.0)
+            self._since_rebase = 0
+
+    def matrix(self) -> np.ndarray:
+        """현재 창의 상관계수 행렬 (관측치 2개 미만 또는 분산 0 인 쌍은 NaN)"""
+        n, sx, sxx, sxy = self._cnt, self._sx, self._sxx, self._sxy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov  = n * sxy - sx * sx.T
+            var  = (n * sxx - sx * sx) * (n * sxx.T - sx.T * sx.T)
+            corr = cov / np.sqrt(var)
+        corr[(n < 2) | ~(var > 0)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+
+class CorrelationHistory:
+    """
+    날짜별 롤링 상관계수 행렬 이력 [T, n, n].
+
+    update() 에 전체 수익률 행렬을 다시 넘겨도 이미 반영한 날짜 이후의 행만 계산합니다.
+    마지막 행은 장중 값이 바뀔 수 있어 확정하지 않고 계산기 복사본으로만 반영합니다.
+    """
+
+    def __init__(self, window: int, columns):
+        self.window, self.columns = window, list(columns)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._engine = RollingCorrelation(self.window, len(self.columns))
+        self._first  = None
+        self._dates  = []
+        self._mats   = np.empty((0, len(self.columns), len(self.columns)))
+        self._result = (pd.DatetimeIndex([]), self._mats)
+
+    def _append(self, date, mat):
+        if len(self._dates) == len(self._mats):
+            # 배열을 두 배씩 늘려 재할당 횟수를 로그 수준으로 유지
+            grown = np.empty((max(64, 2 * len(self._mats)),) + self._mats.shape[1:])
+            grown[:len(self._mats)] = self._mats
+            self._mats = grown
+        self._mats[len(self._dates)] = mat
+        self._dates.append(date)
+
+    def update(self, returns: pd.DataFrame):
+        """returns: columns 순서의 일간 수익률 (날짜 오름차순) → (dates, mats)"""
+        returns = returns.reindex(columns=self.columns)
+        with self._lock:
+            if returns.empty:
+                return self._result
+            if self._first is not None and returns.index[0] < self._first:
+                self._reset()   # 앞쪽 이력이 늘어나면(재적재 등) 처음부터 다시 계산
+            if self._first is None:
+                self._first = returns.index[0]
+
+            last_done = self._dates[-1] if self._dates else None
+            new = returns if last_done is None else returns[returns.index > last_done]
+            values = new.to_numpy(dtype=float)
+            for date, row in zip(new.index[:-1], values[:-1]):
+                self._engine.push(row)
+                self._append(date, self._engine.matrix())
+
+            dates, mats = list(self._dates), self._mats[:len(self._dates)]
+            if len(new):
+                tail = self._engine.copy()
+                tail.push(values[-1])
+                dates = dates + [new.index[-1]]
+                mats = np.concatenate([mats, tail.matrix()[None]])
+            self._result = (pd.DatetimeIndex(dates), mats)
+            return self._result
+
+
+def evaluate(frame: MarketFrame, cip: CipResult) -> dict:
+    """시세 행렬 + CIP 결과 → 변화율, 알림, 점수, 판정 (CLI JSON 출력용)"""
+    deltas = frame.deltas()
+    growth, fear, tight = compute_scores(deltas, cip.basis, cip.friction)
+    return {
+        "as_of_bar": frame.as_of.strftime("%Y-%m-%d") if frame.as_of is not None else None,
+        "prices": {
+            key: {"last": frame.last_of(key), "prev": frame.prev_of(key), "delta_pct": deltas[key]}
+            for key in frame.columns
+        },
+        "alerts": [{"type": atype, "message": msg} for atype, msg in build_alerts(deltas)],
+        "cip": {**cip._asdict(), "liquidity": liquidity_level(cip.basis, cip.friction)},
+        "scores": {"growth": growth, "fear": fear, "tight": tight},
+        "verdict": decide_verdict(growth, fear, tight),
+    }
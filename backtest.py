@@ -0,0 +1,183 @@
+"""
+판정 규칙 백테스트 · 기준값 스윕
+Backtest and threshold sweep for the tab3 verdict rules
+
+저장된 수년치 일별 이력에 점수 규칙(analysis.score_arrays)을 적용하고, 판정별로
+이후 SPX / EEM / KRW 수익률과 적중률을 집계합니다. 기준값 조합 그리드는 프로세스 풀에서
+나눠 평가하며, 각 작업 프로세스는 수익률 행렬을 한 번만 받아 재사용합니다.
+
+베이시스·마찰계수는 이력이 없으므로 경색 점수는 0 으로 두고 시장 지표 기준값만 스윕합니다.
+
+실행 방법:
+    python backtest.py --horizons 5 20 --workers 8 --out backtest_results.csv
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analysis import SCORE_KEYS, VERDICTS, MarketFrame, Thresholds, build_market_frame, score_arrays, verdict_array
+from market_data import FULL_PERIOD, fetch_prices
+from price_store import DATA_DIR, PriceStore
+from providers import get_provider
+
+ASSETS = ("SPX", "EEM", "KRW")
+
+# 판정이 맞았다고 보는 이후 수익률 방향 (KRW=X 상승 = 원화 약세)
+EXPECTED_SIGN = {
+    "growth": {"SPX": 1,  "EEM": 1,  "KRW": -1},
+    "fear":   {"SPX": -1, "EEM": -1, "KRW": 1},
+    "tight":  {"SPX": -1, "EEM": -1, "KRW": 1},
+}
+
+DEFAULT_GRID = {
+    "eem_crash": [-2.0, -1.5, -1.0, -0.75, -0.5],
+    "eem_up":    [0.25, 0.5, 0.75, 1.0],
+    "emb_crash": [-1.5, -1.0, -0.5],
+    "dxy_move":  [0.25, 0.5, 0.75, 1.0],
+    "fear_min":  [1, 2, 3],
+}
+
+
+# ── 데이터 준비 ───────────────────────────────────────────────────────────────
+def load_history(years: float = None, provider=None, store=None) -> MarketFrame:
+    """
+    저장소의 전체 일별 이력(필요 시 증분 수집) → 대시보드·판정 타임라인과 같은 MarketFrame
+    (기준 종목 거래일에 as-of 정렬 — KRW·FX 만 거래한 날이 SPX·EEM 0% 인 날로 끼어들지 않음)
+    """
+    provider = provider or get_provider()
+    store = store or PriceStore(DATA_DIR / "prices" / provider.name)
+    data, _ = fetch_prices(FULL_PERIOD, store=store, provider=provider)
+    if years and data:
+        end = max(s.index[-1] for s in data.values())
+        data = {k: s[s.index >= end - pd.DateOffset(years=years)] for k, s in data.items()}
+    return build_market_frame(data)
+
+
+def prepare(frame: MarketFrame, horizons):
+    """
+    (returns, forward)
+    returns — SCORE_KEYS 순서의 일간 변화율(%) 2차원 배열 [일, 종목] (MarketFrame.returns 그대로)
+    forward — {h: ASSETS 순서의 h일 이후 수익률(%) 배열 [일, 자산]}, 마지막 h일은 NaN
+    verdict_timeline 과 같이 판정 종목 변화율이 하나도 없는 행(첫 행)은 제외
+    """
+    returns = frame.returns(SCORE_KEYS)
+    keep = returns.notna().any(axis=1).to_numpy()
+    assets = pd.DataFrame(frame.prices, index=frame.index, columns=frame.columns).reindex(columns=list(ASSETS))
+    forward = {h: (assets.shift(-h) / assets - 1).to_numpy() * 100 for h in horizons}
+    return returns.to_numpy()[keep], {h: f[keep] for h, f in forward.items()}
+
+
+# ── 평가 ──────────────────────────────────────────────────────────────────────
+def evaluate(th: Thresholds, returns: np.ndarray, forward: dict) -> dict:
+    """기준값 한 조합 → 판정별 일수, 평균 이후 수익률, 적중률"""
+    g, f, t = score_arrays(*returns.T, 0.0, 0.0, th)
+    verdicts = verdict_array(g, f, t, th)
+
+    row = dict(th._asdict())
+    hits_total, hits_n = {h: 0.0 for h in forward}, {h: 0 for h in forward}
+    for v in VERDICTS:
+        mask = verdicts == v
+        row[f"{v}_days"] = int(mask.sum())
+        for h, fwd in forward.items():
+            sub = fwd[mask]
+            for j, asset in enumerate(ASSETS):
+                col = sub[:, j]
+                col = col[~np.isnan(col)]
+                row[f"{v}_{asset}_{h}d_ret"] = float(col.mean()) if len(col) else np.nan
+            if v in EXPECTED_SIGN and len(sub):
+                expected = np.array([EXPECTED_SIGN[v][a] for a in ASSETS])
+                valid = ~np.isnan(sub)
+                hit = (np.sign(sub) == expected) & valid
+                n = int(valid.sum())
+                row[f"{v}_{h}d_hit"] = hit.sum() / n if n else np.nan
+                hits_total[h] += hit.sum()
+                hits_n[h] += n
+    for h in forward:
+        row[f"hit_{h}d"] = hits_total[h] / hits_n[h] if hits_n[h] else np.nan
+    return row
+
+
+_WORKER = {}
+
+
+def _init_worker(returns, forward):
+    _WORKER["returns"], _WORKER["forward"] = returns, forward
+
+
+def _eval_chunk(param_chunk):
+    return [evaluate(Thresholds(**p), _WORKER["returns"], _WORKER["forward"]) for p in param_chunk]
+
+
+def expand_grid(grid: dict) -> list:
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def sweep(frame: MarketFrame, grid: dict = None, horizons=(5, 20), workers: int = None) -> pd.DataFrame:
+    """기준값 그리드 전체를 프로세스 풀에서 평가 → 첫 번째 horizon 적중률 내림차순 결과표"""
+    params = expand_grid(grid or DEFAULT_GRID)
+    returns, forward = prepare(frame, horizons)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(params) < 2:
+        _init_worker(returns, forward)
+        rows = _eval_chunk(params)
+    else:
+        size = max(1, -(-len(params) // (workers * 4)))   # 작업자당 4묶음 정도로 분할
+        chunks = [params[i:i + size] for i in range(0, len(params), size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(returns, forward)) as pool:
+            rows = [row for chunk_rows in pool.map(_eval_chunk, chunks) for row in chunk_rows]
+
+    out = pd.DataFrame(rows)
+    return out.sort_values(f"hit_{horizons[0]}d", ascending=False, ignore_index=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="판정 규칙 백테스트 · 기준값 스윕")
+    parser.add_argument("--years",    type=float, default=None, help="최근 N년만 사용 (기본: 저장된 전체)")
+    parser.add_argument("--horizons", type=int, nargs="+", default=[5, 20], help="이후 수익률 기간 (거래일)")
+    parser.add_argument("--grid",     default=None, help='기준값 그리드 JSON, 예: \'{"eem_crash": [-1.5, -1.0]}\'')
+    parser.add_argument("--workers",  type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--top",      type=int, default=10)
+    parser.add_argument("--out",      default=None, help="전체 결과 저장 경로 (.csv / .json)")
+    args = parser.parse_args(argv)
+
+    frame = load_history(args.years)
+    if not len(frame.index):
+        print("❌ 이력 데이터 없음", file=sys.stderr)
+        return 1
+    grid = json.loads(args.grid) if args.grid else DEFAULT_GRID
+
+    t0 = time.perf_counter()
+    result = sweep(frame, grid, tuple(args.horizons), args.workers)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(result):,}개 조합 · {len(frame.index):,}거래일 "
+          f"({frame.index[0]:%Y-%m-%d} ~ {frame.index[-1]:%Y-%m-%d}) · {elapsed:.1f}s", file=sys.stderr)
+
+    # 기본 기준값의 성과를 함께 보여 비교 기준으로 삼음
+    returns, forward = prepare(frame, tuple(args.horizons))
+    baseline = evaluate(Thresholds(), returns, forward)
+    h0 = args.horizons[0]
+    print(f"기본 기준값 적중률({h0}d): {baseline[f'hit_{h0}d']:.3f}", file=sys.stderr)
+
+    cols = list(grid) + [f"{v}_days" for v in VERDICTS] + [f"hit_{h}d" for h in args.horizons]
+    print(result[cols].head(args.top).to_string(index=False))
+
+    if args.out and args.out.endswith(".json"):
+        result.to_json(args.out, orient="records", indent=1)
+    elif args.out:
+        result.to_csv(args.out, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
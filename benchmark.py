@@ -0,0 +1,316 @@
+"""
+성능 벤치마크
+Benchmark suite on synthetic market data
+
+네트워크 없이 합성 가격 이력(길이·종목 수 지정)을 만들어 계산 경로(정규화, 상관계수, 변화율 헬퍼,
+점수·판정, CIP), 시세 수집(yfinance 처럼 묶음 요청을 직렬화하는 재생 제공자), Plotly Figure 생성,
+Streamlit AppTest 로 돌리는 대시보드 전체 재실행 시간을 잽니다.
+결과를 JSON 기준선으로 저장해 두면 다음 버전과 비교해 느려진 항목을 표시합니다.
+
+실행 방법:
+    python benchmark.py --days 2500 --tickers 6 --save benchmarks/baseline.json
+    python benchmark.py --baseline benchmarks/baseline.json --fail-on-regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from market_data import TICKERS
+
+ROOT = Path(__file__).resolve().parent
+REGRESSION_RATIO = 1.3   # 기준선 대비 중앙값이 이 배수를 넘으면 회귀로 표시
+NOISE_FLOOR_MS   = 0.5   # 차이가 이보다 작으면 배수와 관계없이 측정 잡음으로 간주
+
+# 종목별 합성 시세 시작값·일간 변동성 (대략 실제 수준)
+_PROFILE = {"TNX": (4.2, 0.02), "SPX": (5000.0, 0.011), "EEM": (42.0, 0.013),
+            "EMB": (90.0, 0.005), "DXY": (104.0, 0.004), "IRX": (5.2, 0.01)}
+
+
+# ── 합성 데이터 ───────────────────────────────────────────────────────────────
+def synthetic_prices(days: int = 2500, tickers: int = len(TICKERS), seed: int = 0, end=None) -> dict:
+    """
+    {name: 종가 Series} — 기하 브라운 운동, 영업일 인덱스.
+    앞쪽은 대시보드 종목(TNX, SPX ...)이고 tickers 가 더 많으면 X07, X08 ... 을 추가합니다.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end or pd.Timestamp.today().normalize(), periods=days)
+    names = list(TICKERS)[:tickers] + [f"X{i:02d}" for i in range(len(TICKERS) + 1, tickers + 1)]
+    data = {}
+    for name in names:
+        start, vol = _PROFILE.get(name, (100.0, 0.01))
+        data[name] = pd.Series(start * np.exp(np.cumsum(rng.normal(0, vol, days))), index=index, name=name)
+    return data
+
+
+def write_fixtures(data: dict, out_dir) -> Path:
+    """ReplayProvider 가 읽는 형식(<심볼>.csv)으로 저장"""
+    from providers import ReplayProvider
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, symbol in TICKERS.items():
+        if name in data:
+            df = pd.DataFrame({"Close": data[name]})
+            df.index.name = "Date"
+            df.to_csv(out_dir / f"{ReplayProvider.fixture_stem(symbol)}.csv")
+    return out_dir
+
+
+# ── 측정 ──────────────────────────────────────────────────────────────────────
+def measure(fn, repeat: int = 5, warmup: int = 1) -> dict:
+    for _ in range(warmup):
+        fn()
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    return {"median_ms": statistics.median(runs), "min_ms": min(runs), "max_ms": max(runs), "runs": repeat}
+
+
+def compute_cases(data: dict) -> dict:
+    """이름 → 인자 없는 함수 (계산 경로)"""
+    frame = analysis.build_market_frame(data)
+    returns = frame.returns(analysis.SCORE_KEYS)
+    cip = analysis.compute_cip(1440.0, 3.69, 2.70, 90, -720.0, -220.0)
+    n_rows = 100_000
+    rng = np.random.default_rng(1)
+    bulk = (1100 + rng.random(n_rows) * 400, 3.69, 2.70, rng.choice([30, 90, 180, 365], n_rows),
+            -800 + rng.random(n_rows) * 400, -300 + rng.random(n_rows) * 100)
+
+    def rolling_corr():
+        analysis.CorrelationHistory(60, list(analysis.SCORE_KEYS)).update(returns)
+
+    return {
+        "normalize":           lambda: [analysis.normalize(s) for s in data.values()],
+        "downsample":          lambda: [analysis.downsample(s, 1400) for s in data.values()],
+        "fingerprint":         lambda: analysis.data_fingerprint(data),
+        "market_frame":        lambda: analysis.build_market_frame(data),
+        "deltas":              lambda: frame.deltas(),
+        "corr_full":           lambda: returns.corr(),
+        "corr_rolling_60":     rolling_corr,
+        "scores_today":        lambda: analysis.decide_verdict(*analysis.compute_scores(frame.deltas(), cip.basis, cip.friction)),
+        "verdict_timeline":    lambda: analysis.verdict_timeline(returns),
+        "cip_scalar_x1000":    lambda: [analysis.compute_cip(1440.0 + i, 3.69, 2.70, 90, -720.0, -220.0) for i in range(1000)],
+        "cip_array_100k":      lambda: analysis.compute_cip_array(*bulk),
+        "cip_surface":         lambda: analysis.cip_surface(1440.0, 3.69, 2.70, 90, -720.0, -220.0),
+        "evaluate":            lambda: analysis.evaluate(frame, cip),
+    }
+
+
+FETCH_LATENCY = 0.05   # 수집 항목의 요청당 지연 (초)
+
+
+def fetch_cases(data: dict) -> dict:
+    """
+    fetch_prices 를 요청당 FETCH_LATENCY 가 걸리고 묶음 요청은 프로세스에서 하나씩만 처리하는
+    (yf.download 와 같은) 재생 제공자로 실행. 종목이 빠지거나 종목별 시간이 비면 예외.
+    동시 수집이면 (종목 수 / MAX_WORKERS) × 지연, 직렬화되면 종목 수 × 지연에 가까워짐
+    """
+    from market_data import BATCH_MIN, TickerCache, fetch_prices
+    from providers import ReplayProvider
+
+    tmp = tempfile.TemporaryDirectory()
+    tickers = {name: TICKERS.get(name, name) for name in data}
+    for name, symbol in tickers.items():
+        df = pd.DataFrame({"Close": data[name]})
+        df.index.name = "Date"
+        df.to_csv(Path(tmp.name) / f"{ReplayProvider.fixture_stem(symbol)}.csv")
+    provider = ReplayProvider(tmp.name, latency=FETCH_LATENCY, batch_size=100)
+
+    def fetch(universe):
+        def fn(_tmp=tmp):   # 측정이 끝날 때까지 임시 디렉터리 유지
+            got, timings = fetch_prices("2y", universe, provider=provider, cache=TickerCache(), retries=0)
+            if set(got) != set(universe):
+                raise RuntimeError(f"수집 누락: {sorted(set(universe) - set(got))}")
+            if len(universe) <= BATCH_MIN and any(np.isnan(v) for v in timings.values()):
+                raise RuntimeError(f"종목별 시간 없음: {timings}")
+        return fn
+
+    small = dict(list(tickers.items())[:len(TICKERS)])
+    cases = {f"fetch_{len(small)}_tickers": fetch(small)}
+    if len(tickers) > BATCH_MIN:
+        cases[f"fetch_{len(tickers)}_tickers_batched"] = fetch(tickers)
+    return cases
+
+
+def figure_cases(data: dict) -> dict:
+    """대시보드와 같은 구성의 Plotly Figure 생성 (plotly 가 없으면 생략)"""
+    try:
+        import plotly.graph_objects as go
+    except ImportError:
+        return {}
+    frame = analysis.build_market_frame(data)
+    mat = frame.returns(analysis.SCORE_KEYS).corr().to_numpy()
+    surf = analysis.cip_surface(1440.0, 3.69, 2.70, 90, -720.0, -220.0)
+
+    def trend():
+        fig = go.Figure()
+        for name in analysis.SCORE_KEYS:
+            if name in data:
+                norm = analysis.downsample(analysis.normalize(data[name]), 1400)
+                trace = go.Scattergl if len(norm) > 1000 else go.Scatter
+                fig.add_trace(trace(x=norm.index, y=norm.values, name=name))
+        fig.update_layout(template="plotly_white", height=380, hovermode="x unified")
+        return fig.to_plotly_json()
+
+    def heatmap():
+        fig = go.Figure(go.Heatmap(z=mat, x=list(analysis.SCORE_KEYS), y=list(analysis.SCORE_KEYS),
+                                   colorscale="RdBu_r", zmid=0, text=np.round(mat, 2), texttemplate="%{text}"))
+        fig.update_layout(template="plotly_white", height=360)
+        return fig.to_plotly_json()
+
+    def surface():
+        fig = go.Figure(go.Heatmap(z=surf.deviation_pct[:, :, 60], x=surf.spot_shocks, y=surf.rate_shocks))
+        fig.add_trace(go.Scatter(x=surf.tenors, y=surf.theoretical[10, 10]))
+        return fig.to_plotly_json()
+
+    return {"figure_trend": trend, "figure_corr_heatmap": heatmap, "figure_cip_surface": surface}
+
+
+_APPTEST_SCRIPT = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+script, repeat = sys.argv[1], int(sys.argv[2])
+at = AppTest.from_file(script, default_timeout=120)
+at.session_state["authenticated"] = True
+t0 = time.perf_counter(); at.run(); first = (time.perf_counter() - t0) * 1000
+errors = [str(e.value) for e in at.exception]
+full, widget = [], []
+for i in range(repeat):
+    t0 = time.perf_counter(); at.run(); full.append((time.perf_counter() - t0) * 1000)
+for i in range(repeat):
+    t0 = time.perf_counter()
+    at.number_input(key="cip_swap_bid").set_value(-700.0 - i).run()
+    widget.append((time.perf_counter() - t0) * 1000)
+    at.run()
+print(json.dumps({"first": first, "full": full, "widget": widget, "errors": errors}))
+"""
+
+
+def apptest_cases(data: dict, repeat: int) -> dict:
+    """
+    대시보드 스크립트를 AppTest 로 돌린 첫 실행·앱 재실행·CIP 입력 변경(조각 재실행) 시간.
+    모듈 수준 환경 변수(DQ_DATA_DIR 등)가 섞이지 않도록 별도 프로세스에서 재생 모드로 실행합니다.
+    """
+    try:
+        import streamlit.testing.v1  # noqa: F401
+    except ImportError:
+        return {}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DQ_PROVIDER="replay", DQ_REPLAY_DIR=str(write_fixtures(data, Path(tmp) / "fx")),
+                   DQ_DATA_DIR=str(Path(tmp) / "data"), DQ_REPLAY_LATENCY="0", DQ_REPLAY_FAILURE_RATE="0")
+        env.pop("DQ_METRICS_PORT", None)
+        proc = subprocess.run([sys.executable, "-c", _APPTEST_SCRIPT, str(ROOT / "dollar_quality_dashboard.py"),
+                               str(repeat)], env=env, cwd=ROOT, capture_output=True, text=True, timeout=600)
+    if proc.returncode != 0:
+        raise RuntimeError(f"AppTest 실행 실패:\n{proc.stderr[-2000:]}")
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+    if out["errors"]:
+        raise RuntimeError(f"대시보드 예외: {out['errors']}")
+
+    def summary(runs):
+        return {"median_ms": statistics.median(runs), "min_ms": min(runs), "max_ms": max(runs), "runs": len(runs)}
+    return {
+        "apptest_first_run":    summary([out["first"]]),
+        "apptest_rerun":        summary(out["full"]),
+        "apptest_cip_input":    summary(out["widget"]),
+    }
+
+
+# ── 기준선 ────────────────────────────────────────────────────────────────────
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def run(days: int = 2500, tickers: int = len(TICKERS), repeat: int = 5, seed: int = 0,
+        only=None, skip_apptest: bool = False) -> dict:
+    data = synthetic_prices(days, tickers, seed)
+    cases = {**compute_cases(data), **fetch_cases(data), **figure_cases(data)}
+    if only:
+        cases = {k: v for k, v in cases.items() if any(o in k for o in only)}
+    results = {name: measure(fn, repeat) for name, fn in cases.items()}
+    if not skip_apptest and (not only or any("apptest" in o for o in only)):
+        results.update(apptest_cases(data, repeat))
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": f"{platform.system()} {platform.machine()}",
+            "days": days, "tickers": tickers, "repeat": repeat, "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, ratio: float = REGRESSION_RATIO) -> pd.DataFrame:
+    """항목별 기준선 대비 중앙값 배수 — ratio 초과이면서 차이가 NOISE_FLOOR_MS 이상이면 regression"""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        r = cur["median_ms"] / base["median_ms"] if base and base["median_ms"] > 0 else np.nan
+        rows.append({"case": name, "baseline_ms": base["median_ms"] if base else np.nan,
+                     "median_ms": cur["median_ms"], "ratio": r,
+                     "regression": bool(r > ratio and cur["median_ms"] - base["median_ms"] > NOISE_FLOOR_MS)})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="합성 데이터 기반 성능 벤치마크")
+    parser.add_argument("--days",     type=int, default=2500, help="합성 이력 길이 (영업일)")
+    parser.add_argument("--tickers",  type=int, default=len(TICKERS), help="종목 수")
+    parser.add_argument("--repeat",   type=int, default=5)
+    parser.add_argument("--seed",     type=int, default=0)
+    parser.add_argument("--only",     nargs="+", default=None, help="이름에 이 문자열이 들어간 항목만")
+    parser.add_argument("--skip-apptest", action="store_true", help="Streamlit AppTest 재실행 측정 생략")
+    parser.add_argument("--save",     default=None, help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 기준선 JSON")
+    parser.add_argument("--ratio",    type=float, default=REGRESSION_RATIO, help="회귀 판정 배수")
+    parser.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 종료 코드 1")
+    args = parser.parse_args(argv)
+
+    result = run(args.days, args.tickers, args.repeat, args.seed, args.only, args.skip_apptest)
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save).write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        differs = [k for k in ("days", "tickers") if baseline.get("meta", {}).get(k) != result["meta"][k]]
+        if differs:
+            print(f"⚠️ 기준선과 측정 조건이 다름: {', '.join(differs)}", file=sys.stderr)
+        table = compare(result, baseline, args.ratio)
+        print(table.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+        regressed = table[table["regression"]]
+        if len(regressed):
+            print(f"⚠️ 회귀 {len(regressed)}건: {', '.join(regressed['case'])}", file=sys.stderr)
+            if args.fail_on_regression:
+                return 1
+    else:
+        for name, r in result["results"].items():
+            print(f"{name:<24} {r['median_ms']:>10,.2f} ms  (min {r['min_ms']:,.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+다통화 CIP 베이시스 스캐너
+Multi-currency CIP basis scanner
+
+통화쌍 × 만기 표 전체의 이론 스왑·베이시스·마찰계수를 배열 연산 한 번으로 계산하고,
+통화쌍마다 다른 스왑 포인트 단위를 연율 bp 로 맞춰 달러 조달 프리미엄이 큰 순으로 정렬합니다.
+
+입력 CSV 열 (한 행 = 통화쌍 하나의 한 만기):
+    pair         USDJPY, USD/KRW, EURUSD ...  (한쪽은 USD)
+    days         만기 (일)
+    spot         현물 환율
+    base_rate    기준 통화(앞쪽) 금리 (%)
+    quote_rate   표시 통화(뒤쪽) 금리 (%)
+    bid, ask     스왑 포인트 (pip 단위)
+    pip          선택 — 환율 1 당 포인트 수 (기본: JPY·KRW 100, 그 외 10000)
+
+이론 스왑 = Spot × (표시 통화 금리 − 기준 통화 금리) / (1 + 기준 통화 금리) × (Days/360) — 탭2 CIP 와 같은 식.
+
+실행 방법:
+    python cip_scanner.py cip_quotes.csv --top 15
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from price_store import DATA_DIR
+
+SAMPLE_FILE = Path(__file__).resolve().parent / "cip_quotes.csv"
+SCAN_FILE   = DATA_DIR / "cip_quotes.csv"   # 있으면 예시 파일 대신 사용
+
+# 환율 1 당 스왑 포인트 수 — 표시 통화 기준 (나머지는 DEFAULT_PIP)
+PIP_SIZE    = {"JPY": 100, "KRW": 100, "HUF": 100, "INR": 100, "TWD": 1000}
+DEFAULT_PIP = 10_000
+STORE_PIP   = 1   # 탭2 입력은 스왑 포인트를 현물과 같은 원 단위로 받음 — 탭2 카드와 같은 베이시스가 나오도록
+
+# 달러 조달 프리미엄(연율 bp) 판정 기준
+PREMIUM_WATCH_BP = 20
+PREMIUM_TIGHT_BP = 50
+
+COLUMN_ALIASES = {
+    "pair": "pair", "통화쌍": "pair", "ccy": "pair",
+    "days": "days", "tenor": "days", "만기": "days",
+    "spot": "spot", "현물": "spot",
+    "base_rate": "base_rate", "usd_rate": "base_rate", "foreign_rate": "base_rate",
+    "quote_rate": "quote_rate", "local_rate": "quote_rate", "domestic_rate": "quote_rate",
+    "bid": "bid", "swap_bid": "bid", "ask": "ask", "swap_ask": "ask",
+    "pip": "pip",
+}
+REQUIRED = ("pair", "days", "spot", "base_rate", "quote_rate", "bid", "ask")
+
+
+def _pair(p: str) -> str:
+    return "".join(ch for ch in str(p).upper() if ch.isalpha())
+
+
+def load_quotes(src) -> pd.DataFrame:
+    """CSV 경로·파일 객체 또는 DataFrame → 정규화된 입력 표 (필수 값이 비정상인 행은 제외)"""
+    raw = src if isinstance(src, pd.DataFrame) else pd.read_csv(src, skipinitialspace=True)
+    df = raw.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip().lower(), c))
+    missing = [c for c in REQUIRED if c not in df.columns]
+    if missing:
+        raise ValueError(f"필수 열 없음: {', '.join(missing)}")
+
+    df = df[[c for c in (*REQUIRED, "pip") if c in df.columns]].copy()
+    df["pair"] = df["pair"].map(_pair)
+    for c in REQUIRED[1:]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    ok = (df["pair"].str.len() == 6) & df["pair"].str.contains("USD") & df[list(REQUIRED[1:])].notna().all(axis=1) \
+        & (df["days"] > 0) & (df["spot"] > 0)
+    df = df[ok].reset_index(drop=True)
+
+    df["usd_base"] = df["pair"].str.startswith("USD")
+    df["ccy"] = np.where(df["usd_base"], df["pair"].str[3:], df["pair"].str[:3])
+    default_pip = df["pair"].str[3:].map(PIP_SIZE).fillna(DEFAULT_PIP)
+    df["pip"] = pd.to_numeric(df["pip"], errors="coerce").fillna(default_pip) if "pip" in df.columns else default_pip
+    df["days"] = df["days"].astype(int)
+    return df
+
+
+def from_store(store, pair: str = "USDKRW", pip: float = STORE_PIP) -> pd.DataFrame:
+    """
+    호가 이력 저장소(탭2 USD/KRW)의 만기별 최신 호가 → 스캐너 입력 행.
+    탭2 는 Bid/Ask 를 원 단위로 받아 compute_cip 에 그대로 넣으므로 pip 기본값은 1 —
+    이론 스왑·베이시스·마찰계수가 탭2 결과 카드와 같은 값이 됩니다.
+    """
+    last = store.latest()
+    return pd.DataFrame({
+        "pair": pair, "days": last["days"].to_numpy(), "spot": last["spot"].to_numpy(),
+        "base_rate": last["us_3m"].to_numpy(), "quote_rate": last["kr_3m"].to_numpy(),
+        "bid": last["swap_bid"].to_numpy(), "ask": last["swap_ask"].to_numpy(),
+        "pip": float(pip),
+    })
+
+
+def scan(quotes: pd.DataFrame) -> pd.DataFrame:
+    """
+    load_quotes 결과 → 행마다 이론 스왑·베이시스·마찰계수(포인트)와 연율 bp 환산값, 판정.
+    달러 조달 프리미엄(usd_premium_bp)이 큰 순으로 정렬합니다.
+
+    usd_premium_bp: 스왑으로 달러를 조달할 때 달러 금리 대비 추가 비용.
+    USD/XXX 는 베이시스가 음수일 때, XXX/USD 는 양수일 때 달러가 비쌈.
+    """
+    if quotes.empty:
+        return quotes.assign(theoretical=[], basis=[], friction=[], basis_bp=[], friction_bp=[],
+                             usd_premium_bp=[], level=[])
+    spot, pip, days = (quotes[c].to_numpy(dtype=float) for c in ("spot", "pip", "days"))
+    # 이론 스왑은 현물에 비례 → 현물 × pip 을 넣으면 결과가 바로 포인트 단위
+    cip = analysis.compute_cip_array(spot * pip, quotes["base_rate"], quotes["quote_rate"], days,
+                                     quotes["bid"], quotes["ask"])
+    to_bp = 1e4 * 360 / days / (spot * pip)   # 포인트 → 연율 bp (현물 대비)
+    basis_bp = cip.basis * to_bp
+    premium  = np.where(quotes["usd_base"].to_numpy(), -basis_bp, basis_bp)
+
+    out = quotes.assign(
+        theoretical=cip.theoretical_rate, basis=cip.basis, friction=cip.friction,
+        basis_bp=basis_bp, friction_bp=cip.friction * to_bp, usd_premium_bp=premium,
+        level=np.select([premium >= PREMIUM_TIGHT_BP, premium >= PREMIUM_WATCH_BP], ["tight", "watch"], "normal"),
+    )
+    return out.sort_values("usd_premium_bp", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def pivot(result: pd.DataFrame, value: str = "usd_premium_bp") -> pd.DataFrame:
+    """[통화쌍 × 만기] 행렬 — 통화쌍은 최대 프리미엄 순, 만기는 오름차순"""
+    if result.empty:
+        return pd.DataFrame()
+    m = result.pivot_table(index="pair", columns="days", values=value, aggfunc="last")
+    order = result.groupby("pair")["usd_premium_bp"].max().sort_values(ascending=False).index
+    return m.loc[order].sort_index(axis=1)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="다통화 CIP 베이시스 스캔")
+    parser.add_argument("file", nargs="?", default=None, help=f"호가 CSV (기본: {SCAN_FILE} 또는 예시 파일)")
+    parser.add_argument("--top", type=int, default=20, help="출력할 상위 행 수")
+    args = parser.parse_args(argv)
+
+    src = args.file or (SCAN_FILE if SCAN_FILE.exists() else SAMPLE_FILE)
+    try:
+        result = scan(load_quotes(src))
+    except (OSError, ValueError) as e:
+        print(f"❌ {src}: {e}", file=sys.stderr)
+        return 1
+    cols = ["pair", "days", "spot", "theoretical", "bid", "basis", "friction",
+            "basis_bp", "friction_bp", "usd_premium_bp", "level"]
+    with pd.option_context("display.width", 160, "display.float_format", "{:,.1f}".format):
+        print(result[cols].head(args.top).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+달러 품질 판정 CLI
+Headless dollar quality verdict (JSON)
+
+streamlit / plotly 없이 시세를 받아 대시보드와 같은 규칙으로 판정하고 JSON 으로 출력합니다.
+스케줄 배치 작업용.
+
+실행 방법:
+    python dollar_quality_cli.py --period 3mo --swap-bid -720 --swap-ask -220
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from datetime import datetime
+
+import analysis
+from market_data import PERIOD_OPTIONS, SUPERSET_PERIOD, fetch_prices, slice_period
+from price_store import DATA_DIR, PriceStore
+from providers import get_provider
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="달러 강세 품질 판정 (JSON 출력)")
+    parser.add_argument("--period", choices=PERIOD_OPTIONS, default="3mo", help="조회 기간")
+    parser.add_argument("--spot",     type=float, default=analysis.DEFAULT_SPOT,     help="현물 환율 (USD/KRW)")
+    parser.add_argument("--us-3m",    type=float, default=None,                      help="미국 3M 금리 (%%), 생략 시 IRX 종가")
+    parser.add_argument("--kr-3m",    type=float, default=analysis.DEFAULT_KR_3M,    help="한국 3M 금리 (%%)")
+    parser.add_argument("--days",     type=int,   default=analysis.DEFAULT_DAYS,     help="계약 만기 (일)")
+    parser.add_argument("--swap-bid", type=float, default=analysis.DEFAULT_SWAP_BID, help="실제 스왑포인트 Bid")
+    parser.add_argument("--swap-ask", type=float, default=analysis.DEFAULT_SWAP_ASK, help="실제 스왑포인트 Ask")
+    parser.add_argument("--no-store", action="store_true", help="로컬 가격 저장소를 쓰지 않고 기간 전체를 새로 수신")
+    parser.add_argument("--indent",   type=int,   default=2)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    provider = get_provider()
+    store = None if args.no_store else PriceStore(DATA_DIR / "prices" / provider.name)
+
+    t0 = time.perf_counter()
+    superset, timings = fetch_prices(SUPERSET_PERIOD, store=store, provider=provider)
+    data = slice_period(superset, args.period)
+
+    frame = analysis.build_market_frame(data)
+    irx = frame.last_of("IRX")
+    us_3m = args.us_3m if args.us_3m is not None else (round(irx, 2) if irx else analysis.DEFAULT_US_3M)
+    cip = analysis.compute_cip(args.spot, us_3m, args.kr_3m, args.days, args.swap_bid, args.swap_ask)
+
+    result = {
+        "as_of": datetime.now().isoformat(timespec="seconds"),
+        "period": args.period,
+        "provider": provider.name,
+        "inputs": {"spot": args.spot, "us_3m": us_3m, "kr_3m": args.kr_3m, "days": args.days,
+                   "swap_bid": args.swap_bid, "swap_ask": args.swap_ask},
+        **analysis.evaluate(frame, cip),
+        "fetch": {
+            "tickers": f"{len(data)}/{len(timings)}",
+            "seconds": round(time.perf_counter() - t0, 3),
+            "per_ticker_ms": {k: (None if math.isnan(v) else round(v * 1000, 1)) for k, v in timings.items()},
+        },
+    }
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=args.indent, default=str)
+    sys.stdout.write("\n")
+    return 0 if data else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
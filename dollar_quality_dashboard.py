@@ -7,14 +7,38 @@ Dollar Strength Quality Analysis Dashboard
     streamlit run dollar_quality_dashboard.py
 """
 
+import html
+import time
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from datetime import datetime
+from pathlib import Path
 import numpy as np
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from streamlit_autorefresh import st_autorefresh
 
+import analysis
+import cip_scanner
+from alerts import AlertEngine, AlertStore
+from analysis import (
+    SCORE_KEYS, VERDICTS, CorrelationHistory, build_alerts, compute_cip, compute_scores, decide_verdict,
+    downsample, liquidity_level, normalize, regime_runs, verdict_timeline,
+)
+from intraday import BUFFER_BARS, INTERVAL_SECONDS, IntradayStream
+from market_data import (
+    BATCH_MIN, CHECK_SECONDS, PERIOD_OPTIONS, PRICE_DTYPE, SUPERSET_PERIOD, TICKERS, TickerCache, fetch_prices, slice_period,
+)
+from metrics import METRICS, METRICS_FILE, METRICS_PORT, Stopwatch
+from price_store import DATA_DIR, PriceStore
+from quote_import import import_quotes
+from quote_store import QuoteStore
+from providers import get_provider
+from refresher import MarketRefresher, session_bytes
+from registry import REGISTRY
+from verdict_history import VerdictHistory
+
 # ── Page Config ────────────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="달러 강세 품질 분석 대시보드",
@@ -63,6 +87,15 @@ st.markdown("""
     .metric-label { font-size: 0.72rem; color: #718096; letter-spacing: 0.06em; text-transform: uppercase; font-weight: 600; margin-bottom: 4px; }
     .metric-value { font-size: 1.55rem; font-weight: 700; margin: 4px 0; }
     .metric-delta { font-size: 0.8rem; font-weight: 600; }
+    .metric-age { font-size: 0.68rem; color: #a0aec0; margin-top: 4px; }
+    .metric-age.stale { color: #d97706; font-weight: 600; }
+    .metric-grid { display: grid; grid-template-columns: repeat(5, minmax(0, 1fr)); gap: 12px; }
+    .dir-row {
+        display: flex; justify-content: space-between; align-items: center;
+        padding: 10px 14px; background: white; border-radius: 8px;
+        border: 1px solid #e2e8f0; margin: 4px 0; font-size: 0.84rem;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.04);
+    }
 
     /* ── 색상 ── */
     .green  { color: #16a34a; }
@@ -339,7 +372,7 @@ if not st.session_state.authenticated:
             label_visibility="collapsed",
             key="pw_field"
         )
-        enter_btn = st.button("🔓 입장하기", use_container_width=True, type="primary")
+        enter_btn = st.button("🔓 입장하기", width="stretch", type="primary")
 
         if enter_btn or (pw_input and len(pw_input) >= 1):
             if enter_btn:
@@ -362,6 +395,11 @@ if not st.session_state.authenticated:
 # 인증 통과 후 메인 대시보드
 # ══════════════════════════════════════════════════════════════════════════════
 
+# ── 단계별 계측 ───────────────────────────────────────────────────────────────
+# 앱 전체 재실행 횟수와 구역별 렌더링 시간 (조각 재실행은 dq_fragment_seconds 로 따로 기록)
+METRICS.inc("dq_reruns_total", scope="app")
+render_sw = Stopwatch("dq_render_seconds")
+
 # ── 자동 새로고침 (사이드바 설정 전에 미리 session_state 기본값 설정) ──────────
 if "auto_refresh" not in st.session_state:
     st.session_state["_auto_refresh_enabled"] = True
@@ -400,31 +438,52 @@ with st.sidebar:
 
     st.markdown("---")
     st.markdown("### ⚙️ 데이터 설정")
-    period_option = st.selectbox("조회 기간", ["1mo", "3mo", "6mo", "1y", "2y"], index=1)
+    period_option = st.selectbox("조회 기간", PERIOD_OPTIONS, index=1)
+    intraday_interval = st.selectbox(
+        "장중 스트리밍", [None, *INTERVAL_SECONDS], index=0,
+        format_func=lambda x: "끄기" if x is None else f"{x[:-1]}분봉",
+        help="켜면 탭1 상단에 전일 종가 대비 장중 변화를 분봉이 들어올 때마다 갱신합니다.",
+    )
 
     st.markdown("---")
     st.markdown("### 🔁 자동 새로고침")
-    auto_refresh = st.toggle("자동 새로고침 ON/OFF", value=True)
-    refresh_interval = st.select_slider(
-        "갱신 주기",
-        options=[1, 3, 5, 10, 15, 30],
-        value=5,
-        format_func=lambda x: f"{x}분",
-    )
-    if auto_refresh:
-        st.markdown(
-            f'<div style="font-size:0.78rem; color:#16a34a; font-weight:700; '
-            f'padding:6px 10px; background:#f0fdf4; border-radius:6px; '
-            f'border:1px solid #86efac;">⏱ {refresh_interval}분마다 자동 갱신 중</div>',
-            unsafe_allow_html=True
-        )
-    else:
-        st.markdown(
-            '<div style="font-size:0.78rem; color:#6b7280; '
-            'padding:6px 10px; background:#f9fafb; border-radius:6px; '
-            'border:1px solid #e2e8f0;">⏸ 자동 갱신 꺼짐</div>',
-            unsafe_allow_html=True
+
+    @st.fragment(key="sidebar_refresh")
+    @METRICS.timed("dq_fragment_seconds", fragment="sidebar_refresh")
+    def refresh_settings():
+        # 토글·주기 변경은 이 조각만 재실행 — 타이머가 실제로 울렸을 때만 앱 전체를 다시 실행
+        auto_refresh = st.toggle("자동 새로고침 ON/OFF", value=True)
+        refresh_interval = st.select_slider(
+            "갱신 주기",
+            options=[1, 3, 5, 10, 15, 30],
+            value=5,
+            format_func=lambda x: f"{x}분",
         )
+        if auto_refresh:
+            st.markdown(
+                f'<div style="font-size:0.78rem; color:#16a34a; font-weight:700; '
+                f'padding:6px 10px; background:#f0fdf4; border-radius:6px; '
+                f'border:1px solid #86efac;">⏱ {refresh_interval}분마다 자동 갱신 중</div>',
+                unsafe_allow_html=True
+            )
+        else:
+            st.markdown(
+                '<div style="font-size:0.78rem; color:#6b7280; '
+                'padding:6px 10px; background:#f9fafb; border-radius:6px; '
+                'border:1px solid #e2e8f0;">⏸ 자동 갱신 꺼짐</div>',
+                unsafe_allow_html=True
+            )
+
+        if auto_refresh:
+            ticks = st_autorefresh(
+                interval=refresh_interval * 60 * 1000,  # 밀리초 단위
+                key="data_autorefresh",
+            )
+            if ticks != st.session_state.setdefault("_autorefresh_ticks", ticks):
+                st.session_state["_autorefresh_ticks"] = ticks
+                st.rerun()
+
+    refresh_settings()
 
     st.markdown("---")
     st.markdown("### 📊 판정 기준")
@@ -437,68 +496,170 @@ with st.sidebar:
     """, unsafe_allow_html=True)
 
     st.markdown("---")
-    refresh_btn = st.button("🔄 데이터 새로고침", use_container_width=True)
+    refresh_btn = st.button("🔄 데이터 새로고침", width="stretch")
 
     st.markdown("---")
     # 로그아웃 버튼
-    if st.button("🔒 로그아웃", use_container_width=True):
+    if st.button("🔒 로그아웃", width="stretch"):
         st.session_state.authenticated = False
         st.rerun()
 
 
-# ── 자동 새로고침 실행 ────────────────────────────────────────────────────────
-# auto_refresh, refresh_interval 은 사이드바 with 블록 안에서 정의됨
-try:
-    if auto_refresh:
-        st_autorefresh(
-            interval=refresh_interval * 60 * 1000,  # 밀리초 단위
-            key="data_autorefresh",
-        )
-except Exception:
-    pass  # 사이드바가 아직 렌더링 전일 경우 무시
+render_sw.lap("sidebar")
 
 # ── 데이터 수집 ───────────────────────────────────────────────────────────────
-@st.cache_data(ttl=300)
-def fetch_data(period: str):
-    tickers = {
-        "TNX": "^TNX",
-        "SPX": "^GSPC",
-        "EEM": "EEM",
-        "EMB": "EMB",
-        "DXY": "DX-Y.NYB",
-        "IRX": "^IRX",
-    }
-    data = {}
-    for name, ticker in tickers.items():
-        try:
-            df = yf.download(ticker, period=period, progress=False, auto_adjust=True)
-            if not df.empty:
-                data[name] = df["Close"].squeeze()
-        except Exception:
-            pass
-    return data
-
+@st.cache_resource
+def get_data_source():
+    # 시세 제공자(DQ_PROVIDER: yfinance | replay)와 디스크 가격 저장소 (프로세스당 1개, 재시작 후에도 이력 유지)
+    # 재생 데이터가 실시간 이력을 덮어쓰지 않도록 저장소는 제공자별로 분리
+    provider = get_provider()
+    return provider, PriceStore(DATA_DIR / "prices" / provider.name)
+
+@st.cache_resource
+def get_ticker_cache():
+    # 종목별 마지막 정상값 — 종목마다 TTL 이 따로 있고, 실패·지연 종목은 이 값으로 대신 표시
+    return TickerCache()
+
+@st.cache_resource
+def get_refresher():
+    # 서버 프로세스당 하나의 백그라운드 갱신 스레드 — 모든 세션이 같은 스냅샷을 읽음
+    # CHECK_SECONDS 마다 TTL 이 지난 종목만 스레드 풀로 동시에 요청하고, 저장된 이력 이후의 봉만
+    # 받아 이어 붙인 뒤 가장 긴 조회 기간(상위 집합)만 스냅샷에 보관
+    provider, store = get_data_source()
+    cache = get_ticker_cache()
+    return MarketRefresher(
+        lambda: fetch_prices(SUPERSET_PERIOD, store=store, provider=provider, cache=cache),
+        interval=CHECK_SECONDS, status_fn=cache.status, dtype=PRICE_DTYPE,
+    ).start()
+
+@st.cache_resource
+def get_intraday_stream(interval: str):
+    # 분봉 스트림 — 프로세스 공용 링 버퍼, 백그라운드 스레드가 새 봉만 받아 추가
+    # 카드·차트에 표시하는 종목만 (나머지는 일봉으로 충분)
+    provider, _ = get_data_source()
+    return IntradayStream(interval, {**REGISTRY.tickers("card"), **REGISTRY.tickers("chart")},
+                          provider=provider).start()
+
+@st.cache_resource
+def get_quote_store():
+    # 탭2 호가 이력 (SQLite, 추가 전용) — 쓰기는 백그라운드 스레드가 담당
+    return QuoteStore()
+
+@st.cache_resource
+def get_corr_history(window: int):
+    # 롤링 상관계수 이력 — 프로세스 공용, 스냅샷이 바뀌면 새 봉만 추가 계산
+    return CorrelationHistory(window, REGISTRY.keys("chart"))
+
+@st.cache_resource
+def get_alert_engine():
+    # 알림 규칙은 갱신 스레드가 스냅샷마다 한 번 평가 — 새 알림만 기록(alerts.sqlite)·전송, 세션은 결과만 읽음
+    engine = AlertEngine(store=AlertStore())
+    get_refresher().subscribe(engine.on_snapshot)
+    return engine
+
+@st.cache_resource
+def get_verdict_history():
+    # 판정 이력 — 갱신 스레드가 스냅샷마다 점수·입력·판정을 verdicts.sqlite 에 추가 (CIP 입력은 호가 이력 최신값)
+    history = VerdictHistory(quotes=get_quote_store())
+    get_refresher().subscribe(history.on_snapshot)
+    return history
+
+refresher = get_refresher()
+alert_engine = get_alert_engine()
+verdict_history = get_verdict_history()
 if refresh_btn:
-    st.cache_data.clear()
+    with st.spinner("📡 yfinance로 시장 데이터 수신 중..."):
+        get_ticker_cache().invalidate()   # TTL 이 남은 종목도 다시 요청
+        refresher.refresh()   # 동시에 누른 세션이 여러 개여도 실제 수집은 한 번
 
+# 페이지 재실행은 게시된 스냅샷만 읽음 (프로세스 기동 직후 첫 수집 때만 대기)
 with st.spinner("📡 yfinance로 시장 데이터 수신 중..."):
-    market_data = fetch_data(period_option)
+    snapshot = refresher.snapshot()
+superset_data, fetch_timings, fetch_status = snapshot.data, snapshot.timings, snapshot.status
+frame = snapshot.frame   # 공통 거래일 정렬 행렬 — 최근값·전일값·변화율 모두 여기서 O(1) 조회
+
+# 조회 기간 변경은 캐시된 상위 집합을 메모리에서 잘라내기만 함 (네트워크 I/O 없음)
+market_data = slice_period(superset_data, period_option)
+period_start = min((s.index[0] for s in market_data.values() if not s.empty), default=None)
+
+@st.cache_resource
+def get_active_sessions():
+    # {세션 id: 마지막 실행 시각} — 메모리 보고용 (세션은 스냅샷의 뷰만 들고 있으므로 개수만 기록)
+    return {}
+
+_ctx = get_script_run_ctx()
+if _ctx is not None:
+    _sessions = get_active_sessions()
+    _sessions[_ctx.session_id] = time.time()
+    if len(_sessions) > 256:   # 닫힌 세션 정리
+        for sid, t in list(_sessions.items()):
+            if time.time() - t > 3600:
+                _sessions.pop(sid, None)
+
+render_sw.lap("data")
 
 # ── 헬퍼 함수 ─────────────────────────────────────────────────────────────────
 def last_val(key):
-    if key in market_data and not market_data[key].empty:
-        return float(market_data[key].dropna().iloc[-1])
-    return None
+    return frame.last_of(key)
 
 def prev_val(key):
-    s = market_data[key].dropna() if key in market_data else pd.Series(dtype=float)
-    return float(s.iloc[-2]) if len(s) >= 2 else None
+    return frame.prev_of(key)
 
 def delta_pct(key):
-    c, p = last_val(key), prev_val(key)
-    if c and p and p != 0:
-        return (c - p) / p * 100
-    return None
+    return frame.delta_of(key)
+
+# 종목이 많아도 한 화면에 그리는 블록 수가 일정하도록 구역별 페이지 크기
+PAGE_SIZE = {"card": 10, "direction": 8, "summary": 12}
+
+def paginate(items, view, label="페이지"):
+    # 한 페이지 분량만 반환 — 여러 페이지일 때만 페이지 선택 위젯 표시
+    size  = PAGE_SIZE[view]
+    pages = -(-len(items) // size)
+    if pages <= 1:
+        return items
+    page = st.pills(f"{label} · 총 {len(items)}종목", list(range(1, pages + 1)), default=1,
+                    key=f"page_{view}") or 1
+    return items[(page - 1) * size: page * size]
+
+def metric_card(inst, v, d, suffix="", extra=""):
+    # 메트릭 카드 HTML 한 개 (빈 줄 없이 한 덩어리 — 여러 장을 한 번의 markdown 으로 그림)
+    if not v:
+        return (f'<div class="metric-card"><div class="metric-label">{inst.label}{suffix}</div>'
+                f'<div class="metric-value gray">–</div><div class="metric-delta gray">데이터 없음</div></div>')
+    color = "gray" if d is None else "green" if d >= 0 else "red"
+    delta_str = "–" if d is None else f"{'▲' if d >= 0 else '▼'} {abs(d):.2f}%"
+    return (f'<div class="metric-card"><div class="metric-label">{inst.label}{suffix}</div>'
+            f'<div class="metric-value {color}">{inst.fmt.format(v)}</div>'
+            f'<div class="metric-delta {color}">{delta_str}</div>{extra}</div>')
+
+def age_badge(key):
+    # 종목 값의 나이 — TTL 안이면 회색, 지났거나 마지막 갱신이 실패했으면 주황색
+    status = fetch_status.get(key)
+    age = status.age() if status else None
+    if age is None:
+        return ""
+    age_str = f"{age:.0f}초 전" if age < 60 else f"{age // 60:.0f}분 전" if age < 3600 else f"{age // 3600:.0f}시간 전"
+    if status.error:
+        return f'<div class="metric-age stale" title="{html.escape(status.error)}">⚠️ 갱신 실패 · {age_str}</div>'
+    if status.stale():
+        return f'<div class="metric-age stale">⏳ {age_str}{" · 갱신 중" if status.refreshing else ""}</div>'
+    return f'<div class="metric-age">⏱ {age_str}</div>'
+
+def cip_defaults():
+    # 탭2 CIP 입력 위젯 키 → 기본값 (compute_cip 인자 순서)
+    irx = last_val("IRX")
+    return {
+        "cip_spot":     analysis.DEFAULT_SPOT,
+        "cip_us_3m":    float(round(irx, 2)) if irx else analysis.DEFAULT_US_3M,
+        "cip_kr_3m":    analysis.DEFAULT_KR_3M,
+        "cip_days":     analysis.DEFAULT_DAYS,
+        "cip_swap_bid": analysis.DEFAULT_SWAP_BID,
+        "cip_swap_ask": analysis.DEFAULT_SWAP_ASK,
+    }
+
+def cip_inputs():
+    # 현재 CIP 입력값 — 위젯이 아직 그려지기 전이면 기본값
+    return tuple(st.session_state.get(k, v) for k, v in cip_defaults().items())
 
 
 # ── 헤더 ──────────────────────────────────────────────────────────────────────
@@ -507,56 +668,62 @@ with col_hd1:
     st.markdown("# 💵 달러 강세 품질 분석 대시보드")
     st.markdown(
         f"<span style='color:#718096; font-size:0.85rem;'>yfinance 자동수집 · 3단계 분석 시스템 · "
-        f"업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</span>",
+        f"업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} · "
+        f"데이터 기준: {snapshot.fetched_at.strftime('%H:%M:%S')}</span>",
         unsafe_allow_html=True
     )
 with col_hd2:
     st.markdown("<br>", unsafe_allow_html=True)
     data_count = len(market_data)
-    if data_count >= 5:
-        st.success(f"✅ {data_count}/6 종목 수집 완료")
+    stale_count = sum(1 for name in market_data if name in fetch_status and fetch_status[name].stale())
+    if all(k in market_data for k in SCORE_KEYS):   # 판정에 필요한 종목이 모두 있으면 정상
+        st.success(f"✅ {data_count}/{len(TICKERS)} 종목 수집 완료"
+                   + (f" · {stale_count}종목 이전 값" if stale_count else ""))
     elif data_count > 0:
-        st.warning(f"⚠️ {data_count}/6 종목만 수집됨")
+        st.warning(f"⚠️ {data_count}/{len(TICKERS)} 종목만 수집됨")
     else:
         st.error("❌ 데이터 수집 실패")
+    with st.expander("⏱ 종목별 수집 시간"):
+        # 병렬 수집이므로 전체 대기 시간 ≈ 가장 느린 종목, 순차 수집이었다면 합계만큼 소요
+        # 이번 갱신에서 요청하지 않은 종목(TTL 이 남음)은 캐시로 표시
+        # 묶음 요청으로 받은 종목은 종목별 시간이 없음 (묶음 시간은 dq_fetch_batch_seconds)
+        batched = len(TICKERS) > BATCH_MIN and get_data_source()[0].batch_size > 1
+        ok_secs = [sec for sec in fetch_timings.values() if not pd.isna(sec)]
+        timing_rows = ""
+        for name in TICKERS:
+            sec = fetch_timings.get(name)
+            sec_str = ("캐시" if sec is None else ("묶음 요청" if batched else "시간 초과") if pd.isna(sec)
+                       else f"{sec * 1000:,.0f} ms")
+            timing_rows += (
+                f"<div style='display:flex; justify-content:space-between;'>"
+                f"<span>{name}</span><span style='font-family:monospace;'>{sec_str}</span></div>"
+            )
+        st.markdown(
+            f"<div style='font-size:0.8rem; color:#374151;'>{timing_rows}"
+            f"<div style='margin-top:6px; color:#718096;'>"
+            f"병렬 {max(ok_secs, default=0) * 1000:,.0f} ms · 순차 합계 {sum(ok_secs) * 1000:,.0f} ms</div></div>",
+            unsafe_allow_html=True
+        )
 
 st.markdown("---")
 
-# ── 상단 메트릭 5개 ───────────────────────────────────────────────────────────
-metrics_config = [
-    ("DXY", "달러 지수 (DXY)", "{:.2f}", ""),
-    ("TNX", "미국 10Y 금리",   "{:.2f}%", ""),
-    ("SPX", "S&P 500",        "{:,.0f}", ""),
-    ("EEM", "EEM 신흥국주식",  "${:.2f}", ""),
-    ("EMB", "EMB 신흥국채권",  "${:.2f}", ""),
-]
-cols = st.columns(5)
-for i, (key, label, fmt, _) in enumerate(metrics_config):
-    with cols[i]:
-        v = last_val(key)
-        d = delta_pct(key)
-        if v:
-            color = "green" if (d or 0) >= 0 else "red"
-            arr   = "▲" if (d or 0) >= 0 else "▼"
-            delta_str = f"{arr} {abs(d):.2f}%" if d is not None else "–"
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-label">{label}</div>
-                <div class="metric-value {color}">{fmt.format(v)}</div>
-                <div class="metric-delta {color}">{delta_str}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-label">{label}</div>
-                <div class="metric-value gray">–</div>
-                <div class="metric-delta gray">데이터 없음</div>
-            </div>
-            """, unsafe_allow_html=True)
+render_sw.lap("header")
+
+# ── 상단 메트릭 카드 ─────────────────────────────────────────────────────────
+# 설정 파일에서 card 로 지정한 종목 — 페이지당 PAGE_SIZE["card"] 장을 markdown 한 번으로 그림
+card_items = paginate(REGISTRY.view("card"), "card")
+st.markdown(
+    '<div class="metric-grid">'
+    + "".join(metric_card(inst, last_val(inst.key), delta_pct(inst.key), extra=age_badge(inst.key))
+              for inst in card_items)
+    + "</div>",
+    unsafe_allow_html=True,
+)
 
 st.markdown("<br>", unsafe_allow_html=True)
 
+render_sw.lap("metrics")
+
 # ── 탭 ────────────────────────────────────────────────────────────────────────
 tab1, tab2, tab3 = st.tabs([
     "📊 1단계: 동행성 분석",
@@ -571,6 +738,11 @@ PLOTLY_LIGHT = dict(
     plot_bgcolor="#f8fafc",
     font=dict(color="#1a202c", family="Arial, sans-serif"),
 )
+# 추세 차트 점 수 상한 — wide 레이아웃 차트 폭(≈1,400px) 기준 픽셀당 1점
+TREND_MAX_POINTS = 1400
+WEBGL_MIN_POINTS = 1000   # 트레이스당 점이 이보다 많으면 Scattergl 사용
+QUOTE_HISTORY_SECONDS = 10   # 탭2 호가 이력 조각 재실행 주기 — 저장소가 그대로면 캐시만 읽음
+
 # 축 스타일 헬퍼 함수 (Plotly 호환 키만 사용)
 def ax(title="", show_grid=True):
     d = dict(
@@ -588,93 +760,132 @@ def ax(title="", show_grid=True):
 # TAB 1: 동행성 분석
 # ════════════════════════════════════════════════════════════════════════════
 with tab1:
-    st.markdown("### 📈 핵심 지표 정규화 추세 비교")
+    chart_items = REGISTRY.view("chart")   # 추세·상관 차트에 그릴 종목 (설정 파일 chart)
+
+    if intraday_interval:
+        @METRICS.cached("intraday_figure", st.cache_resource(max_entries=4, show_spinner=False))
+        def intraday_figure(interval: str, version: int, _returns):
+            # 새 봉이 들어와 버전이 바뀔 때만 다시 생성 (기준값이 전일 종가로 고정이라 재정규화 없음)
+            fig = go.Figure()
+            for inst in chart_items:
+                if inst.key in _returns:
+                    r, color, label = _returns[inst.key], inst.color, inst.label
+                    fig.add_trace(go.Scatter(
+                        x=r.index, y=r.values, name=label,
+                        line=dict(color=color, width=2),
+                        hovertemplate=f"<b>{label}</b><br>%{{x|%H:%M}}<br>%{{y:+.2f}}%<extra></extra>",
+                    ))
+            fig.add_hline(y=0, line_dash="dot", line_color="#9ca3af", line_width=1.2)
+            fig.update_layout(
+                **PLOTLY_LIGHT,
+                height=300,
+                title=dict(text=f"장중 전일 종가 대비 변화율 ({interval})", font=dict(size=14, color="#1a202c")),
+                xaxis=ax(),
+                yaxis=ax("변화율 (%)"),
+                legend=dict(bgcolor="white", bordercolor="#cbd5e1", borderwidth=1,
+                            font=dict(color="#1a202c", size=12)),
+                hovermode="x unified",
+                margin=dict(t=50, b=30, l=10, r=10),
+            )
+            return fig
+
+        @st.fragment(run_every=INTERVAL_SECONDS[intraday_interval] // 2)
+        @METRICS.timed("dq_fragment_seconds", fragment="intraday")
+        def intraday_panel():
+            # 일봉 스냅샷과 무관하게 이 조각만 주기적으로 재실행 — 링 버퍼에서 최신값만 읽음
+            stream = get_intraday_stream(intraday_interval)
+            st.markdown("### ⚡ 장중 스트리밍")
+            if stream.polled_at is None:
+                st.info("📡 분봉 첫 수집 중입니다..." + (f" (직전 시도 실패: {stream.last_error})" if stream.last_error else ""))
+                return
+            deltas = stream.deltas()
+            st.markdown(
+                '<div class="metric-grid">'
+                + "".join(metric_card(inst, stream.last_of(inst.key), deltas.get(inst.key), suffix=" · 장중")
+                          for inst in card_items)
+                + "</div>",
+                unsafe_allow_html=True,
+            )
+            for atype, msg in build_alerts(deltas):
+                st.markdown(f'<div class="alert-{atype}">{msg}</div>', unsafe_allow_html=True)
+            returns_i = stream.session_returns()
+            if returns_i:
+                st.plotly_chart(intraday_figure(intraday_interval, stream.version, returns_i), width="stretch")
+            st.caption(f"마지막 폴링 {datetime.fromtimestamp(stream.polled_at):%H:%M:%S} · "
+                       f"버퍼 {stream.memory_bytes() / 1024:,.0f} KB (종목당 최대 {BUFFER_BARS:,}봉)")
+            if stream.last_error:
+                st.caption(f"⚠️ 분봉 수집 실패: {stream.last_error}")
+
+        intraday_panel()
+        st.markdown("---")
 
-    def normalize(series):
-        s = series.dropna()
-        if s.empty: return s
-        return (s - s.min()) / (s.max() - s.min()) * 100
-
-    colors_map = {
-        "TNX": ("#dc2626", "미국 10Y 금리"),
-        "SPX": ("#16a34a", "S&P 500"),
-        "EEM": ("#2563eb", "EEM 신흥국주식"),
-        "EMB": ("#d97706", "EMB 신흥국채권"),
-        "DXY": ("#7c3aed", "달러 지수 (DXY)"),
-    }
+    st.markdown("### 📈 핵심 지표 정규화 추세 비교")
 
-    fig = go.Figure()
-    has_data = False
-    for key, (color, label) in colors_map.items():
-        if key in market_data:
-            norm = normalize(market_data[key])
-            if not norm.empty:
-                has_data = True
-                fig.add_trace(go.Scatter(
-                    x=norm.index, y=norm.values,
-                    name=label,
-                    line=dict(color=color, width=2.2),
-                    hovertemplate=f"<b>{label}</b><br>날짜: %{{x|%Y-%m-%d}}<br>정규화: %{{y:.1f}}<extra></extra>"
-                ))
+    @METRICS.cached("trend_figure", st.cache_resource(max_entries=16, show_spinner=False))
+    def trend_figure(data_fp: str, period: str, _data):
+        # 데이터 지문·조회 기간이 같으면 이미 만든 Figure 를 프로세스 공용으로 재사용
+        # → 탭2 입력 등 무관한 위젯 조작으로 인한 재실행에서는 정규화·다운샘플링·Plotly 생성을 모두 생략
+        fig = go.Figure()
+        has_data = False
+        for inst in chart_items:
+            if inst.key in _data:
+                color, label = inst.color, inst.label
+                norm = normalize(_data[inst.key])
+                if not norm.empty:
+                    has_data = True
+                    # 차트 폭 이상의 점은 화면에 구분되지 않으므로 모양을 유지한 채 점 수 상한 적용,
+                    # 그래도 점이 많은 트레이스(장기·분봉)는 SVG 대신 WebGL 로 렌더링
+                    norm  = downsample(norm, TREND_MAX_POINTS)
+                    trace = go.Scattergl if len(norm) > WEBGL_MIN_POINTS else go.Scatter
+                    fig.add_trace(trace(
+                        x=norm.index, y=norm.values,
+                        name=label,
+                        line=dict(color=color, width=2.2),
+                        hovertemplate=f"<b>{label}</b><br>날짜: %{{x|%Y-%m-%d}}<br>정규화: %{{y:.1f}}<extra></extra>"
+                    ))
+
+        fig.update_layout(
+            **PLOTLY_LIGHT,
+            height=380,
+            title=dict(text="핵심 지표 정규화 비교 (0~100 스케일)",
+                       font=dict(size=14, color="#1a202c")),
+            xaxis=ax(),
+            yaxis=ax("정규화 값 (0~100)"),
+            legend=dict(
+                bgcolor="white", bordercolor="#cbd5e1", borderwidth=1,
+                font=dict(color="#1a202c", size=12),
+            ),
+            hovermode="x unified",
+            margin=dict(t=50, b=30, l=10, r=10),
+        )
+        return fig, has_data
 
-    fig.update_layout(
-        **PLOTLY_LIGHT,
-        height=380,
-        title=dict(text="핵심 지표 정규화 비교 (0~100 스케일)",
-                   font=dict(size=14, color="#1a202c")),
-        xaxis=ax(),
-        yaxis=ax("정규화 값 (0~100)"),
-        legend=dict(
-            bgcolor="white", bordercolor="#cbd5e1", borderwidth=1,
-            font=dict(color="#1a202c", size=12),
-        ),
-        hovermode="x unified",
-        margin=dict(t=50, b=30, l=10, r=10),
-    )
+    fig, has_data = trend_figure(snapshot.fingerprint, period_option, market_data)
 
     if has_data:
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, width="stretch")
     else:
         st.warning("⚠️ 시장 데이터를 가져오지 못했습니다. 🔄 새로고침을 눌러보세요.")
 
     # 판독 + 방향 요약
     col_alert, col_dir = st.columns([3, 2])
 
-    tnx_d = delta_pct("TNX"); spx_d = delta_pct("SPX")
-    eem_d = delta_pct("EEM"); emb_d = delta_pct("EMB")
-    dxy_d = delta_pct("DXY")
-
     with col_alert:
         st.markdown("#### 🚨 자동 판독 알림")
-        alerts = []
-
-        if tnx_d is not None and spx_d is not None:
-            if tnx_d > 0 and spx_d > 0:
-                alerts.append(("success", "✅ 성장 달러 신호: 금리↑ + 주식↑ 동반 상승 → 미국 경제 성장 기대 반영. 달러 강세는 구조적 성격."))
-            elif tnx_d > 0 and spx_d < 0:
-                alerts.append(("danger", "🚨 공포 달러 경고: 금리↑ + 주식↓ 역방향 발생 → 위험회피 국면. EM 자금 이탈 주의!"))
-            elif tnx_d < 0 and spx_d < 0:
-                alerts.append(("warning", "⚠️ 복합 약세 신호: 금리↓ + 주식↓ 동반 하락 → 경기침체 우려. 안전자산 수요 점검 필요."))
-            else:
-                alerts.append(("info", "💡 유동성 랠리 신호: 금리↓ + 주식↑ → 완화적 금융 환경. 달러 강세 지속성 불투명."))
-
-        if eem_d is not None and emb_d is not None:
-            if eem_d < -1.0 and emb_d < -1.0:
-                alerts.append(("danger", "🚨 EM 전면 이탈: EEM + EMB 동반 급락 → 신흥국 유동성 위기 경고!"))
-            elif eem_d < -0.5 or emb_d < -0.5:
-                alerts.append(("warning", "⚠️ EM 부분 이탈 감지: 신흥국 자산 선별적 약세. 달러 강세 압력 지속 중."))
+        # 갱신 스레드가 평가·기록·전송한 결과를 읽기만 함 — 아직 반영 전이면 화면용으로 평가만
+        alert_result = alert_engine.result_for(snapshot)
 
-        if dxy_d is not None:
-            if dxy_d > 0.5:
-                alerts.append(("warning", f"📊 DXY 강세 가속 (+{dxy_d:.2f}%): 달러 지수 급등 → 원화·신흥국 통화 압박 예상."))
-            elif dxy_d < -0.5:
-                alerts.append(("info", f"📊 DXY 약세 전환 ({dxy_d:.2f}%): 달러 지수 하락 → 위험자산 숨통."))
+        for a in alert_result.alerts:
+            st.markdown(f'<div class="alert-{a.level}">{a.message}</div>', unsafe_allow_html=True)
 
-        if not alerts:
-            alerts.append(("info", "📡 현재 뚜렷한 방향성 신호 없음. 지속 모니터링 권장."))
-
-        for atype, msg in alerts:
-            st.markdown(f'<div class="alert-{atype}">{msg}</div>', unsafe_allow_html=True)
+        with st.expander("🗂 최근 발생 알림"):
+            recent = alert_engine.store.recent(20)
+            if recent.empty:
+                st.caption("아직 기록된 알림이 없습니다.")
+            else:
+                st.dataframe(recent, hide_index=True, width="stretch")
+            if alert_engine.last_error:
+                st.caption(f"⚠️ 전송 실패: {alert_engine.last_error}")
 
     with col_dir:
         st.markdown("#### 📋 지표 방향 요약")
@@ -683,61 +894,80 @@ with tab1:
             if d >= 0: return f"▲ +{d:.2f}%", "green"
             return f"▼ {d:.2f}%", "red"
 
-        dir_items = [
-            ("미국 10Y 금리", delta_pct("TNX")),
-            ("S&P 500",       delta_pct("SPX")),
-            ("EEM 신흥국주식", delta_pct("EEM")),
-            ("EMB 신흥국채권", delta_pct("EMB")),
-            ("달러 지수 DXY",  delta_pct("DXY")),
-            ("미국 3M 금리",   delta_pct("IRX")),
-        ]
-        for lbl, d in dir_items:
-            txt, color = arrow_badge(d)
+        dir_rows = ""
+        for inst in paginate(REGISTRY.view("direction"), "direction"):
+            txt, color = arrow_badge(delta_pct(inst.key))
             # color 클래스 → 명시적 인라인 색상 (Streamlit Cloud 흰 글씨 방지)
             txt_hex = "#16a34a" if color == "green" else "#dc2626" if color == "red" else "#6b7280"
-            st.markdown(f"""
-            <div style="display:flex; justify-content:space-between; align-items:center;
-                        padding:10px 14px; background:white; border-radius:8px;
-                        border:1px solid #e2e8f0; margin:4px 0; font-size:0.84rem;
-                        box-shadow:0 1px 3px rgba(0,0,0,0.04);">
-                <span style="color:#374151; font-weight:600;">{lbl}</span>
-                <span style="font-weight:800; color:{txt_hex};">{txt}</span>
-            </div>
-            """, unsafe_allow_html=True)
+            dir_rows += (f'<div class="dir-row"><span style="color:#374151; font-weight:600;">{inst.label}</span>'
+                         f'<span style="font-weight:800; color:{txt_hex};">{txt}</span></div>')
+        st.markdown(dir_rows, unsafe_allow_html=True)
 
     # 상관관계 히트맵
     st.markdown("---")
     st.markdown("#### 🔥 지표 간 상관관계")
-    ret_series = []
-    ret_labels = {"TNX":"10Y금리","SPX":"S&P500","EEM":"EEM","EMB":"EMB","DXY":"DXY"}
-    for key, label in ret_labels.items():
-        if key in market_data:
-            s = market_data[key].dropna().pct_change().rename(label)
-            ret_series.append(s)
-
-    if len(ret_series) >= 2:
-        corr = pd.concat(ret_series, axis=1).corr()
-        fig_corr = go.Figure(go.Heatmap(
-            z=corr.values,
-            x=corr.columns.tolist(),
-            y=corr.index.tolist(),
-            colorscale=[[0,"#dc2626"],[0.5,"#f9fafb"],[1,"#16a34a"]],
-            zmin=-1, zmax=1,
-            text=np.round(corr.values, 2),
-            texttemplate="%{text}",
-            hovertemplate="<b>%{y} vs %{x}</b><br>상관계수: %{z:.2f}<extra></extra>",
-        ))
-        fig_corr.update_layout(
-            **PLOTLY_LIGHT,
-            height=300,
-            margin=dict(l=10, r=10, t=40, b=10),
-            title=dict(text="일간 수익률 상관계수", font=dict(size=13, color="#1a202c")),
-            xaxis=ax(),
-            yaxis=ax(),
-        )
-        # 히트맵 셀 텍스트 색상 명시
-        fig_corr.update_traces(textfont=dict(color="#1a202c", size=12))
-        st.plotly_chart(fig_corr, use_container_width=True)
+    ret_labels = {inst.key: inst.name for inst in chart_items}
+    ret_keys = [key for key in ret_labels if key in market_data]
+
+    if len(ret_keys) >= 2:
+        col_win, col_date = st.columns([1, 3])
+        with col_win:
+            corr_window = st.selectbox(
+                "상관계수 기간", ["전체", 20, 60, 120], index=0,
+                format_func=lambda w: "조회 기간 전체" if w == "전체" else f"최근 {w}거래일 롤링",
+            )
+
+        corr_mats, corr_pos, corr_date = None, None, None
+        if corr_window != "전체":
+            # 프로세스 공용 이력에 새 봉만 O(종목²) 으로 반영 → 날짜별 롤링 상관계수 행렬
+            corr_dates, corr_mats = get_corr_history(corr_window).update(
+                frame.returns(list(ret_labels))
+            )
+            in_period = np.flatnonzero(corr_dates >= period_start)
+            with col_date:
+                corr_pos = st.select_slider(
+                    "기준일", options=in_period.tolist(), value=int(in_period[-1]),
+                    format_func=lambda i: corr_dates[i].strftime("%Y-%m-%d"),
+                ) if len(in_period) > 1 else (int(in_period[-1]) if len(in_period) else len(corr_dates) - 1)
+            corr_date = corr_dates[corr_pos].strftime("%Y-%m-%d")
+
+        @METRICS.cached("corr_figure", st.cache_resource(max_entries=64, show_spinner=False))
+        def corr_figure(data_fp: str, period: str, window, as_of, _keys, _mats, _pos):
+            if window == "전체":
+                corr = frame.returns(_keys, start=period_start).corr()
+                title = "일간 수익률 상관계수"
+            else:
+                corr = pd.DataFrame(_mats[_pos], index=list(ret_labels), columns=list(ret_labels)).loc[_keys, _keys]
+                title = f"{window}거래일 롤링 상관계수 · {as_of}"
+            corr = corr.rename(index=ret_labels, columns=ret_labels)
+
+            fig_corr = go.Figure(go.Heatmap(
+                z=corr.values,
+                x=corr.columns.tolist(),
+                y=corr.index.tolist(),
+                colorscale=[[0,"#dc2626"],[0.5,"#f9fafb"],[1,"#16a34a"]],
+                zmin=-1, zmax=1,
+                text=np.round(corr.values, 2),
+                texttemplate="%{text}",
+                hovertemplate="<b>%{y} vs %{x}</b><br>상관계수: %{z:.2f}<extra></extra>",
+            ))
+            fig_corr.update_layout(
+                **PLOTLY_LIGHT,
+                height=300,
+                margin=dict(l=10, r=10, t=40, b=10),
+                title=dict(text=title, font=dict(size=13, color="#1a202c")),
+                xaxis=ax(),
+                yaxis=ax(),
+            )
+            # 히트맵 셀 텍스트 색상 명시
+            fig_corr.update_traces(textfont=dict(color="#1a202c", size=12))
+            return fig_corr
+
+        fig_corr = corr_figure(snapshot.fingerprint, period_option, corr_window, corr_date, ret_keys, corr_mats, corr_pos)
+        st.plotly_chart(fig_corr, width="stretch")
+
+
+render_sw.lap("tab1")
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -754,108 +984,259 @@ with tab2:
 
 
     # ── 입력값 먼저 수집 (위젯은 col_inp 안에) ────────────────────────────────
-    irx_val      = last_val("IRX")
-    default_us3m = round(irx_val, 2) if irx_val else 3.69
-
-    col_inp, col_result = st.columns([1.1, 1.9])
-
-    with col_inp:
-        st.markdown("#### 📝 데이터 입력")
-
-        if irx_val:
-            st.info(f"💡 yfinance 자동수집: 미국 3M = **{irx_val:.2f}%**")
-
-        spot     = st.number_input("현물 환율 (USD/KRW)",  value=1440.0,              step=1.0,  format="%.2f")
-        us_3m    = st.number_input("미국 3M 금리 (%)",     value=float(default_us3m), step=0.01, format="%.2f")
-        kr_3m    = st.number_input("한국 3M 금리 (%)",     value=2.70,                step=0.01, format="%.2f")
-        days     = st.slider("계약 만기 (일)",              min_value=30, max_value=365, value=90, step=30)
-        swap_bid = st.number_input("실제 스왑포인트 Bid",   value=-720.0,              step=1.0,  format="%.2f")
-        swap_ask = st.number_input("실제 스왑포인트 Ask",   value=-220.0,              step=1.0,  format="%.2f")
-
-    # ── CIP 계산 — with 블록 바깥에서 수행해야 탭3에서도 변수 접근 가능 ────────
-    t                = days / 360
-    domestic         = kr_3m / 100
-    foreign          = us_3m / 100
-    theoretical_rate = spot * (domestic - foreign) / (1 + foreign) * t
-    swap_mid         = (swap_bid + swap_ask) / 2
-    basis            = swap_bid - theoretical_rate
-    friction         = swap_ask - swap_bid
-    deviation_pct    = (basis / abs(theoretical_rate) * 100) if theoretical_rate != 0 else 0
-
-    with col_result:
-        st.markdown("#### 📊 CIP 계산 결과")
-
-        # 결과 카드 4개
-        res_cols = st.columns(2)
-
-        def result_card(label, value_str, color, sublabel=""):
-            return f"""
-            <div class="metric-card" style="margin-bottom:10px;">
-                <div class="metric-label">{label}</div>
-                <div class="metric-value {color}">{value_str}</div>
-                <div class="metric-delta gray">{sublabel}</div>
-            </div>"""
-
-        b_color = "red" if basis < -50 else "yellow" if basis < 0 else "green"
-        f_color = "red" if friction > 300 else "yellow" if friction > 150 else "green"
-
-        with res_cols[0]:
-            st.markdown(result_card("이론 스왑포인트 (CIP)", f"{theoretical_rate:+.2f}", "blue", f"{days}일 기준"), unsafe_allow_html=True)
-            st.markdown(result_card("베이시스 괴리 (Bid−이론가)", f"{basis:+.2f}", b_color, f"괴리율 {deviation_pct:+.1f}%"), unsafe_allow_html=True)
-        with res_cols[1]:
-            st.markdown(result_card("실제 스왑 Mid", f"{swap_mid:+.2f}", "gray", f"Bid {swap_bid:+.0f} / Ask {swap_ask:+.0f}"), unsafe_allow_html=True)
-            st.markdown(result_card("마찰계수 (Ask−Bid)", f"{friction:+.2f}", f_color, "시장 거래비용"), unsafe_allow_html=True)
-
-        # 막대 차트
-        fig_bar = go.Figure()
-        bar_colors = [
-            "#2563eb", "#d97706", "#d97706",
-            "#dc2626" if basis < -50 else "#d97706" if basis < 0 else "#16a34a"
-        ]
-        fig_bar.add_trace(go.Bar(
-            x=["이론가 (CIP)", "실제 Bid", "실제 Ask", "베이시스 괴리"],
-            y=[theoretical_rate, swap_bid, swap_ask, basis],
-            marker_color=bar_colors,
-            text=[f"{v:+.1f}" for v in [theoretical_rate, swap_bid, swap_ask, basis]],
-            textposition="outside",
-            hovertemplate="<b>%{x}</b><br>값: %{y:+.2f}<extra></extra>"
+    irx_val  = last_val("IRX")
+    defaults = cip_defaults()
+
+    def _rerun_cip():
+        # 바뀐 호가 묶음을 이력에 남기고(큐에 넣고 즉시 반환), 앱 전체 대신 CIP 계산기와 탭3 판정 조각만 재실행
+        get_quote_store().record(*cip_inputs())
+        st.rerun(["cip", "verdict"])
+
+    @METRICS.cached("cip_surface_view", st.cache_resource(max_entries=32, show_spinner=False))
+    def cip_surface_view(spot, us_3m, kr_3m, days, swap_bid, swap_ask, metric):
+        # 만기 × 충격 격자를 한 번의 브로드캐스팅으로 계산 → (히트맵, 기간 구조 곡선), 입력 조합별 캐시
+        surf = analysis.cip_surface(spot, us_3m, kr_3m, days, swap_bid, swap_ask)
+        i = int(np.searchsorted(surf.tenors, days))
+        z = surf.deviation_pct[:, :, i] if metric == "괴리율 (%)" else surf.basis[:, :, i]
+
+        fig_heat = go.Figure(go.Heatmap(
+            z=z, x=surf.spot_shocks, y=surf.rate_shocks,
+            colorscale="RdYlGn", zmid=0,
+            colorbar=dict(tickfont=dict(color="#1a202c")),
+            hovertemplate="현물 %{x:+.0f}%<br>금리차 %{y:+.0f}bp<br>" + metric + " %{z:+,.1f}<extra></extra>",
         ))
-        fig_bar.add_hline(y=0, line_dash="dot", line_color="#9ca3af", line_width=1.5)
-        fig_bar.update_layout(
+        fig_heat.update_layout(
             **PLOTLY_LIGHT,
-            height=280,
-            title=dict(text="이론가 vs 실제 스왑 포인트 비교",
-                       font=dict(size=13, color="#1a202c")),
-            xaxis=ax(),
+            height=340,
+            title=dict(text=f"{days}일 만기 {metric} 민감도", font=dict(size=13, color="#1a202c")),
+            xaxis=ax("현물 환율 충격 (%)"),
+            yaxis=ax("금리차 충격 (bp)"),
+            margin=dict(t=50, b=30, l=10, r=10),
+        )
+
+        fig_curve = go.Figure()
+        j0 = int(np.searchsorted(surf.spot_shocks, 0))
+        for k, dash in ((0, "dot"), (len(surf.rate_shocks) // 2, "solid"), (len(surf.rate_shocks) - 1, "dot")):
+            fig_curve.add_trace(go.Scatter(
+                x=surf.tenors, y=surf.theoretical[k, j0],
+                name=f"이론가 ({surf.rate_shocks[k]:+.0f}bp)",
+                line=dict(color="#2563eb", width=2, dash=dash),
+            ))
+        fig_curve.add_trace(go.Scatter(x=surf.tenors, y=surf.swap_bid, name="Bid (만기 비례)",
+                                       line=dict(color="#d97706", width=2)))
+        fig_curve.add_trace(go.Scatter(x=surf.tenors, y=surf.swap_bid + surf.friction, name="Ask (만기 비례)",
+                                       line=dict(color="#d97706", width=1.5, dash="dash")))
+        fig_curve.add_trace(go.Scatter(x=[days], y=[swap_bid], name="입력 Bid", mode="markers",
+                                       marker=dict(color="#dc2626", size=10)))
+        fig_curve.update_layout(
+            **PLOTLY_LIGHT,
+            height=340,
+            title=dict(text="스왑 포인트 기간 구조", font=dict(size=13, color="#1a202c")),
+            xaxis=ax("만기 (일)"),
             yaxis=ax("스왑 포인트 (원)"),
+            legend=dict(orientation="h", y=-0.2, font=dict(color="#1a202c", size=11)),
+            hovermode="x unified",
             margin=dict(t=50, b=30, l=10, r=10),
-            showlegend=False,
         )
-        # 막대 위 숫자 텍스트도 진하게
-        fig_bar.update_traces(textfont=dict(color="#1a202c", size=12))
-        st.plotly_chart(fig_bar, use_container_width=True)
-
-        # 유동성 판정 신호
-        if basis < -200 or friction > 300:
-            sig_class, sig_emoji, sig_text = "signal-tight", "🚨", "경고: 달러 접근 경색 발생!"
-            sig_desc = f"베이시스 괴리 {basis:+.1f}pt / 마찰계수 {friction:.1f}pt → 달러 조달 비용 급등. 스왑시장 기능 저하 경보."
-        elif basis < -50 or friction > 150:
-            sig_class, sig_emoji, sig_text = "signal-fear", "⚠️", "주의: 유동성 골절 감지"
-            sig_desc = f"베이시스 이탈 {deviation_pct:.1f}% → CIP 조건 위반. 시장 마찰 상승 중."
-        elif basis > 0:
-            sig_class, sig_emoji, sig_text = "signal-growth", "✅", "정상: CIP 균형 유지"
-            sig_desc = "이론가 대비 실제 스왑 포인트 정상 범위. 달러 조달 원활."
+        return fig_heat, fig_curve
+
+    @st.fragment(key="cip")
+    @METRICS.timed("dq_fragment_seconds", fragment="cip")
+    def cip_calculator():
+        col_inp, col_result = st.columns([1.1, 1.9])
+
+        with col_inp:
+            st.markdown("#### 📝 데이터 입력")
+
+            if irx_val:
+                st.info(f"💡 yfinance 자동수집: 미국 3M = **{irx_val:.2f}%**")
+
+            spot     = st.number_input("현물 환율 (USD/KRW)",  value=defaults["cip_spot"],     step=1.0,  format="%.2f", key="cip_spot",     on_change=_rerun_cip)
+            us_3m    = st.number_input("미국 3M 금리 (%)",     value=defaults["cip_us_3m"],    step=0.01, format="%.2f", key="cip_us_3m",    on_change=_rerun_cip)
+            kr_3m    = st.number_input("한국 3M 금리 (%)",     value=defaults["cip_kr_3m"],    step=0.01, format="%.2f", key="cip_kr_3m",    on_change=_rerun_cip)
+            days     = st.slider("계약 만기 (일)",              min_value=30, max_value=365, value=defaults["cip_days"], step=30, key="cip_days", on_change=_rerun_cip)
+            swap_bid = st.number_input("실제 스왑포인트 Bid",   value=defaults["cip_swap_bid"], step=1.0,  format="%.2f", key="cip_swap_bid", on_change=_rerun_cip)
+            swap_ask = st.number_input("실제 스왑포인트 Ask",   value=defaults["cip_swap_ask"], step=1.0,  format="%.2f", key="cip_swap_ask", on_change=_rerun_cip)
+
+        # ── CIP 계산 — 탭3 판정 조각은 같은 입력을 session_state 에서 읽어 다시 계산 ────
+        cip = compute_cip(spot, us_3m, kr_3m, days, swap_bid, swap_ask)
+        theoretical_rate, swap_mid, basis, friction, deviation_pct = cip
+
+        with col_result:
+            st.markdown("#### 📊 CIP 계산 결과")
+
+            # 결과 카드 4개
+            res_cols = st.columns(2)
+
+            def result_card(label, value_str, color, sublabel=""):
+                return f"""
+                <div class="metric-card" style="margin-bottom:10px;">
+                    <div class="metric-label">{label}</div>
+                    <div class="metric-value {color}">{value_str}</div>
+                    <div class="metric-delta gray">{sublabel}</div>
+                </div>"""
+
+            b_color = "red" if basis < -50 else "yellow" if basis < 0 else "green"
+            f_color = "red" if friction > 300 else "yellow" if friction > 150 else "green"
+
+            with res_cols[0]:
+                st.markdown(result_card("이론 스왑포인트 (CIP)", f"{theoretical_rate:+.2f}", "blue", f"{days}일 기준"), unsafe_allow_html=True)
+                st.markdown(result_card("베이시스 괴리 (Bid−이론가)", f"{basis:+.2f}", b_color, f"괴리율 {deviation_pct:+.1f}%"), unsafe_allow_html=True)
+            with res_cols[1]:
+                st.markdown(result_card("실제 스왑 Mid", f"{swap_mid:+.2f}", "gray", f"Bid {swap_bid:+.0f} / Ask {swap_ask:+.0f}"), unsafe_allow_html=True)
+                st.markdown(result_card("마찰계수 (Ask−Bid)", f"{friction:+.2f}", f_color, "시장 거래비용"), unsafe_allow_html=True)
+
+            # 막대 차트
+            fig_bar = go.Figure()
+            bar_colors = [
+                "#2563eb", "#d97706", "#d97706",
+                "#dc2626" if basis < -50 else "#d97706" if basis < 0 else "#16a34a"
+            ]
+            fig_bar.add_trace(go.Bar(
+                x=["이론가 (CIP)", "실제 Bid", "실제 Ask", "베이시스 괴리"],
+                y=[theoretical_rate, swap_bid, swap_ask, basis],
+                marker_color=bar_colors,
+                text=[f"{v:+.1f}" for v in [theoretical_rate, swap_bid, swap_ask, basis]],
+                textposition="outside",
+                hovertemplate="<b>%{x}</b><br>값: %{y:+.2f}<extra></extra>"
+            ))
+            fig_bar.add_hline(y=0, line_dash="dot", line_color="#9ca3af", line_width=1.5)
+            fig_bar.update_layout(
+                **PLOTLY_LIGHT,
+                height=280,
+                title=dict(text="이론가 vs 실제 스왑 포인트 비교",
+                           font=dict(size=13, color="#1a202c")),
+                xaxis=ax(),
+                yaxis=ax("스왑 포인트 (원)"),
+                margin=dict(t=50, b=30, l=10, r=10),
+                showlegend=False,
+            )
+            # 막대 위 숫자 텍스트도 진하게
+            fig_bar.update_traces(textfont=dict(color="#1a202c", size=12))
+            st.plotly_chart(fig_bar, width="stretch")
+
+            # 유동성 판정 신호
+            liquidity = liquidity_level(basis, friction)
+            if liquidity == "tight":
+                sig_class, sig_emoji, sig_text = "signal-tight", "🚨", "경고: 달러 접근 경색 발생!"
+                sig_desc = f"베이시스 괴리 {basis:+.1f}pt / 마찰계수 {friction:.1f}pt → 달러 조달 비용 급등. 스왑시장 기능 저하 경보."
+            elif liquidity == "fracture":
+                sig_class, sig_emoji, sig_text = "signal-fear", "⚠️", "주의: 유동성 골절 감지"
+                sig_desc = f"베이시스 이탈 {deviation_pct:.1f}% → CIP 조건 위반. 시장 마찰 상승 중."
+            elif liquidity == "normal":
+                sig_class, sig_emoji, sig_text = "signal-growth", "✅", "정상: CIP 균형 유지"
+                sig_desc = "이론가 대비 실제 스왑 포인트 정상 범위. 달러 조달 원활."
+            else:
+                sig_class, sig_emoji, sig_text = "signal-neutral", "📊", "관찰: 소폭 괴리 발생"
+                sig_desc = f"경미한 베이시스 이탈 ({deviation_pct:.1f}%). 지속 모니터링 권장."
+
+            st.markdown(f"""
+            <div class="{sig_class}" style="margin-top:12px;">
+                <div class="signal-title">유동성 골절 판정</div>
+                <div class="signal-body">{sig_emoji} {sig_text}</div>
+                <div class="signal-desc">{sig_desc}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+    cip_calculator()
+
+    @st.fragment(key="cip_surface")
+    @METRICS.timed("dq_fragment_seconds", fragment="cip_surface")
+    def cip_surface_panel():
+        # 만기·충격 민감도 — 30~365일 전 만기 × 현물·금리차 충격
+        # 계산기 입력 경로(cip 조각)와 분리: 격자는 '현재 입력으로 갱신'을 누를 때만 새 입력으로 다시 계산
+        st.markdown("#### 🧮 만기 · 충격 민감도")
+        col_metric, col_update = st.columns([3, 1])
+        with col_metric:
+            surface_metric = st.radio("히트맵 지표", ["괴리율 (%)", "베이시스 (pt)"], horizontal=True,
+                                      key="cip_surface_metric")
+        with col_update:
+            update = st.button("🔄 현재 입력으로 갱신", key="cip_surface_update", width="stretch")
+        if update or "cip_surface_inputs" not in st.session_state:
+            st.session_state["cip_surface_inputs"] = cip_inputs()
+        s_spot, s_us, s_kr, s_days, s_bid, s_ask = st.session_state["cip_surface_inputs"]
+        fig_heat, fig_curve = cip_surface_view(s_spot, s_us, s_kr, s_days, s_bid, s_ask, surface_metric)
+        col_heat, col_curve = st.columns(2)
+        with col_heat:
+            st.plotly_chart(fig_heat, width="stretch")
+        with col_curve:
+            st.plotly_chart(fig_curve, width="stretch")
+        st.caption(f"계산 기준 입력: Spot {s_spot:,.2f} · 미국 {s_us:.2f}% · 한국 {s_kr:.2f}% · "
+                   f"{s_days}일 · Bid {s_bid:+.2f} / Ask {s_ask:+.2f}")
+
+    cip_surface_panel()
+
+    @METRICS.cached("quote_history_view", st.cache_resource(max_entries=8, show_spinner=False))
+    def quote_history_view(store_version: int, start, days, data_version: int, _quotes, _dxy):
+        # 저장소 내용(version)·기간·만기·시세 스냅샷이 같으면 조회와 Figure 를 프로세스 공용으로 재사용
+        qh = _quotes.history(start=start, days=days)
+        if qh.empty:
+            return 0, None, None, None
+        fig_q = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                              row_heights=[0.6, 0.4], specs=[[{"secondary_y": True}], [{}]])
+        # 가져온 이력이 길면 차트 폭 기준으로 다운샘플링 (건수 표시는 원본 기준)
+        mode = "lines+markers" if len(qh) <= 200 else "lines"
+        for col, label, color, row in (("basis", "베이시스", "#dc2626", 1), ("friction", "마찰계수", "#d97706", 1),
+                                       ("deviation_pct", "괴리율 (%)", "#2563eb", 2)):
+            y = downsample(qh[col], TREND_MAX_POINTS)
+            trace = go.Scattergl if len(y) > WEBGL_MIN_POINTS else go.Scatter
+            fig_q.add_trace(trace(x=y.index, y=y.values, name=label, mode=mode,
+                                  line=dict(color=color, width=2)), row=row, col=1)
+        if _dxy is not None:
+            dxy = _dxy[_dxy.index >= qh.index[0].normalize()]
+            fig_q.add_trace(go.Scatter(x=dxy.index, y=dxy.values, name="DXY",
+                                       line=dict(color="#7c3aed", width=1.5, dash="dot")),
+                            row=1, col=1, secondary_y=True)
+        fig_q.update_layout(
+            **PLOTLY_LIGHT,
+            height=420,
+            legend=dict(orientation="h", y=1.08, font=dict(color="#1a202c", size=11)),
+            hovermode="x unified",
+            margin=dict(t=40, b=30, l=10, r=10),
+        )
+        fig_q.update_xaxes(**ax())
+        fig_q.update_yaxes(**ax())
+        return len(qh), qh.index[0], qh.index[-1], fig_q
+
+    @st.fragment(key="quote_history", run_every=QUOTE_HISTORY_SECONDS)
+    @METRICS.timed("dq_fragment_seconds", fragment="quote_history")
+    def quote_history_panel():
+        # 입력 호가 이력 — 계산기 입력 경로(cip 조각) 밖에서 주기적으로만 다시 그림 (저장소가 그대로면 캐시)
+        st.markdown("#### 📜 스왑 호가 이력")
+        quotes = get_quote_store()
+        with st.expander("📥 호가 CSV 가져오기"):
+            st.caption("필수 열: date, bid, ask · 선택 열: spot, us_3m, kr_3m, days (없으면 위 입력값 사용)")
+            upload = st.file_uploader("스왑 호가 CSV", type="csv", key="quote_upload")
+            if upload is not None and st.button("가져오기", key="quote_import"):
+                in_spot, in_us, in_kr, in_days, _, _ = cip_inputs()
+                bar = st.progress(0.0, text="가져오는 중...")
+                size = max(upload.size, 1)
+                try:
+                    # 묶음 단위로 읽고 계산·저장 — 진행률은 읽은 바이트 기준
+                    result = import_quotes(upload, quotes, spot=in_spot, us_3m=in_us, kr_3m=in_kr, days=in_days,
+                                           progress=lambda _: bar.progress(min(upload.tell() / size, 1.0)))
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    bar.progress(1.0, text="완료")
+                    st.success(f"✅ {result['rows']:,}행 저장 · {result['skipped']:,}행 제외 · {result['seconds']:.1f}s")
+        hist_days = st.selectbox(
+            "만기", [None, *quotes.tenors()], index=0, key="quote_hist_days",
+            format_func=lambda d: "전체 만기" if d is None else f"{d}일",
+        )
+        if quotes.last_error or quotes.parked:
+            st.warning(f"⚠️ 호가 이력 저장 실패 ({quotes.last_error or '재시도 중단'}) · "
+                       f"저장 대기 {len(quotes.parked):,}행은 화면에만 표시됩니다.")
+        n, first, last, fig_q = quote_history_view(quotes.version, period_start, hist_days, snapshot.version,
+                                                   quotes, market_data.get("DXY"))
+        if fig_q is None:
+            st.caption("기록된 호가가 없습니다. 위 입력값을 바꾸면 시각과 함께 저장됩니다.")
         else:
-            sig_class, sig_emoji, sig_text = "signal-neutral", "📊", "관찰: 소폭 괴리 발생"
-            sig_desc = f"경미한 베이시스 이탈 ({deviation_pct:.1f}%). 지속 모니터링 권장."
+            st.plotly_chart(fig_q, width="stretch")
+            st.caption(f"{n:,}건 · {first:%Y-%m-%d %H:%M} ~ {last:%Y-%m-%d %H:%M} · "
+                       f"{QUOTE_HISTORY_SECONDS}초마다 새 입력 반영")
 
-        st.markdown(f"""
-        <div class="{sig_class}" style="margin-top:12px;">
-            <div class="signal-title">유동성 골절 판정</div>
-            <div class="signal-body">{sig_emoji} {sig_text}</div>
-            <div class="signal-desc">{sig_desc}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    quote_history_panel()
 
     st.markdown("---")
     st.markdown("""
@@ -865,6 +1246,107 @@ with tab2:
     - **마찰계수** = 실제 Ask − 실제 Bid
     """)
 
+    # ── 다통화 CIP 베이시스 스캐너 ────────────────────────────────────────────
+    st.markdown("---")
+    st.markdown("### 🌐 다통화 CIP 베이시스 스캐너")
+
+    LEVEL_LABELS = {"tight": "🚨 경색", "watch": "⚠️ 관찰", "normal": "🟢 정상"}
+
+    @METRICS.cached("cip_scan_view", st.cache_resource(max_entries=8, show_spinner=False))
+    def cip_scan_view(source_key: str, store_version: int, _quotes):
+        # 입력 파일·저장소 내용이 같으면 스캔 결과와 Figure 를 프로세스 공용으로 재사용
+        result = cip_scanner.scan(_quotes)
+        mat = cip_scanner.pivot(result)
+        fig = go.Figure(go.Heatmap(
+            z=mat.values, x=[f"{d}일" for d in mat.columns], y=mat.index.tolist(),
+            colorscale=[[0, "#16a34a"], [0.5, "#f9fafb"], [1, "#dc2626"]], zmid=0,
+            text=np.round(mat.values, 0), texttemplate="%{text}",
+            colorbar=dict(title="bp"),
+            hovertemplate="<b>%{y} · %{x}</b><br>달러 조달 프리미엄: %{z:+.1f}bp<extra></extra>",
+        ))
+        fig.update_layout(
+            **PLOTLY_LIGHT,
+            height=max(260, 28 * len(mat) + 80),
+            title=dict(text="달러 조달 프리미엄 (연율 bp, 통화쌍 × 만기)", font=dict(size=13, color="#1a202c")),
+            xaxis=ax(), yaxis=ax(),
+            margin=dict(t=40, b=10, l=10, r=10),
+        )
+        fig.update_yaxes(autorange="reversed")
+        fig.update_traces(textfont=dict(color="#1a202c", size=11))
+        return result, fig
+
+    @st.fragment(key="cip_scan")
+    @METRICS.timed("dq_fragment_seconds", fragment="cip_scan")
+    def cip_scan_panel():
+        # 업로드·옵션 변경은 이 조각만 재실행 — 통화쌍 × 만기 전체를 배열 연산 한 번으로 계산
+        col_src, col_opt = st.columns([3, 1])
+        with col_src:
+            upload = st.file_uploader(
+                "통화쌍 호가 CSV (pair, days, spot, base_rate, quote_rate, bid, ask)", type="csv",
+                key="cip_scan_upload",
+            )
+        with col_opt:
+            include_store = st.toggle("탭2 USD/KRW 호가 포함", value=True, key="cip_scan_store",
+                                      help="호가 이력 저장소의 만기별 최신 입력을 USDKRW 행으로 추가합니다. "
+                                           "탭2 와 같은 원 단위(pip 1)로 계산하므로 베이시스가 탭2 결과 카드와 같습니다.")
+        if upload is not None:
+            src, source_key = upload, f"upload:{upload.file_id}"
+        else:
+            path = cip_scanner.SCAN_FILE if cip_scanner.SCAN_FILE.exists() else cip_scanner.SAMPLE_FILE
+            src, source_key = path, f"{path}:{path.stat().st_mtime_ns if path.exists() else 0}"
+        store = get_quote_store()
+        try:
+            frames = [cip_scanner.load_quotes(src)] if upload is not None or Path(src).exists() else []
+            if include_store:
+                frames.append(cip_scanner.load_quotes(cip_scanner.from_store(store)))
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+        # 같은 통화쌍·만기가 겹치면 뒤쪽(탭2 최신 입력)을 사용
+        quotes = pd.concat(frames, ignore_index=True).drop_duplicates(["pair", "days"], keep="last") \
+            if frames else pd.DataFrame()
+        if quotes.empty:
+            st.info("스캔할 호가가 없습니다. CSV 를 올리거나 탭2 입력값을 바꿔 호가를 기록하세요.")
+            return
+
+        result, fig = cip_scan_view(source_key, store.version if include_store else -1, quotes)
+        counts = result["level"].value_counts()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("통화쌍", f"{result['pair'].nunique()}개 · {len(result)}건")
+        c2.metric("🚨 경색", int(counts.get("tight", 0)))
+        c3.metric("⚠️ 관찰", int(counts.get("watch", 0)))
+        top = result.iloc[0]
+        c4.metric("최대 프리미엄", f"{top['usd_premium_bp']:+.0f}bp", f"{top['pair']} {top['days']}일",
+                  delta_color="off")
+
+        col_heat, col_rank = st.columns([1, 1])
+        with col_heat:
+            st.plotly_chart(fig, width="stretch")
+        with col_rank:
+            st.dataframe(
+                pd.DataFrame({
+                    "통화쌍": result["pair"],
+                    "만기": result["days"],
+                    "이론 스왑": result["theoretical"].round(2),
+                    "베이시스": result["basis"].round(2),
+                    "마찰계수": result["friction"].round(2),
+                    "프리미엄(bp)": result["usd_premium_bp"].round(1),
+                    "스프레드(bp)": result["friction_bp"].round(1),
+                    "판정": result["level"].map(LEVEL_LABELS),
+                }),
+                hide_index=True, width="stretch", height=max(260, 28 * result["pair"].nunique() + 80),
+            )
+        st.caption(f"원본: {'업로드 파일' if upload is not None else Path(src).name}"
+                   f"{' + 호가 이력 저장소' if include_store else ''} · "
+                   f"포인트는 통화쌍별 pip 단위"
+                   f"{' (탭2 USD/KRW 행은 탭2 와 같은 원 단위)' if include_store else ''}, bp 는 현물 대비 연율 환산 · "
+                   f"관찰 ≥ {cip_scanner.PREMIUM_WATCH_BP}bp, 경색 ≥ {cip_scanner.PREMIUM_TIGHT_BP}bp")
+
+    cip_scan_panel()
+
+
+
+render_sw.lap("tab2")
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -873,140 +1355,237 @@ with tab2:
 with tab3:
     st.markdown("### 🏁 종합 판독: 오늘의 달러 품질")
 
-    tnx_d_v = delta_pct("TNX") or 0
-    spx_d_v = delta_pct("SPX") or 0
-    eem_d_v = delta_pct("EEM") or 0
-    emb_d_v = delta_pct("EMB") or 0
-    dxy_d_v = delta_pct("DXY") or 0
+    @st.fragment(key="verdict")
+    @METRICS.timed("dq_fragment_seconds", fragment="verdict")
+    def verdict_panel():
+        # 탭2 CIP 입력이 바뀌면 이 조각만 다시 실행 — 시세 기반 값은 스냅샷에서 O(1) 조회
+        theoretical_rate, swap_mid, basis, friction, deviation_pct = compute_cip(*cip_inputs())
 
-    growth_score = fear_score = tight_score = 0
+        tnx_d_v = delta_pct("TNX") or 0
+        spx_d_v = delta_pct("SPX") or 0
+        eem_d_v = delta_pct("EEM") or 0
+        emb_d_v = delta_pct("EMB") or 0
+        dxy_d_v = delta_pct("DXY") or 0
 
-    if tnx_d_v > 0 and spx_d_v > 0:   growth_score += 2
-    elif tnx_d_v > 0 and spx_d_v < 0: fear_score  += 2
-    elif tnx_d_v < 0 and spx_d_v < 0: fear_score  += 1
+        growth_score, fear_score, tight_score = compute_scores(
+            {"TNX": tnx_d_v, "SPX": spx_d_v, "EEM": eem_d_v, "EMB": emb_d_v, "DXY": dxy_d_v}, basis, friction
+        )
+        verdict = decide_verdict(growth_score, fear_score, tight_score)
 
-    if eem_d_v < -1.0:   fear_score   += 2
-    elif eem_d_v < 0:    fear_score   += 1
-    elif eem_d_v > 0.5:  growth_score += 1
+        verdict_map = {
+            "growth":  ("signal-growth",  "🦖 성장 달러", "달러 강세의 질이 '성장'에 기반합니다. 미국 경제 호조로 자금이 유입되는 구조적 강세국면. 위험자산과 달러가 함께 상승하는 이상적 환경입니다."),
+            "fear":    ("signal-fear",    "💀 공포 달러", "달러 강세의 질이 '공포'에 기반합니다. 위험회피 수요로 달러가 강세를 보이는 국면. 주식·EM 자산 동반 약세, 안전자산 선호 확대."),
+            "tight":   ("signal-tight",   "🔥 경색 달러", "달러 강세의 질이 '경색'에 기반합니다. CIP 이탈 및 스왑 마찰 심화. 달러 조달 비용 급등으로 금융시장 기능 저하 우려."),
+            "neutral": ("signal-neutral", "📊 관찰 구간", "현재 뚜렷한 달러 품질 판정이 어렵습니다. 추가 지표 모니터링과 데이터 입력을 권장합니다."),
+        }
 
-    if emb_d_v < -1.0:   fear_score   += 2
-    elif emb_d_v < 0:    fear_score   += 1
+        v_class, v_title, v_desc = verdict_map[verdict]
 
-    if dxy_d_v > 0.5:    fear_score   += 1
-    elif dxy_d_v < -0.5: growth_score += 1
+        col_v, col_s = st.columns([2, 1])
+        with col_v:
+            st.markdown(f"""
+            <div class="{v_class}" style="padding:32px;">
+                <div class="signal-title" style="font-size:0.85rem;">오늘의 달러 품질 판정</div>
+                <div class="signal-body" style="font-size:3rem; margin:14px 0;">{v_title}</div>
+                <div class="signal-desc" style="font-size:0.92rem;">{v_desc}</div>
+            </div>
+            """, unsafe_allow_html=True)
 
-    try:
-        if basis < -200:   tight_score += 3
-        elif basis < -50:  tight_score += 2
-        elif basis < 0:    tight_score += 1
-        if friction > 300: tight_score += 2
-        elif friction > 150: tight_score += 1
-    except Exception:
-        pass
+        with col_s:
+            st.markdown('<div class="score-section-title">📊 점수 분포</div>', unsafe_allow_html=True)
+            max_s = max(growth_score, fear_score, tight_score, 1)
+            score_bars = [
+                ("🟢 성장 달러", growth_score, "#16a34a", "#f0fdf4", "#86efac"),
+                ("🔴 공포 달러", fear_score,  "#dc2626", "#fff1f2", "#fca5a5"),
+                ("🟡 경색 달러", tight_score, "#d97706", "#fffbeb", "#fcd34d"),
+            ]
+            for label, score, bar_color, bg_color, border_color in score_bars:
+                bar_pct = int(score / max_s * 100)
+                st.markdown(f"""
+                <div style="background:{bg_color}; border:1px solid {border_color}; border-radius:10px;
+                            padding:12px 16px; margin:8px 0;">
+                    <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:7px;">
+                        <span style="font-size:0.88rem; font-weight:700; color:#1a202c;">{label}</span>
+                        <span style="font-size:1rem; font-weight:800; color:{bar_color};">{score}점</span>
+                    </div>
+                    <div style="background:#e2e8f0; border-radius:99px; height:10px; overflow:hidden;">
+                        <div style="width:{bar_pct}%; height:100%; background:{bar_color};
+                                    border-radius:99px; transition:width 0.6s ease;"></div>
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+
+        # 판정 타임라인 — 같은 점수 규칙을 조회 기간 전체에 한 번의 배열 연산으로 적용
+        st.markdown("### 🕰 판정 타임라인")
+        apply_cip = st.checkbox(
+            "탭2의 현재 베이시스·마찰계수를 전 기간에 적용",
+            value=False,
+            help="스왑 포인트 이력이 없으므로 체크 시 현재 입력값이 모든 날짜의 경색 점수에 동일하게 반영됩니다.",
+        )
+        verdict_colors = {"growth": "#16a34a", "fear": "#dc2626", "tight": "#d97706", "neutral": "#2563eb"}
+
+        @METRICS.cached("timeline_view", st.cache_resource(max_entries=32, show_spinner=False))
+        def timeline_view(data_fp: str, period: str, tl_basis: float, tl_friction: float):
+            # (timeline, 리본 Figure, 판정 구간표) — 같은 데이터·입력이면 재계산·재생성 없이 재사용
+            timeline = verdict_timeline(frame.returns(SCORE_KEYS, start=period_start), tl_basis, tl_friction)
+            if timeline.empty:
+                return timeline, None, None
+            fig_tl = go.Figure()
+            for v in VERDICTS:
+                days_v = timeline.index[timeline["verdict"] == v]
+                fig_tl.add_trace(go.Bar(
+                    x=days_v, y=[1] * len(days_v),
+                    name=verdict_map[v][1],
+                    marker_color=verdict_colors[v],
+                    hovertemplate=f"%{{x|%Y-%m-%d}}<br><b>{verdict_map[v][1]}</b><extra></extra>",
+                ))
+            fig_tl.update_layout(
+                **PLOTLY_LIGHT,
+                height=170,
+                barmode="stack",
+                bargap=0,
+                xaxis=ax(),
+                yaxis=dict(visible=False),
+                legend=dict(orientation="h", y=1.25, font=dict(color="#1a202c", size=11)),
+                margin=dict(t=30, b=20, l=10, r=10),
+            )
+            return timeline, fig_tl, regime_runs(timeline["verdict"])
+
+        timeline, fig_tl, runs = timeline_view(
+            snapshot.fingerprint, period_option,
+            basis if apply_cip else 0.0,
+            friction if apply_cip else 0.0,
+        )
 
-    total = growth_score + fear_score + tight_score
-    if total == 0:                                  verdict = "neutral"
-    elif tight_score >= 3:                          verdict = "tight"
-    elif fear_score > growth_score and fear_score >= 2: verdict = "fear"
-    elif growth_score > fear_score:                 verdict = "growth"
-    else:                                           verdict = "neutral"
-
-    verdict_map = {
-        "growth":  ("signal-growth",  "🦖 성장 달러", "달러 강세의 질이 '성장'에 기반합니다. 미국 경제 호조로 자금이 유입되는 구조적 강세국면. 위험자산과 달러가 함께 상승하는 이상적 환경입니다."),
-        "fear":    ("signal-fear",    "💀 공포 달러", "달러 강세의 질이 '공포'에 기반합니다. 위험회피 수요로 달러가 강세를 보이는 국면. 주식·EM 자산 동반 약세, 안전자산 선호 확대."),
-        "tight":   ("signal-tight",   "🔥 경색 달러", "달러 강세의 질이 '경색'에 기반합니다. CIP 이탈 및 스왑 마찰 심화. 달러 조달 비용 급등으로 금융시장 기능 저하 우려."),
-        "neutral": ("signal-neutral", "📊 관찰 구간", "현재 뚜렷한 달러 품질 판정이 어렵습니다. 추가 지표 모니터링과 데이터 입력을 권장합니다."),
-    }
+        if not timeline.empty:
+            st.plotly_chart(fig_tl, width="stretch")
+
+            col_runs, col_share = st.columns([2, 1])
+            with col_runs:
+                st.markdown('<div class="score-section-title">📆 판정 구간 (최근 순)</div>', unsafe_allow_html=True)
+                st.dataframe(
+                    pd.DataFrame({
+                        "시작": runs["start"].dt.strftime("%Y-%m-%d"),
+                        "종료": runs["end"].dt.strftime("%Y-%m-%d"),
+                        "판정": runs["verdict"].map(lambda v: verdict_map[v][1]),
+                        "지속(거래일)": runs["days"],
+                    }).iloc[::-1],
+                    hide_index=True, width="stretch", height=240,
+                )
+            with col_share:
+                st.markdown('<div class="score-section-title">📊 판정별 누적 거래일</div>', unsafe_allow_html=True)
+                share = runs.groupby("verdict")["days"].agg(["sum", "mean", "max"])
+                for v in VERDICTS:
+                    if v not in share.index:
+                        continue
+                    tot, avg, longest = share.loc[v]
+                    st.markdown(f"""
+                    <div style="display:flex; justify-content:space-between; padding:8px 12px; margin:4px 0;
+                                background:white; border:1px solid #e2e8f0; border-radius:8px; font-size:0.84rem;">
+                        <span style="font-weight:700; color:{verdict_colors[v]};">{verdict_map[v][1]}</span>
+                        <span style="color:#374151;">{tot / len(timeline) * 100:.0f}% · 평균 {avg:.1f}일 · 최장 {longest:.0f}일</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+        else:
+            st.info("📡 타임라인을 계산할 시장 데이터가 없습니다.")
+
+        # 판정 기록 — 갱신마다 서버가 남긴 점수·판정 (다시 계산하지 않고 다운샘플링 조회만)
+        st.markdown("### 🗄 판정 기록")
+
+        @METRICS.cached("verdict_history_view", st.cache_resource(max_entries=8, show_spinner=False))
+        def verdict_history_view(version: int, start):
+            hist = verdict_history.history(start=start)
+            if hist.empty:
+                return hist, None
+            fig_h = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.06, row_heights=[0.25, 0.75])
+            for v in VERDICTS:
+                at_v = hist.index[hist["verdict"] == v]
+                fig_h.add_trace(go.Scatter(
+                    x=at_v, y=[1] * len(at_v), mode="markers", name=verdict_map[v][1],
+                    marker=dict(color=verdict_colors[v], size=7, symbol="square"),
+                    hovertemplate=f"%{{x|%m-%d %H:%M}}<br><b>{verdict_map[v][1]}</b><extra></extra>",
+                ), row=1, col=1)
+            for col, label, color in (("growth", "성장", "#16a34a"), ("fear", "공포", "#dc2626"), ("tight", "경색", "#d97706")):
+                fig_h.add_trace(go.Scatter(x=hist.index, y=hist[col], name=f"{label} 점수", mode="lines",
+                                           line=dict(color=color, width=2, shape="hv")), row=2, col=1)
+            fig_h.update_layout(
+                **PLOTLY_LIGHT,
+                height=320,
+                legend=dict(orientation="h", y=1.15, font=dict(color="#1a202c", size=11)),
+                hovermode="x unified",
+                margin=dict(t=30, b=20, l=10, r=10),
+            )
+            fig_h.update_xaxes(**ax())
+            fig_h.update_yaxes(**ax())
+            fig_h.update_yaxes(visible=False, row=1, col=1)
+            return hist, fig_h
+
+        hist, fig_h = verdict_history_view(verdict_history.version, period_start)
+        if fig_h is None:
+            st.caption("아직 기록된 판정이 없습니다. 데이터가 갱신될 때마다 자동으로 저장됩니다.")
+        else:
+            st.plotly_chart(fig_h, width="stretch")
+            st.caption(f"{verdict_history.count(period_start):,}건 중 {len(hist):,}건 표시 · 판정 전환 "
+                       f"{int(hist['changed'].sum())}회 · 베이시스·마찰계수는 호가 이력 최신값 기준 "
+                       f"(없으면 탭2 기본값)")
 
-    v_class, v_title, v_desc = verdict_map[verdict]
+        # 요약 테이블 (HTML 커스텀)
+        st.markdown("### 📋 전체 지표 요약")
+        try:
+            basis_v       = f"{basis:+.1f}pt (괴리율 {deviation_pct:+.1f}%)"
+            friction_v    = f"{friction:.1f}pt"
+            theoretical_v = f"{theoretical_rate:+.1f}"
+        except Exception:
+            basis_v = friction_v = theoretical_v = "탭2 입력 필요"
+
+        def sig_color(sig):
+            if sig in ("🚨","🔴"): return "#dc2626"
+            if sig in ("⚠️","🟡"): return "#d97706"
+            if sig == "🟢": return "#16a34a"
+            return "#6b7280"
+
+        # 1단계 행은 설정 파일 summary 종목 (한 페이지 분량), 2~3단계 행은 탭2 CIP 결과
+        summary_items = paginate(REGISTRY.view("summary"), "summary", label="요약표 페이지")
+        rows_data = [
+            ("1단계", inst.label,
+             inst.fmt.format(last_val(inst.key)) if last_val(inst.key) else "–",
+             f"{delta_pct(inst.key) or 0:+.2f}%", inst.signal(delta_pct(inst.key) or 0))
+            for inst in summary_items
+        ] + [
+            ("2~3단계","CIP 이론 스왑포인트", theoretical_v, "–", "–"),
+            ("2~3단계","베이시스 괴리",       basis_v,       "–", "🚨" if isinstance(basis, float) and basis < -200 else "⚠️" if isinstance(basis, float) and basis < -50 else "🟢"),
+            ("2~3단계","마찰계수(Bid-Ask)",   friction_v,    "–", "🚨" if isinstance(friction, float) and friction > 300 else "⚠️" if isinstance(friction, float) and friction > 150 else "🟢"),
+        ]
+
+        table_rows = ""
+        for stage, name, val, chg, sig in rows_data:
+            stage_cls = "stage-1" if stage == "1단계" else "stage-2"
+            sc = sig_color(sig)
+            table_rows += f"""
+            <tr>
+                <td><span class="stage-badge {stage_cls}">{stage}</span></td>
+                <td style="font-weight:600; color:#1a202c;">{name}</td>
+                <td style="font-family:monospace; color:#1a202c;">{val}</td>
+                <td style="font-family:monospace; color:#374151;">{chg}</td>
+                <td style="font-size:1.1rem; text-align:center; color:{sc};">{sig}</td>
+            </tr>"""
 
-    col_v, col_s = st.columns([2, 1])
-    with col_v:
         st.markdown(f"""
-        <div class="{v_class}" style="padding:32px;">
-            <div class="signal-title" style="font-size:0.85rem;">오늘의 달러 품질 판정</div>
-            <div class="signal-body" style="font-size:3rem; margin:14px 0;">{v_title}</div>
-            <div class="signal-desc" style="font-size:0.92rem;">{v_desc}</div>
-        </div>
+        <table class="summary-table">
+            <thead>
+                <tr>
+                    <th>단계</th>
+                    <th>지표</th>
+                    <th>현재값</th>
+                    <th>일간변화</th>
+                    <th style="text-align:center">신호</th>
+                </tr>
+            </thead>
+            <tbody>{table_rows}</tbody>
+        </table>
         """, unsafe_allow_html=True)
 
-    with col_s:
-        st.markdown('<div class="score-section-title">📊 점수 분포</div>', unsafe_allow_html=True)
-        max_s = max(growth_score, fear_score, tight_score, 1)
-        score_bars = [
-            ("🟢 성장 달러", growth_score, "#16a34a", "#f0fdf4", "#86efac"),
-            ("🔴 공포 달러", fear_score,  "#dc2626", "#fff1f2", "#fca5a5"),
-            ("🟡 경색 달러", tight_score, "#d97706", "#fffbeb", "#fcd34d"),
-        ]
-        for label, score, bar_color, bg_color, border_color in score_bars:
-            bar_pct = int(score / max_s * 100)
-            st.markdown(f"""
-            <div style="background:{bg_color}; border:1px solid {border_color}; border-radius:10px;
-                        padding:12px 16px; margin:8px 0;">
-                <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:7px;">
-                    <span style="font-size:0.88rem; font-weight:700; color:#1a202c;">{label}</span>
-                    <span style="font-size:1rem; font-weight:800; color:{bar_color};">{score}점</span>
-                </div>
-                <div style="background:#e2e8f0; border-radius:99px; height:10px; overflow:hidden;">
-                    <div style="width:{bar_pct}%; height:100%; background:{bar_color};
-                                border-radius:99px; transition:width 0.6s ease;"></div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-    # 요약 테이블 (HTML 커스텀)
-    st.markdown("### 📋 전체 지표 요약")
-    try:
-        basis_v       = f"{basis:+.1f}pt (괴리율 {deviation_pct:+.1f}%)"
-        friction_v    = f"{friction:.1f}pt"
-        theoretical_v = f"{theoretical_rate:+.1f}"
-    except Exception:
-        basis_v = friction_v = theoretical_v = "탭2 입력 필요"
-
-    def sig_color(sig):
-        if sig in ("🚨","🔴"): return "#dc2626"
-        if sig in ("⚠️","🟡"): return "#d97706"
-        if sig == "🟢": return "#16a34a"
-        return "#6b7280"
-
-    rows_data = [
-        ("1단계", "미국 10Y 금리",      f"{last_val('TNX'):.2f}%" if last_val('TNX') else "–", f"{tnx_d_v:+.2f}%", "🔴" if tnx_d_v > 0.05 else "🟢" if tnx_d_v < -0.05 else "⚪"),
-        ("1단계", "S&P 500",            f"{last_val('SPX'):,.0f}" if last_val('SPX') else "–",  f"{spx_d_v:+.2f}%", "🟢" if spx_d_v > 0 else "🔴" if spx_d_v < 0 else "⚪"),
-        ("1단계", "EEM 신흥국주식",     f"${last_val('EEM'):.2f}" if last_val('EEM') else "–",  f"{eem_d_v:+.2f}%", "🟢" if eem_d_v > 0 else "🔴" if eem_d_v < 0 else "⚪"),
-        ("1단계", "EMB 신흥국채권",     f"${last_val('EMB'):.2f}" if last_val('EMB') else "–",  f"{emb_d_v:+.2f}%", "🟢" if emb_d_v > 0 else "🔴" if emb_d_v < 0 else "⚪"),
-        ("1단계", "달러 지수(DXY)",     f"{last_val('DXY'):.2f}"  if last_val('DXY') else "–",  f"{dxy_d_v:+.2f}%", "🔴" if dxy_d_v > 0.3 else "🟢" if dxy_d_v < -0.3 else "⚪"),
-        ("2~3단계","CIP 이론 스왑포인트", theoretical_v, "–", "–"),
-        ("2~3단계","베이시스 괴리",       basis_v,       "–", "🚨" if isinstance(basis, float) and basis < -200 else "⚠️" if isinstance(basis, float) and basis < -50 else "🟢"),
-        ("2~3단계","마찰계수(Bid-Ask)",   friction_v,    "–", "🚨" if isinstance(friction, float) and friction > 300 else "⚠️" if isinstance(friction, float) and friction > 150 else "🟢"),
-    ]
-
-    table_rows = ""
-    for stage, name, val, chg, sig in rows_data:
-        stage_cls = "stage-1" if stage == "1단계" else "stage-2"
-        sc = sig_color(sig)
-        table_rows += f"""
-        <tr>
-            <td><span class="stage-badge {stage_cls}">{stage}</span></td>
-            <td style="font-weight:600; color:#1a202c;">{name}</td>
-            <td style="font-family:monospace; color:#1a202c;">{val}</td>
-            <td style="font-family:monospace; color:#374151;">{chg}</td>
-            <td style="font-size:1.1rem; text-align:center; color:{sc};">{sig}</td>
-        </tr>"""
-
-    st.markdown(f"""
-    <table class="summary-table">
-        <thead>
-            <tr>
-                <th>단계</th>
-                <th>지표</th>
-                <th>현재값</th>
-                <th>일간변화</th>
-                <th style="text-align:center">신호</th>
-            </tr>
-        </thead>
-        <tbody>{table_rows}</tbody>
-    </table>
-    """, unsafe_allow_html=True)
+    verdict_panel()
 
     # 바로가기 링크
     st.markdown("---")
@@ -1044,3 +1623,48 @@ with tab3:
     <b>본 대시보드는 투자 조언이 아니며, 참고용 분석 도구입니다.</b>
     </div>
     """, unsafe_allow_html=True)
+
+render_sw.lap("tab3")
+render_sw.total()
+
+# ── 계측 내보내기 · 관리자 패널 ────────────────────────────────────────────────
+@st.cache_resource
+def get_metrics_server():
+    # DQ_METRICS_PORT 지정 시 프로세스당 한 번 /metrics 엔드포인트 기동
+    return METRICS.serve() if METRICS_PORT else None
+
+get_metrics_server()
+if METRICS_FILE:
+    try:
+        METRICS.write_textfile()
+    except OSError:
+        pass
+
+if st.query_params.get("debug") == "1":
+    with st.sidebar:
+        with st.expander("🛠 성능 계측", expanded=True):
+            hist, counters = METRICS.snapshot()
+            st.caption(f"앱 재실행 {sum(counters.get('dq_reruns_total', {}).values()):,}회")
+            rows = [
+                {"지표": name.removeprefix("dq_").removesuffix("_seconds"),
+                 "구분": ",".join(str(v) for _, v in labels),
+                 "횟수": count, "평균 ms": total / count * 1000 if count else 0,
+                 "p50 ms": p50 * 1000, "p95 ms": p95 * 1000, "최근 ms": last * 1000}
+                for name, series in hist.items() for labels, (count, total, last, p50, p95) in series.items()
+            ]
+            if rows:
+                st.dataframe(pd.DataFrame(rows).round(1), hide_index=True, width="stretch")
+            reqs = counters.get("dq_cache_requests_total", {})
+            misses = counters.get("dq_cache_misses_total", {})
+            for labels, n in sorted(reqs.items()):
+                hit = n - misses.get(labels, 0)
+                st.caption(f"캐시 {labels[0][1]}: 적중 {hit}/{n} ({hit / n * 100:.0f}%)")
+            # 메모리 — 스냅샷은 프로세스에 한 벌, 세션은 기간별 뷰만 보유
+            shared_mb = snapshot.nbytes() / 2**20
+            own_kb    = session_bytes(market_data, snapshot) / 1024
+            active    = sum(1 for t in get_active_sessions().values() if time.time() - t < 600)
+            st.caption(f"공유 스냅샷 {shared_mb:,.2f} MB ({np.dtype(PRICE_DTYPE).name}) · "
+                       f"이 세션 전용 {own_kb:,.1f} KB · 활성 세션 {active}개 → "
+                       f"합계 약 {shared_mb + active * own_kb / 1024:,.2f} MB")
+            st.download_button("Prometheus 텍스트 받기", METRICS.render(), file_name="dq_metrics.prom",
+                               mime="text/plain", width="stretch")
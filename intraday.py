@@ -0,0 +1,219 @@
+"""
+장중 스트리밍 시세
+Intraday bar streaming with fixed-size ring buffers
+
+1분·5분 봉을 종목별 고정 크기 링 버퍼에 이어 붙입니다. 폴링마다 버퍼의 마지막 봉 시각부터만
+요청해 그 이후 봉만 추가하고, 전일 종가 대비 변화율은 새 봉이 들어올 때 O(1)로 갱신되므로 하루 종일 돌려도
+메모리와 폴링당 계산량이 일정합니다.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from market_data import MAX_WORKERS, TICKER_TIMEOUT, TICKERS
+from metrics import METRICS
+from providers import MarketDataProvider, get_provider
+
+INTERVAL_SECONDS = {"1m": 60, "5m": 300}   # 봉 간격 → 폴링 주기 (초)
+BUFFER_BARS      = 1440                    # 종목당 보관 봉 수 — 1분봉 24시간분 (약 23KB)
+BACKFILL_PERIOD  = "5d"                    # 첫 수집 범위 — 전일 종가 확보용
+
+
+class RingBuffer:
+    """(시각, 종가) 고정 크기 원형 버퍼 — 가득 차면 가장 오래된 봉을 덮어씀"""
+
+    def __init__(self, capacity: int = BUFFER_BARS):
+        self.capacity = capacity
+        self._t = np.empty(capacity, dtype="datetime64[ns]")
+        self._v = np.empty(capacity, dtype=np.float64)
+        self._head = 0   # 다음에 쓸 위치
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _last_pos(self) -> int:
+        return (self._head - 1) % self.capacity
+
+    @property
+    def last_time(self) -> Optional[np.datetime64]:
+        return self._t[self._last_pos()] if self._size else None
+
+    @property
+    def last_value(self) -> Optional[float]:
+        return float(self._v[self._last_pos()]) if self._size else None
+
+    def push(self, t, v: float):
+        self._t[self._head] = t
+        self._v[self._head] = v
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def set_last(self, v: float):
+        """진행 중인 마지막 봉의 값 수정 (같은 시각의 봉이 다시 들어온 경우)"""
+        self._v[self._last_pos()] = v
+
+    def series(self) -> pd.Series:
+        """시간 순서대로 복사한 Series (버퍼 크기만큼만 복사)"""
+        start = (self._head - self._size) % self.capacity
+        order = (start + np.arange(self._size)) % self.capacity
+        return pd.Series(self._v[order], index=pd.DatetimeIndex(self._t[order]))
+
+
+def _session(s: pd.Series) -> pd.Series:
+    # 마지막 봉과 같은 날짜의 봉만
+    return s[s.index.normalize() == s.index[-1].normalize()] if not s.empty else s
+
+
+class IntradayStream:
+    """
+    종목별 분봉 링 버퍼 + 전일 종가 기준 변화율.
+
+    백그라운드 스레드 하나가 interval 마다 새 봉만 받아 버퍼에 추가하고(프로세스 공용),
+    각 세션은 deltas() / series() 로 읽기만 합니다. version 은 새 봉이 들어오거나 형성 중인 봉의 값이
+    바뀔 때만 증가하므로 차트 캐시 키로 쓸 수 있습니다.
+    """
+
+    def __init__(self, interval: str = "1m", tickers: dict = None,
+                 provider: MarketDataProvider = None, capacity: int = BUFFER_BARS,
+                 max_workers: int = MAX_WORKERS, timeout: float = TICKER_TIMEOUT):
+        self.interval    = interval
+        self.tickers     = tickers or TICKERS
+        self.provider    = provider or get_provider()
+        self.max_workers = max_workers
+        self.timeout     = timeout
+        self._buffers    = {name: RingBuffer(capacity) for name in self.tickers}
+        self._ref        = {}   # {name: 전일 마지막 봉 종가}
+        self._lock       = threading.Lock()   # 버퍼 쓰기·읽기 보호
+        self._poll_lock  = threading.Lock()   # 동시 폴링 방지 (single flight)
+        self._stop       = threading.Event()
+        self._thread     = None
+        self.version     = 0
+        self.polled_at: Optional[float] = None
+        self.last_error: Optional[str] = None   # 마지막 폴링의 실패 요약 (없으면 None)
+
+    # ── 수명 주기 ──────────────────────────────────────────────────────────
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f"dq-intraday-{self.interval}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                self.last_error = repr(e)
+                METRICS.inc("dq_fetch_errors_total", ticker=f"intraday_{self.interval}")
+            self._stop.wait(INTERVAL_SECONDS.get(self.interval, 60))
+
+    # ── 수집 ───────────────────────────────────────────────────────────────
+    def _fetch(self, name: str, symbol: str) -> pd.Series:
+        last = self._buffers[name].last_time
+        if last is None:
+            return self.provider.history(symbol, self.timeout, period=BACKFILL_PERIOD, interval=self.interval)
+        # 마지막 봉 시각부터만 요청 (날짜만 넘기면 매 폴링마다 당일 전체를 다시 받음)
+        return self.provider.history(symbol, self.timeout, start=pd.Timestamp(last), interval=self.interval)
+
+    def _ingest(self, name: str, s: pd.Series) -> int:
+        """
+        새 봉을 버퍼에 추가 → 추가·수정된 봉 수. start 가 마지막 봉 시각을 포함하므로 같은 시각의 봉
+        (아직 형성 중이던 봉)은 값만 덮어쓰고, 그보다 뒤의 봉만 추가
+        """
+        buf = self._buffers[name]
+        s = s.dropna()
+        times, values = s.index.values, s.to_numpy(dtype=np.float64)
+        last = buf.last_time
+        added = 0
+        if last is not None:
+            same = times == last
+            if same.any():
+                v = values[same][-1]
+                if v != buf.last_value:
+                    buf.set_last(v)
+                    added += 1
+            keep = times > last
+            times, values = times[keep], values[keep]
+        for t, v in zip(times, values):
+            last = buf.last_time
+            if last is not None and t.astype("datetime64[D]") > last.astype("datetime64[D]"):
+                self._ref[name] = buf.last_value   # 날짜가 바뀌면 직전 봉이 전일 종가
+            buf.push(t, v)
+            added += 1
+        return added
+
+    def poll(self) -> dict:
+        """전 종목 새 봉 수집 → {name: 추가·수정된 봉 수}. 이미 폴링 중이면 빈 dict"""
+        if not self._poll_lock.acquire(blocking=False):
+            return {}
+        try:
+            pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.tickers)) or 1)
+            futures = {pool.submit(self._fetch, name, symbol): name for name, symbol in self.tickers.items()}
+            done, _ = wait(futures, timeout=self.timeout * 1.5)
+            pool.shutdown(wait=False, cancel_futures=True)
+
+            added, errors = {}, {name: "시간 초과" for fut, name in futures.items() if fut not in done}
+            with self._lock:
+                for fut in done:
+                    try:
+                        s = fut.result()
+                    except Exception as e:
+                        errors[futures[fut]] = repr(e)
+                        continue
+                    if not s.empty:
+                        added[futures[fut]] = self._ingest(futures[fut], s)
+                if any(added.values()):
+                    self.version += 1
+            for name in errors:
+                METRICS.inc("dq_fetch_errors_total", ticker=name)
+            self.last_error = (f"{len(errors)}/{len(futures)}종목 실패 — "
+                               + ", ".join(f"{name}: {e}" for name, e in sorted(errors.items()))) if errors else None
+            self.polled_at = time.time()
+            return added
+        finally:
+            self._poll_lock.release()
+
+    # ── 조회 ───────────────────────────────────────────────────────────────
+    def last_of(self, name: str) -> Optional[float]:
+        with self._lock:
+            return self._buffers[name].last_value if name in self._buffers else None
+
+    def delta_of(self, name: str) -> Optional[float]:
+        """최신 봉의 전일 종가 대비 변화율(%) — 전일 봉이 버퍼에 없으면 None"""
+        with self._lock:
+            ref, last = self._ref.get(name), self._buffers[name].last_value if name in self._buffers else None
+        if not ref or last is None:
+            return None
+        return (last / ref - 1) * 100
+
+    def deltas(self) -> dict:
+        return {name: self.delta_of(name) for name in self.tickers}
+
+    def series(self, name: str, session_only: bool = True) -> pd.Series:
+        """버퍼 내용 (session_only 면 마지막 봉과 같은 날짜의 봉만)"""
+        with self._lock:
+            s = self._buffers[name].series()
+        return _session(s) if session_only else s
+
+    def session_returns(self) -> dict:
+        """{name: 당일 봉의 전일 종가 대비 변화율(%) Series} — 기준값이 고정이므로 새 봉만큼만 달라짐"""
+        with self._lock:   # 기준값과 버퍼를 같은 폴링 시점 기준으로 읽음
+            pairs = {name: (self._ref.get(name), self._buffers[name].series()) for name in self.tickers}
+        out = {}
+        for name, (ref, s) in pairs.items():
+            s = _session(s)
+            if ref and not s.empty:
+                out[name] = (s / ref - 1) * 100
+        return out
+
+    def memory_bytes(self) -> int:
+        return sum(b._t.nbytes + b._v.nbytes for b in self._buffers.values())
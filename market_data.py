@@ -0,0 +1,342 @@
+"""
+시장 데이터 수집 모듈
+Market data fetching for the dollar quality dashboard
+
+Streamlit 에 의존하지 않으므로 대시보드 외의 배치 작업에서도 import 가능합니다.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from metrics import METRICS
+from providers import MarketDataProvider, get_provider
+from registry import REGISTRY
+
+# ── 수집 대상 종목 ─────────────────────────────────────────────────────────────
+TICKERS = REGISTRY.tickers()   # {key: 제공자 심볼} — tickers.json
+
+MAX_WORKERS       = 6      # 동시 요청 수 상한
+BATCH_MIN         = 24     # 종목이 이보다 많고 제공자가 묶음 요청을 지원(batch_size > 1)할 때만 묶음
+TICKER_TIMEOUT    = 10.0   # 요청별 HTTP 타임아웃 (초)
+BACKFILL_PERIOD   = os.environ.get("DQ_BACKFILL_PERIOD", "10y")   # 저장소 최초 적재 기간
+
+DEFAULT_TTL   = 300                # 종목별 캐시 유효 시간 (초)
+TICKER_TTL    = REGISTRY.ttl()     # 설정 파일에 ttl 을 둔 종목 (하루 중 변화가 작은 종목은 더 길게)
+RETRIES       = 2                  # 실패 시 재시도 횟수 (첫 요청 제외)
+RETRY_BACKOFF = 0.5                # 첫 재시도 전 대기 (초), 이후 2배씩
+CHECK_SECONDS = 30                 # 만료 종목 확인 주기 — 만료된 종목이 없으면 요청 없이 끝남
+# 보관 가격 dtype — DQ_FLOAT32=1 이면 float32 (메모리 절반, 유효숫자 7자리로 화면 표시에는 충분)
+PRICE_DTYPE   = np.float32 if os.environ.get("DQ_FLOAT32", "") in ("1", "true") else np.float64
+
+# 조회 기간 문자열 → 오늘 기준 시작일 오프셋 (사이드바 선택지 순서 = 짧은 기간 → 긴 기간)
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y":  pd.DateOffset(years=1),
+    "2y":  pd.DateOffset(years=2),
+}
+PERIOD_OPTIONS  = list(PERIOD_OFFSETS)
+SUPERSET_PERIOD = PERIOD_OPTIONS[-1]   # 한 번만 받아 두고 짧은 기간은 잘라서 사용
+FULL_PERIOD     = "max"                # 자르지 않은 전체 이력 (백테스트용, 제공자 period 로도 그대로 전달)
+
+
+def clip_period(s: pd.Series, period: str) -> pd.Series:
+    """
+    전체 이력에서 조회 기간에 해당하는 구간만 잘라냄 (정렬된 인덱스 이진 탐색 + 위치 슬라이스).
+    기준일은 마지막 봉 — 실시간 데이터에서는 오늘과 같고, 재생 데이터에서도 결과가 일정함.
+    FULL_PERIOD 면 그대로, PERIOD_OFFSETS 에 없는 기간이면 ValueError
+    """
+    if period == FULL_PERIOD or s.empty:
+        return s
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        raise ValueError(f"알 수 없는 조회 기간: {period}")
+    start = s.index[-1].normalize() - offset
+    return s.iloc[s.index.searchsorted(start):]
+
+
+def slice_period(data: dict, period: str) -> dict:
+    """{name: Series} 전체를 조회 기간으로 슬라이스 — 네트워크 없이 메모리에서만 처리"""
+    return {name: clip_period(s, period) for name, s in data.items()}
+
+
+def freeze(s: pd.Series, dtype=PRICE_DTYPE, index: pd.DatetimeIndex = None) -> pd.Series:
+    """
+    읽기 전용 값 배열로 다시 묶은 Series — dtype 이 같고 이미 읽기 전용이면 복사 없음.
+    index 를 주면 (값이 같은 경우) 그 인덱스 객체를 대신 사용해 종목끼리 한 벌을 공유
+    """
+    values = s.to_numpy(dtype=dtype)
+    values.flags.writeable = False
+    return pd.Series(values, index=s.index if index is None else index, name=s.name, copy=False)
+
+
+# ── 종목별 캐시 ───────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class TickerStatus:
+    fetched_at: Optional[float]   # 마지막 성공 시각 (time.time()), 성공한 적 없으면 None
+    error: Optional[str]          # 마지막 시도가 실패했으면 사유
+    refreshing: bool              # 수집 중 (대기 상한을 넘겨 백그라운드에서 계속 도는 요청 포함)
+    ttl: float
+
+    def age(self, now: float = None) -> Optional[float]:
+        return None if self.fetched_at is None else (now or time.time()) - self.fetched_at
+
+    def stale(self, now: float = None) -> bool:
+        age = self.age(now)
+        return self.error is not None or age is None or age >= self.ttl
+
+
+class TickerCache:
+    """
+    종목별 마지막 정상 수신값과 수신 시각. 종목마다 TTL 이 따로 있어 만료된 종목만 다시 요청하고,
+    갱신이 실패하거나 아직 끝나지 않았으면 마지막 정상값을 그대로 내줍니다 (stale-while-revalidate).
+    보관 값은 dtype 의 읽기 전용 배열이며, 거래일이 같은 종목은 인덱스 객체 하나를 함께 씁니다.
+    """
+
+    def __init__(self, ttl: dict = None, default_ttl: float = DEFAULT_TTL, dtype=PRICE_DTYPE):
+        self.ttl = {**TICKER_TTL, **(ttl or {})}
+        self.default_ttl = default_ttl
+        self.dtype     = dtype
+        self._lock     = threading.Lock()
+        self._series   = {}      # {name: 마지막 정상 Series (읽기 전용)}
+        self._fetched  = {}      # {name: 마지막 성공 시각}
+        self._errors   = {}      # {name: 마지막 실패 사유}
+        self._inflight = set()   # 수집 중인 종목 — 같은 종목을 겹쳐 요청하지 않음
+        self._forced   = set()   # TTL 과 무관하게 다음 수집에 포함할 종목
+
+    def ttl_of(self, name: str) -> float:
+        return self.ttl.get(name, self.default_ttl)
+
+    def due(self, name: str, now: float = None) -> bool:
+        """다음 수집에 포함할지 — 만료·실패·강제 갱신이면서 수집 중이 아닐 때"""
+        with self._lock:
+            if name in self._inflight:
+                return False
+            fetched = self._fetched.get(name)
+            return (name in self._forced or name in self._errors or fetched is None
+                    or (now or time.time()) - fetched >= self.ttl_of(name))
+
+    def claim(self, name: str) -> bool:
+        with self._lock:
+            if name in self._inflight:
+                return False
+            self._inflight.add(name)
+            self._forced.discard(name)
+            return True
+
+    def put(self, name: str, s: pd.Series, fetched_at: float = None):
+        with self._lock:
+            self._series[name]  = freeze(s, self.dtype, self._shared_index(s.index))
+            self._fetched[name] = fetched_at or time.time()
+            self._errors.pop(name, None)
+
+    def _shared_index(self, index: pd.DatetimeIndex) -> Optional[pd.DatetimeIndex]:
+        # self._lock 을 잡은 상태에서 호출 — 이미 보관 중인 종목 중 거래일이 똑같은 인덱스
+        for other in self._series.values():
+            o = other.index
+            if o is not index and len(o) == len(index) and len(o) and o[-1] == index[-1] and o.equals(index):
+                return o
+        return None
+
+    def fail(self, name: str, error: str):
+        with self._lock:
+            self._errors[name] = error
+
+    def release(self, name: str):
+        with self._lock:
+            self._inflight.discard(name)
+
+    def invalidate(self, names=None):
+        """다음 수집 때 TTL 과 무관하게 다시 요청 (새로고침 버튼)"""
+        with self._lock:
+            self._forced.update(names if names is not None else self.ttl.keys() | self._fetched.keys())
+
+    def get(self, name: str) -> Optional[pd.Series]:
+        with self._lock:
+            return self._series.get(name)
+
+    def has(self, name: str) -> bool:
+        with self._lock:
+            return name in self._series
+
+    def status(self) -> dict:
+        """{name: TickerStatus} — 한 번이라도 요청한 종목"""
+        with self._lock:
+            names = self._fetched.keys() | self._errors.keys() | self._inflight
+            return {name: TickerStatus(self._fetched.get(name), self._errors.get(name),
+                                       name in self._inflight, self.ttl_of(name))
+                    for name in names}
+
+
+def _describe(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+
+def _batches(items: list, size: int = 1) -> list:
+    """
+    요청 단위로 나눔 — 종목이 BATCH_MIN 이하이거나 제공자가 묶음을 지원하지 않으면(size 1) 종목별 요청
+    (스레드 풀로 동시에), 그보다 많으면 size 개씩 묶음. 묶음 요청은 제공자 안에서 병렬로 처리되고
+    묶음끼리는 직렬화될 수 있으므로(yf.download) 잘게 나누지 않음
+    """
+    if size <= 1 or len(items) <= BATCH_MIN:
+        return [[item] for item in items]
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _backfill(store, provider, name: str, symbol: str, timeout: float, hist: pd.Series) -> pd.Series:
+    full = provider.history(symbol, timeout, period=BACKFILL_PERIOD)
+    return store.write(name, full) if not full.empty else hist
+
+
+def _sync_batch(store, provider, batch: list, timeout: float) -> dict:
+    """
+    저장소의 이력을 최신으로 맞춘 뒤 {name: 전체 이력 또는 예외} 반환 (마지막 저장 시점 이후 봉만 요청).
+    이력이 있는 종목은 묶음에서 가장 이른 기준 봉부터 한 요청으로 받습니다.
+    """
+    hists = {name: store.load(name) for name, _ in batch}
+    out, incr = {}, []
+    for name, symbol in batch:
+        if len(hists[name]) >= 2:
+            incr.append((name, symbol))
+            continue
+        try:
+            out[name] = _backfill(store, provider, name, symbol, timeout, hists[name])
+        except Exception as e:
+            out[name] = e
+    if not incr:
+        return out
+
+    # 마지막 두 봉부터 다시 받음: 직전 완성 봉은 수정주가 재조정(배당 등) 여부 확인용,
+    # 마지막 봉은 장중 미완성 값 갱신용
+    got = provider.history_many([symbol for _, symbol in incr], timeout,
+                                start=min(hists[name].index[-2] for name, _ in incr))
+    for name, symbol in incr:
+        hist, new = hists[name], got.get(symbol)
+        if isinstance(new, Exception):
+            out[name] = new
+            continue
+        anchor = hist.index[-2]
+        new = new[new.index >= anchor]
+        try:
+            if anchor in new.index and not np.isclose(new[anchor], hist[anchor], rtol=1e-4):
+                # 과거 수정주가가 바뀌었으면 이어 붙일 수 없으므로 전체 재적재
+                out[name] = _backfill(store, provider, name, symbol, timeout, hist)
+            else:
+                out[name] = store.append(name, new)
+        except Exception as e:
+            out[name] = e
+    return out
+
+
+def fetch_prices(period: str, tickers: dict = None, store=None,
+                 provider: MarketDataProvider = None,
+                 max_workers: int = MAX_WORKERS, timeout: float = TICKER_TIMEOUT,
+                 cache: TickerCache = None, retries: int = RETRIES, backoff: float = RETRY_BACKOFF):
+    """
+    전 종목 종가를 스레드 풀로 동시에 수집합니다.
+
+    provider 를 생략하면 환경 변수(DQ_PROVIDER)에 따른 제공자를 사용합니다.
+    종목마다 요청 하나씩 보내고, 종목이 BATCH_MIN 보다 많고 제공자가 묶음 요청을 지원하면
+    provider.batch_size 이하 묶음마다 요청 하나(history_many)로 받습니다.
+    store(PriceStore)를 주면 저장된 이력 이후의 봉만 받아 이어 붙이고,
+    조회 기간만큼 잘라 반환합니다. 실패한 종목은 backoff 간격으로 retries 번까지 다시 요청합니다.
+
+    cache(TickerCache)를 주면 TTL 이 지난 종목만 요청하고, 실패했거나 대기 상한 안에 끝나지 않은
+    종목은 마지막 정상값을 씁니다. 상한을 넘긴 요청은 백그라운드에서 계속 돌다가 끝나면 캐시를 채웁니다.
+    캐시에 값이 없는 종목이 끝내 실패하면 저장된 이력으로 대체합니다.
+
+    Returns:
+        (data, timings)
+        data    — {name: 종가 Series}, 값이 하나도 없는 종목은 제외
+        timings — {name: 소요 시간(초)}, 이번에 요청한 종목만 (대기 상한을 넘긴 종목은 NaN).
+                  묶음 요청이면 종목별 시간을 알 수 없으므로 NaN, 묶음 시간은 dq_fetch_batch_seconds
+    """
+    tickers  = tickers or TICKERS
+    provider = provider or get_provider()
+    cache    = cache or TickerCache()
+    timings  = {}
+
+    def fetch_batch(batch) -> dict:
+        """{name: 조회 기간 Series 또는 예외}"""
+        try:
+            if store is None:
+                got = provider.history_many([symbol for _, symbol in batch], timeout, period=period)
+                got = {name: got.get(symbol) for name, symbol in batch}
+            else:
+                got = _sync_batch(store, provider, batch, timeout)
+        except Exception as e:
+            return {name: e for name, _ in batch}
+        return {name: clip_period(v, period) if isinstance(v, pd.Series) else v for name, v in got.items()}
+
+    def job(batch):
+        t0 = time.perf_counter()
+        try:
+            remaining = list(batch)
+            for attempt in range(retries + 1):
+                failed, results = [], fetch_batch(remaining)
+                for name, symbol in remaining:
+                    v = results.get(name)
+                    if isinstance(v, pd.Series) and not v.empty:
+                        cache.put(name, v)
+                    else:
+                        failed.append((name, symbol, v if isinstance(v, Exception) else ValueError("빈 응답")))
+                remaining = [(name, symbol) for name, symbol, _ in failed]
+                if not remaining or attempt == retries:
+                    break
+                for name, _ in remaining:
+                    METRICS.inc("dq_fetch_retries_total", ticker=name)
+                time.sleep(backoff * 2 ** attempt)   # 실패한 종목만 다시 요청
+
+            for name, _, e in failed:
+                METRICS.inc("dq_fetch_errors_total", ticker=name)
+                if store is not None and not cache.has(name):
+                    # 마지막 정상값이 없으면 디스크 이력으로 대신하고, 나이는 파일 수정 시각 기준
+                    full = store.load(name)
+                    if not full.empty:
+                        cache.put(name, clip_period(full, period), fetched_at=store.path(name).stat().st_mtime)
+                cache.fail(name, _describe(e))
+        finally:
+            elapsed = time.perf_counter() - t0
+            for name, _ in batch:
+                cache.release(name)
+            if len(batch) == 1:
+                timings[batch[0][0]] = elapsed
+                METRICS.observe("dq_fetch_ticker_seconds", elapsed, ticker=batch[0][0])
+            else:
+                METRICS.observe("dq_fetch_batch_seconds", elapsed, size=len(batch))
+
+    due = [(name, symbol) for name, symbol in tickers.items() if cache.due(name) and cache.claim(name)]
+    if due:
+        batches = _batches(due, getattr(provider, "batch_size", 1))
+        workers = min(max_workers, len(batches))
+        pool = ThreadPoolExecutor(max_workers=workers)
+        futures = [pool.submit(job, batch) for batch in batches]
+        # 한 종목이 응답하지 않아도 전체가 멈추지 않도록 대기 시간 상한을 둔다 — 작업 하나의 최대 소요
+        # (요청 retries+1 번 + 재시도 대기)에 작업자보다 작업이 많아 차례를 기다리는 라운드 수를 곱함.
+        # 묶음 하나는 요청 하나라 묶음 크기와 무관
+        rounds = -(-len(batches) // workers)
+        budget = timeout * (retries + 1) + backoff * (2 ** retries - 1)
+        wait(futures, timeout=budget * rounds + timeout * 0.5)
+        pool.shutdown(wait=False, cancel_futures=True)
+        for fut, batch in zip(futures, batches):
+            if fut.cancelled():   # 시작도 못 한 요청은 job 의 finally 를 거치지 않음
+                for name, _ in batch:
+                    cache.release(name)
+
+    data = {}
+    for name in tickers:   # 완료 순서 대신 종목 순서 유지
+        s = cache.get(name)
+        if s is not None and not s.empty:
+            data[name] = s
+
+    # 대기 상한을 넘긴 종목·묶음으로 받은 종목은 NaN (늦은 요청도 끝나면 캐시에는 반영되어 다음 수집 때 쓰임)
+    timings = {name: timings.get(name, float("nan")) for name, _ in due}
+    return data, timings
@@ -0,0 +1,222 @@
+"""
+단계별 계측
+Per-stage timing instrumentation (Prometheus text format)
+
+수집(종목별), 캐시 적중·실패, 계산, 화면 렌더링 단계의 소요 시간을 프로세스 공용 히스토그램에
+모으고 Prometheus 텍스트 형식으로 내보냅니다. streamlit 을 import 하지 않으므로 CLI 에서도 씁니다.
+
+환경 변수:
+    DQ_METRICS_FILE   재실행마다 갱신할 텍스트 파일 경로 (node_exporter textfile collector 용)
+    DQ_METRICS_PORT   지정 시 http://<host>:<port>/metrics 로 노출 (인증 없음)
+    DQ_METRICS_HOST   /metrics 를 열 주소 (기본 127.0.0.1 — 다른 호스트에서 수집하려면 0.0.0.0 등 명시)
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+METRICS_FILE = os.environ.get("DQ_METRICS_FILE")
+METRICS_PORT = os.environ.get("DQ_METRICS_PORT")
+METRICS_HOST = os.environ.get("DQ_METRICS_HOST", "127.0.0.1")
+
+# 지연 시간 히스토그램 버킷 (초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "dq_fetch_ticker_seconds":  "종목별 시세 수집 소요 시간",
+    "dq_fetch_batch_seconds":   "묶음 요청(여러 종목) 1회 소요 시간 — size: 종목 수",
+    "dq_fetch_errors_total":    "종목별 시세 수집 실패 횟수",
+    "dq_fetch_retries_total":   "종목별 시세 수집 재시도 횟수",
+    "dq_refresh_seconds":       "백그라운드 갱신 1회 소요 시간",
+    "dq_compute_seconds":       "계산 단계별 소요 시간",
+    "dq_cache_requests_total":  "캐시 조회 횟수",
+    "dq_cache_misses_total":    "캐시 실패(재계산) 횟수",
+    "dq_render_seconds":        "화면 구역별 렌더링 소요 시간",
+    "dq_fragment_seconds":      "조각 단위 재실행 소요 시간",
+    "dq_reruns_total":          "스크립트 재실행 횟수",
+    "dq_quote_write_errors_total": "스왑 호가 이력 쓰기 실패 횟수",
+    "dq_alerts_fired_total":    "규칙별 새 알림 발생 횟수 (중복 제외)",
+    "dq_alert_sink_errors_total": "알림 전송 실패 횟수",
+}
+
+
+def _key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    # Prometheus 텍스트 형식의 레이블 값 이스케이프 (\, ", 줄바꿈)
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram 과 같은 의미)"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts  = [0] * len(buckets)
+        self.count   = 0
+        self.sum     = 0.0
+        self.last    = 0.0
+
+    def observe(self, v: float):
+        for i, b in enumerate(self.buckets):
+            if v <= b:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum   += v
+        self.last   = v
+
+    def quantile(self, q: float) -> float:
+        """버킷 경계로 근사한 분위수 (버킷 안은 선형 보간)"""
+        if not self.count:
+            return float("nan")
+        rank, lo, prev = q * self.count, 0.0, 0
+        for b, c in zip(self.buckets, self.counts):
+            if c >= rank:
+                return lo + (b - lo) * (rank - prev) / max(c - prev, 1)
+            lo, prev = b, c
+        return self.buckets[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist = {}       # {name: {labels: Histogram}}
+        self._count = {}      # {name: {labels: int}}
+
+    def observe(self, name: str, seconds: float, **labels):
+        with self._lock:
+            self._hist.setdefault(name, {}).setdefault(_key(labels), Histogram()).observe(seconds)
+
+    def inc(self, name: str, n: int = 1, **labels):
+        with self._lock:
+            series = self._count.setdefault(name, {})
+            series[_key(labels)] = series.get(_key(labels), 0) + n
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def timed(self, name: str, **labels):
+        """함수 실행 시간을 기록하는 데코레이터"""
+        def deco(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return deco
+
+    def cached(self, cache_name: str, cache_decorator):
+        """
+        캐시 데코레이터(st.cache_resource(...) 등)를 감싸 조회 수·실패 수·조회 시간을 기록.
+        실제 함수가 실행된 경우만 실패로 셉니다.
+        """
+        def deco(fn):
+            @functools.wraps(fn)
+            def miss(*args, **kwargs):
+                self.inc("dq_cache_misses_total", cache=cache_name)
+                return fn(*args, **kwargs)
+
+            cached_fn = cache_decorator(miss)
+
+            @functools.wraps(fn)
+            def call(*args, **kwargs):
+                self.inc("dq_cache_requests_total", cache=cache_name)
+                with self.timer("dq_compute_seconds", stage=f"cache:{cache_name}"):
+                    return cached_fn(*args, **kwargs)
+            call.clear = getattr(cached_fn, "clear", None)
+            return call
+        return deco
+
+    # ── 조회 · 내보내기 ────────────────────────────────────────────────────
+    def snapshot(self) -> tuple:
+        """(히스토그램, 카운터) 복사본 — 화면 표시용"""
+        with self._lock:
+            hist = {n: {k: (h.count, h.sum, h.last, h.quantile(0.5), h.quantile(0.95)) for k, h in s.items()}
+                    for n, s in self._hist.items()}
+            return hist, {n: dict(s) for n, s in self._count.items()}
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식"""
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+        lines = []
+        with self._lock:
+            for name in sorted(self._count):
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} counter"]
+                for labels, v in sorted(self._count[name].items()):
+                    lines.append(f"{name}{fmt(labels)} {v}")
+            for name in sorted(self._hist):
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} histogram"]
+                for labels, h in sorted(self._hist[name].items()):
+                    for b, c in zip(h.buckets, h.counts):
+                        lines.append(f"{name}_bucket{fmt(labels, [('le', b)])} {c}")
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {h.count}")
+                    lines.append(f"{name}_sum{fmt(labels)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path=None):
+        """텍스트 파일로 원자적 저장 (임시 파일 → rename)"""
+        path = Path(path or METRICS_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def serve(self, port: int = None, host: str = None) -> ThreadingHTTPServer:
+        """/metrics HTTP 엔드포인트를 데몬 스레드로 기동 — 인증이 없으므로 기본은 로컬(DQ_METRICS_HOST)에서만"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("/metrics", ""):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host or METRICS_HOST, int(port or METRICS_PORT)), Handler)
+        threading.Thread(target=server.serve_forever, name="dq-metrics", daemon=True).start()
+        return server
+
+
+class Stopwatch:
+    """구간 누적 측정 — lap(section) 마다 직전 lap 이후 경과 시간을 기록"""
+
+    def __init__(self, name: str, registry: Registry = None):
+        self.name = name
+        self.registry = registry or METRICS
+        self._t0 = self._t = time.perf_counter()
+
+    def lap(self, section: str):
+        now = time.perf_counter()
+        self.registry.observe(self.name, now - self._t, section=section)
+        self._t = now
+
+    def total(self, section: str = "total"):
+        self.registry.observe(self.name, time.perf_counter() - self._t0, section=section)
+
+
+METRICS = Registry()   # 프로세스 공용
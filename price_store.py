@@ -0,0 +1,68 @@
+"""
+로컬 가격 저장소
+On-disk per-ticker price history (Parquet)
+
+종목마다 <root>/<name>.parquet 파일 하나에 전체 일별 종가 이력을 보관합니다.
+프로세스 재시작·재배포 후에도 남아 있으므로 새로고침 때는 마지막 저장 시점 이후의
+봉만 받아 이어 붙이면 됩니다.
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+DATA_DIR = Path(os.environ.get("DQ_DATA_DIR", Path(__file__).resolve().parent / "data"))
+
+
+class PriceStore:
+    def __init__(self, root=None):
+        self.root = Path(root) if root else DATA_DIR / "prices"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, name: str) -> threading.RLock:
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.RLock())
+
+    def path(self, name: str) -> Path:
+        return self.root / f"{name}.parquet"
+
+    def load(self, name: str) -> pd.Series:
+        """저장된 전체 이력 (없으면 빈 Series)"""
+        p = self.path(name)
+        if not p.exists():
+            return pd.Series(dtype=float, name=name)
+        try:
+            s = pd.read_parquet(p)["close"]
+        except Exception:
+            # 쓰다 만 파일 등 손상된 경우 → 빈 이력으로 취급해 재수집 유도
+            return pd.Series(dtype=float, name=name)
+        s.name = name
+        return s
+
+    def last_timestamp(self, name: str):
+        s = self.load(name)
+        return s.index[-1] if not s.empty else None
+
+    def write(self, name: str, s: pd.Series):
+        """이력 전체를 교체 (임시 파일에 쓴 뒤 원자적으로 rename)"""
+        s = s[~s.index.duplicated(keep="last")].sort_index()
+        df = pd.DataFrame({"close": s.astype("float64")})
+        df.index.name = "date"
+        tmp = self.path(name).with_suffix(".parquet.tmp")
+        with self._lock(name):
+            df.to_parquet(tmp)
+            os.replace(tmp, self.path(name))
+        return df["close"].rename(name)
+
+    def append(self, name: str, new: pd.Series) -> pd.Series:
+        """새 봉을 이어 붙여 저장 — 겹치는 날짜는 새 값으로 덮어씀 (장중 미완성 봉 갱신)"""
+        with self._lock(name):
+            old = self.load(name)
+            if new is None or new.empty:
+                return old
+            merged = pd.concat([old, new]) if not old.empty else new
+            return self.write(name, merged)
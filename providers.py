@@ -0,0 +1,255 @@
+"""
+시장 데이터 제공자
+Pluggable market data providers
+
+fetch_prices 는 제공자 인터페이스(history)만 호출하므로, 실시간 yfinance 대신
+기록된 파일을 재생하는 ReplayProvider 로 바꾸면 네트워크 없이 대시보드·벤치마크를 돌릴 수 있습니다.
+
+환경 변수:
+    DQ_PROVIDER            yfinance (기본) | replay
+    DQ_REPLAY_DIR          재생용 파일 디렉터리 (기본 ./fixtures)
+    DQ_REPLAY_LATENCY      요청당 인위적 지연 (초)
+    DQ_REPLAY_JITTER       지연에 더할 무작위 편차 상한 (초)
+    DQ_REPLAY_FAILURE_RATE 요청 실패 확률 (0~1)
+    DQ_REPLAY_SEED         지연·실패 난수 시드
+    DQ_REPLAY_BATCH        1 보다 크면 yfinance 처럼 여러 종목을 요청 하나로 받되 프로세스에서 한 번에 하나씩 처리
+
+기록:
+    python providers.py record --out fixtures --period 2y
+    python providers.py record --out fixtures --period 5d --interval 1m
+"""
+
+import argparse
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+_DOWNLOAD_LOCK = threading.Lock()   # yf.download 는 모듈 전역 상태(결과·오류 dict)를 공유 — 동시 호출 금지
+
+
+def _strip_tz(s: pd.Series) -> pd.Series:
+    if getattr(s.index, "tz", None) is not None:
+        s.index = s.index.tz_localize(None)
+    return s
+
+
+def _start_arg(start, interval: str):
+    # 일봉은 날짜, 분봉은 시각까지 (yfinance 는 tz 없는 시각을 거래소 현지 시각으로 해석 — _strip_tz 결과와 같은 기준)
+    start = pd.Timestamp(start)
+    return start.strftime("%Y-%m-%d") if interval == "1d" else start.to_pydatetime()
+
+
+def _period_start(last: pd.Timestamp, period: str):
+    """'3mo', '2y', '5d' 같은 기간 문자열 → 마지막 시점 기준 시작 시각 (max 는 None)"""
+    m = re.fullmatch(r"(\d+)(d|wk|mo|y)", period or "")
+    if not m:
+        return None
+    n, unit = int(m.group(1)), m.group(2)
+    offset = {"d": pd.DateOffset(days=n), "wk": pd.DateOffset(weeks=n),
+              "mo": pd.DateOffset(months=n), "y": pd.DateOffset(years=n)}[unit]
+    return last.normalize() - offset
+
+
+class MarketDataProvider:
+    """종가 시리즈 제공자 인터페이스"""
+    name = "base"
+    batch_size = 1   # 요청 하나로 받을 수 있는 최대 종목 수 — 1 이면 fetch_prices 가 종목별로 요청
+
+    def history(self, symbol: str, timeout: float, period: str = None, start=None,
+                interval: str = "1d") -> pd.Series:
+        """
+        단일 종목 종가 (tz 없는 DatetimeIndex, 오름차순).
+        start 가 있으면 그 시점 이후 전체, 없으면 최근 period 구간. 데이터가 없으면 빈 Series.
+        interval 은 봉 간격 ('1d' 일봉, '1m'·'5m' 등 분봉).
+        """
+        raise NotImplementedError
+
+    def history_many(self, symbols, timeout: float, period: str = None, start=None,
+                     interval: str = "1d") -> dict:
+        """
+        여러 종목 종가 {symbol: Series 또는 예외}. 기본 구현은 history 를 차례로 호출하며 (종목 수 × timeout 까지 걸림),
+        요청 하나로 여러 종목을 받을 수 있는 제공자는 batch_size 와 함께 재정의합니다.
+        """
+        out = {}
+        for symbol in symbols:
+            try:
+                out[symbol] = self.history(symbol, timeout, period=period, start=start, interval=interval)
+            except Exception as e:
+                out[symbol] = e
+        return out
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+    batch_size = 100
+
+    def history(self, symbol, timeout, period=None, start=None, interval="1d"):
+        import yfinance as yf
+
+        # yf.download 는 전역 상태를 공유해 스레드 동시 호출에 안전하지 않으므로 Ticker.history 사용
+        if start is not None:
+            df = yf.Ticker(symbol).history(start=_start_arg(start, interval),
+                                           interval=interval, auto_adjust=True, timeout=timeout)
+        else:
+            df = yf.Ticker(symbol).history(period=period, interval=interval,
+                                           auto_adjust=True, timeout=timeout)
+        if df.empty:
+            return pd.Series(dtype=float)
+        return _strip_tz(df["Close"].squeeze())
+
+    def history_many(self, symbols, timeout, period=None, start=None, interval="1d"):
+        symbols = list(symbols)
+        if len(symbols) == 1:
+            return super().history_many(symbols, timeout, period, start, interval)
+        import yfinance as yf
+
+        kwargs = dict(start=_start_arg(start, interval)) if start is not None else dict(period=period)
+        # 다운로드끼리는 한 번에 하나지만 한 다운로드 안에서는 yfinance 가 종목별로 병렬 요청 (threads=True)
+        with _DOWNLOAD_LOCK:
+            df = yf.download(symbols, interval=interval, auto_adjust=True, group_by="column",
+                             threads=True, progress=False, timeout=timeout, **kwargs)
+        close = df["Close"] if not df.empty else pd.DataFrame()
+        return {symbol: _strip_tz(close[symbol].dropna().rename(None)) if symbol in close.columns
+                else pd.Series(dtype=float) for symbol in symbols}
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    기록된 CSV/Parquet 파일을 재생하는 오프라인 제공자.
+
+    파일은 <fixture_dir>/<심볼>.csv|.parquet (심볼의 ^, = 등은 _ 로 치환), 첫 열이 날짜,
+    'Close' 또는 'close' 열이 종가. 분봉은 <심볼>_<간격>.csv (예: _TNX_1m.csv). period 는 파일의 마지막 날짜 기준으로 잘라내므로
+    오래전에 기록한 파일도 항상 같은 결과를 냅니다.
+    """
+    name = "replay"
+
+    def __init__(self, fixture_dir=None, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed=None, batch_size: int = 1):
+        """batch_size > 1 이면 history_many 를 요청 하나(지연 1회)로 처리하되 yfinance 처럼 프로세스 전역 잠금으로 직렬화"""
+        self.fixture_dir  = Path(fixture_dir) if fixture_dir else FIXTURE_DIR
+        self.batch_size   = max(1, int(batch_size))
+        self.latency      = latency
+        self.jitter       = jitter
+        self.failure_rate = failure_rate
+        self._rng         = random.Random(seed)
+        self._rng_lock    = threading.Lock()
+        self._cache       = {}
+
+    @staticmethod
+    def fixture_stem(symbol: str, interval: str = "1d") -> str:
+        stem = re.sub(r"[^A-Za-z0-9.\-]", "_", symbol)
+        return stem if interval == "1d" else f"{stem}_{interval}"
+
+    def _load(self, symbol: str, interval: str = "1d") -> pd.Series:
+        key = (symbol, interval)
+        if key not in self._cache:
+            stem = self.fixture_stem(symbol, interval)
+            parquet, csv = self.fixture_dir / f"{stem}.parquet", self.fixture_dir / f"{stem}.csv"
+            if parquet.exists():
+                df = pd.read_parquet(parquet)
+            elif csv.exists():
+                df = pd.read_csv(csv, index_col=0, parse_dates=True)
+            else:
+                df = pd.DataFrame()
+            col = "Close" if "Close" in df.columns else "close"
+            s = df[col].astype("float64") if col in df.columns else pd.Series(dtype=float)
+            if not s.empty:
+                s.index = pd.DatetimeIndex(s.index)
+            self._cache[key] = _strip_tz(s.sort_index())
+        return self._cache[key]
+
+    def _request(self, what: str, timeout: float):
+        # 요청 하나의 지연·실패 재현
+        with self._rng_lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            fail  = self._rng.random() < self.failure_rate
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+        if delay > timeout:
+            raise TimeoutError(f"{what}: replay timeout ({delay:.2f}s > {timeout:.2f}s)")
+        if fail:
+            raise ConnectionError(f"{what}: simulated replay failure")
+
+    def history(self, symbol, timeout, period=None, start=None, interval="1d"):
+        self._request(symbol, timeout)
+        return self._slice(symbol, period, start, interval)
+
+    def history_many(self, symbols, timeout, period=None, start=None, interval="1d"):
+        symbols = list(symbols)
+        if self.batch_size <= 1 or len(symbols) == 1:
+            return super().history_many(symbols, timeout, period, start, interval)
+        with _DOWNLOAD_LOCK:   # yf.download 와 같은 직렬화
+            try:
+                self._request(f"{len(symbols)} symbols", timeout)
+            except Exception as e:
+                return {symbol: e for symbol in symbols}
+        return {symbol: self._slice(symbol, period, start, interval) for symbol in symbols}
+
+    def _slice(self, symbol, period, start, interval) -> pd.Series:
+        s = self._load(symbol, interval)
+        if s.empty:
+            return s.copy()
+        if start is not None:
+            return s[s.index >= pd.Timestamp(start)].copy()
+        begin = _period_start(s.index[-1], period)
+        return (s[s.index >= begin] if begin is not None else s).copy()
+
+
+def get_provider(name: str = None) -> MarketDataProvider:
+    """환경 변수(DQ_PROVIDER, DQ_REPLAY_*) 설정에 따른 제공자"""
+    name = (name or os.environ.get("DQ_PROVIDER", "yfinance")).lower()
+    if name == "replay":
+        seed = os.environ.get("DQ_REPLAY_SEED")
+        return ReplayProvider(
+            fixture_dir=os.environ.get("DQ_REPLAY_DIR") or None,
+            latency=float(os.environ.get("DQ_REPLAY_LATENCY", 0)),
+            jitter=float(os.environ.get("DQ_REPLAY_JITTER", 0)),
+            failure_rate=float(os.environ.get("DQ_REPLAY_FAILURE_RATE", 0)),
+            seed=int(seed) if seed is not None else None,
+            batch_size=int(os.environ.get("DQ_REPLAY_BATCH", 1)),
+        )
+    if name == "yfinance":
+        return YFinanceProvider()
+    raise ValueError(f"알 수 없는 제공자: {name}")
+
+
+def record_fixtures(symbols, out_dir, period: str = "2y", provider: MarketDataProvider = None,
+                    timeout: float = 10.0, fmt: str = "csv", interval: str = "1d"):
+    """제공자(기본 yfinance)에서 받은 종가를 ReplayProvider 가 읽는 형식으로 저장"""
+    provider = provider or YFinanceProvider()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for symbol in symbols:
+        s = provider.history(symbol, timeout, period=period, interval=interval)
+        if s.empty:
+            continue
+        df = pd.DataFrame({"Close": s})
+        df.index.name = "Date"
+        path = out_dir / f"{ReplayProvider.fixture_stem(symbol, interval)}.{fmt}"
+        df.to_parquet(path) if fmt == "parquet" else df.to_csv(path)
+        written[symbol] = len(df)
+    return written
+
+
+if __name__ == "__main__":
+    from market_data import TICKERS
+
+    parser = argparse.ArgumentParser(description="yfinance 종가를 재생용 파일로 기록")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    rec = sub.add_parser("record")
+    rec.add_argument("--out", default=str(FIXTURE_DIR))
+    rec.add_argument("--period", default="2y")
+    rec.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    rec.add_argument("--interval", default="1d", help="봉 간격 (1d, 1m, 5m ...)")
+    args = parser.parse_args()
+
+    for symbol, n in record_fixtures(TICKERS.values(), args.out, args.period,
+                                     fmt=args.format, interval=args.interval).items():
+        print(f"{symbol}: {n} rows")
@@ -0,0 +1,162 @@
+"""
+스왑 호가 파일 일괄 가져오기
+Bulk swap quote import (chunked, vectorized CIP)
+
+USD/KRW 스왑 포인트 이력 CSV 를 chunksize 행씩 읽어 묶음마다 이론 스왑·베이시스·마찰계수·괴리율을
+배열 연산 한 번으로 계산한 뒤 호가 이력 저장소(quotes.sqlite)에 추가합니다.
+한 번에 한 묶음만 메모리에 올리므로 파일 크기와 무관하게 메모리 사용량이 일정합니다.
+
+필수 열: 날짜(date), Bid(swap_bid), Ask(swap_ask)
+선택 열: spot, us_3m, kr_3m, days — 없으면 명령행 값(기본: 탭2 기본 입력값)을 사용
+
+실행 방법:
+    python quote_import.py swaps.csv --days 90 --chunksize 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from quote_store import COLUMNS, QuoteStore
+
+CHUNK_ROWS = 100_000
+
+# 파일 열 이름(소문자) → 내부 이름
+COLUMN_ALIASES = {
+    "date": "date", "ts": "date", "timestamp": "date", "datetime": "date", "날짜": "date", "일자": "date",
+    "bid": "swap_bid", "swap_bid": "swap_bid", "스왑bid": "swap_bid",
+    "ask": "swap_ask", "swap_ask": "swap_ask", "스왑ask": "swap_ask",
+    "spot": "spot", "현물": "spot", "usdkrw": "spot",
+    "us_3m": "us_3m", "us3m": "us_3m", "us_rate": "us_3m",
+    "kr_3m": "kr_3m", "kr3m": "kr_3m", "kr_rate": "kr_3m",
+    "days": "days", "tenor": "days", "만기": "days",
+}
+REQUIRED = ("date", "swap_bid", "swap_ask")
+_TZ_SUFFIX = r"\d:\d{2}(?::\d{2}(?:\.\d+)?)?\s*(?:Z|[+-]\d{2}:?\d{2})$"   # 시각 뒤의 UTC 오프셋 (Z, +09:00 ...)
+
+
+def _defaults(**overrides) -> dict:
+    d = {"spot": analysis.DEFAULT_SPOT, "us_3m": analysis.DEFAULT_US_3M,
+         "kr_3m": analysis.DEFAULT_KR_3M, "days": analysis.DEFAULT_DAYS}
+    d.update({k: v for k, v in overrides.items() if v is not None})
+    return d
+
+
+def parse_times(col: pd.Series) -> np.ndarray:
+    """
+    날짜 열 → tz 없는 datetime64 (해석 불가 NaT). 탭2 입력처럼 현지 시각 기준 —
+    UTC 오프셋이 붙은 값은 현지 시각으로 환산하고, 오프셋이 없는 값은 적힌 그대로 사용
+    """
+    ts = pd.to_datetime(col, errors="coerce", utc=True, format="ISO8601")   # 오프셋이 섞여 있어도 한 dtype 으로
+    retry = ts.isna() & col.notna()
+    if retry.any():   # ISO 형식이 아닌 값만 형식 추론으로 다시 (느리므로 필요한 행만)
+        ts[retry] = pd.to_datetime(col[retry], errors="coerce", utc=True, format="mixed")
+    out = ts.dt.tz_convert(None).to_numpy(copy=True)   # 오프셋 없는 값은 UTC 로 읽었으므로 적힌 시각 그대로
+    aware = col.astype("string").str.strip().str.contains(_TZ_SUFFIX, regex=True, na=False).to_numpy()
+    if aware.any():
+        out[aware] = _utc_to_local(out[aware])
+    return out
+
+
+def _utc_to_local(utc: np.ndarray) -> np.ndarray:
+    # UTC datetime64 → 현지 시각. 현지 오프셋(서머타임 포함)은 시간 단위로 한 번씩만 조회
+    hours, inverse = np.unique(utc.astype("datetime64[h]"), return_inverse=True)
+    offsets = np.array([0 if np.isnat(h) else time.localtime(int(h.astype("datetime64[s]").astype(np.int64))).tm_gmtoff
+                        for h in hours], dtype="timedelta64[s]")
+    return utc + offsets[inverse]
+
+
+def evaluate_chunk(raw: pd.DataFrame, defaults: dict, source: str) -> pd.DataFrame:
+    """원본 묶음 → quote_store.COLUMNS 형식 (날짜·Bid·Ask 가 비정상인 행은 제외)"""
+    df = raw.rename(columns=lambda c: COLUMN_ALIASES.get(str(c).strip().lower(), c))
+    missing = [c for c in REQUIRED if c not in df.columns]
+    if missing:
+        raise ValueError(f"필수 열 없음: {', '.join(missing)}")
+
+    ts = parse_times(df["date"])
+    num = {c: (pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float) if c in df.columns
+               else np.full(len(df), float(defaults[c])))
+           for c in ("spot", "us_3m", "kr_3m", "days", "swap_bid", "swap_ask")}
+    ok = ~np.isnat(ts) & np.logical_and.reduce([np.isfinite(v) for v in num.values()]) & (num["days"] > 0)
+    ts = ts[ok]
+    num = {c: v[ok] for c, v in num.items()}
+
+    cip = analysis.compute_cip_array(num["spot"], num["us_3m"], num["kr_3m"], num["days"],
+                                     num["swap_bid"], num["swap_ask"])
+    return pd.DataFrame({
+        "ts":               np.datetime_as_string(ts, unit="s"),   # strftime 보다 수십 배 빠름
+        "date":             np.datetime_as_string(ts, unit="D"),
+        "days":             num["days"].astype(int),
+        "spot":             num["spot"],
+        "us_3m":            num["us_3m"],
+        "kr_3m":            num["kr_3m"],
+        "swap_bid":         num["swap_bid"],
+        "swap_ask":         num["swap_ask"],
+        "theoretical_rate": cip.theoretical_rate,
+        "basis":            cip.basis,
+        "friction":         np.broadcast_to(cip.friction, len(ts)),
+        "deviation_pct":    cip.deviation_pct,
+        "source":           source,
+    }, columns=list(COLUMNS))
+
+
+def import_quotes(src, store: QuoteStore = None, chunksize: int = CHUNK_ROWS,
+                  source: str = None, progress=None, **defaults) -> dict:
+    """
+    CSV 경로 또는 파일 객체를 묶음 단위로 읽어 저장소에 추가.
+    progress(rows_done) 콜백이 있으면 묶음마다 호출합니다.
+
+    Returns:
+        {"rows": 저장한 행 수, "skipped": 제외한 행 수, "chunks": 묶음 수, "seconds": 소요 시간}
+    """
+    store = store or QuoteStore()
+    source = source or Path(getattr(src, "name", str(src))).name
+    defaults = _defaults(**defaults)
+    t0 = time.perf_counter()
+    rows = skipped = chunks = 0
+    try:
+        for raw in pd.read_csv(src, chunksize=chunksize, skipinitialspace=True):
+            out = evaluate_chunk(raw, defaults, source)
+            rows += store.insert_frame(out)
+            skipped += len(raw) - len(out)
+            chunks += 1
+            if progress:
+                progress(rows + skipped)
+    except (TypeError, OverflowError) as e:
+        # 형식이 어긋난 파일 — 호출하는 쪽(탭2·CLI)이 ValueError 만 처리하면 되도록 변환
+        raise ValueError(f"읽을 수 없는 파일 ({rows:,}행 저장 후 중단): {e}") from e
+    return {"rows": rows, "skipped": skipped, "chunks": chunks,
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="스왑 호가 CSV 일괄 가져오기")
+    parser.add_argument("files", nargs="+", help="CSV 파일 경로")
+    parser.add_argument("--chunksize", type=int,   default=CHUNK_ROWS, help="한 번에 읽을 행 수")
+    parser.add_argument("--spot",      type=float, default=None, help="spot 열이 없을 때 현물 환율")
+    parser.add_argument("--us-3m",     type=float, default=None, help="us_3m 열이 없을 때 미국 3M 금리 (%%)")
+    parser.add_argument("--kr-3m",     type=float, default=None, help="kr_3m 열이 없을 때 한국 3M 금리 (%%)")
+    parser.add_argument("--days",      type=int,   default=None, help="days 열이 없을 때 만기 (일)")
+    parser.add_argument("--db",        default=None, help="저장소 경로 (기본: <DQ_DATA_DIR>/quotes.sqlite)")
+    args = parser.parse_args(argv)
+
+    store = QuoteStore(args.db)
+    for path in args.files:
+        try:
+            result = import_quotes(path, store, args.chunksize, spot=args.spot, us_3m=args.us_3m,
+                                   kr_3m=args.kr_3m, days=args.days)
+        except (OSError, ValueError) as e:
+            print(f"❌ {path}: {e}", file=sys.stderr)
+            return 1
+        print(f"{path}: {result['rows']:,}행 저장 · {result['skipped']:,}행 제외 · "
+              f"{result['chunks']}묶음 · {result['seconds']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+스왑 호가 이력 저장소
+Append-only swap quote history (SQLite)
+
+탭2에 입력한 호가 묶음(현물·금리·만기·Bid/Ask)과 그때의 CIP 계산 결과를 시각과 함께
+<DATA_DIR>/quotes.sqlite 에 추가만 합니다. 기록은 큐에 넣고 바로 반환하며 백그라운드 스레드가
+묶어서 쓰므로 화면 스레드는 디스크 I/O 를 기다리지 않습니다. 조회는 (date, days) 인덱스로
+기간·만기 범위만 읽습니다.
+"""
+
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis import compute_cip
+from metrics import METRICS
+from price_store import DATA_DIR
+
+QUOTE_DB = DATA_DIR / "quotes.sqlite"
+
+WRITE_RETRY_DELAY = 0.5   # 쓰기 실패 후 첫 재시도 대기 (초), 이후 2배씩 (최대 30초)
+WRITE_MAX_RETRIES = 8     # 같은 묶음이 이만큼 연속 실패하면 parked 로 옮기고 다음 묶음 진행
+
+COLUMNS = ("ts", "date", "days", "spot", "us_3m", "kr_3m", "swap_bid", "swap_ask",
+           "theoretical_rate", "basis", "friction", "deviation_pct", "source")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    ts               TEXT    NOT NULL,   -- ISO 시각 (초 단위)
+    date             TEXT    NOT NULL,   -- YYYY-MM-DD
+    days             INTEGER NOT NULL,
+    spot             REAL, us_3m REAL, kr_3m REAL,
+    swap_bid         REAL, swap_ask REAL,
+    theoretical_rate REAL, basis REAL, friction REAL, deviation_pct REAL,
+    source           TEXT    NOT NULL DEFAULT 'input'   -- input(탭2 입력) | 가져온 파일 이름
+);
+CREATE INDEX IF NOT EXISTS quotes_date_days ON quotes (date, days);
+"""
+
+
+def _keep_newest(latest: dict, rows):
+    # {만기: 행} 에 시각(ISO 문자열, 사전순 = 시간순)이 같거나 늦은 행만 반영 — 같으면 나중에 추가된 행
+    for row in rows:
+        cur = latest.get(row[2])
+        if cur is None or row[0] >= cur[0]:
+            latest[row[2]] = row
+
+
+class QuoteStore:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else QUOTE_DB
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")   # 쓰는 동안에도 조회가 막히지 않도록
+            conn.executescript(_SCHEMA)
+            if "source" not in {r[1] for r in conn.execute("PRAGMA table_info(quotes)")}:
+                conn.execute("ALTER TABLE quotes ADD COLUMN source TEXT NOT NULL DEFAULT 'input'")
+            conn.commit()
+        self._pending = []                # 아직 디스크에 쓰지 않은 행
+        self._cond    = threading.Condition()
+        self._writing = []                # 쓰는 중인 행 (flush·latest 용 — history 는 커밋과 배타적으로 읽음)
+        self._io      = threading.Lock()  # 커밋 ↔ (대기 행 복사 + 디스크 조회) 상호 배제
+        self._latest  = None              # {만기: 시각이 가장 늦은 행} — 첫 latest() 때 한 번만 디스크에서 읽음
+        self.version  = 0                 # 추가할 때마다 증가 (화면 캐시 키)
+        self.parked   = []                # 재시도를 다 써도 쓰지 못한 행 (retry_parked 로 다시 시도)
+        self.last_error: Optional[str] = None
+        self._thread  = threading.Thread(target=self._run, name="dq-quote-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    # ── 기록 ───────────────────────────────────────────────────────────────
+    def record(self, spot, us_3m, kr_3m, days, swap_bid, swap_ask, ts: datetime = None) -> tuple:
+        """호가 묶음 하나를 쓰기 큐에 넣고 즉시 반환 → 기록될 행"""
+        ts = ts or datetime.now()
+        cip = compute_cip(spot, us_3m, kr_3m, days, swap_bid, swap_ask)
+        row = (ts.isoformat(timespec="seconds"), ts.strftime("%Y-%m-%d"), int(days),
+               float(spot), float(us_3m), float(kr_3m), float(swap_bid), float(swap_ask),
+               float(cip.theoretical_rate), float(cip.basis), float(cip.friction), float(cip.deviation_pct),
+               "input")
+        with self._cond:
+            self._pending.append(row)
+            self._remember([row])
+            self._cond.notify()
+        return row
+
+    def _remember(self, rows):
+        # self._cond 를 잡은 상태에서 호출
+        self.version += 1
+        if self._latest is not None:
+            _keep_newest(self._latest, rows)
+
+    def _run(self):
+        conn = self._connect()   # 쓰기 전용 연결은 이 스레드만 사용
+        failures = 0
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            error = None
+            with self._io:
+                with self._cond:
+                    batch, self._pending = self._pending, []
+                    self._writing = batch
+                try:
+                    with conn:
+                        conn.executemany(f"INSERT INTO quotes VALUES ({','.join('?' * len(COLUMNS))})", batch)
+                except sqlite3.Error as e:
+                    error = e
+                with self._cond:
+                    if error is not None:
+                        failures += 1
+                        if failures >= WRITE_MAX_RETRIES:
+                            self.parked.extend(batch)   # 포기한 묶음은 따로 두고 새 입력은 계속 쓰기 시도
+                            failures = 0
+                        else:
+                            self._pending[:0] = batch   # 실패한 묶음은 다음 차례에 다시 시도
+                    self._writing = []
+                    self._cond.notify_all()
+            if error is None:
+                failures, self.last_error = 0, None
+                continue
+            # 잠김·디스크 부족·스키마 오류 — 바로 다시 시도하면 CPU 만 태우므로 간격을 늘려 가며 재시도
+            self.last_error = f"{type(error).__name__}: {error}"
+            METRICS.inc("dq_quote_write_errors_total")
+            if failures:
+                with self._cond:
+                    self._cond.wait(min(WRITE_RETRY_DELAY * 2 ** (failures - 1), 30.0))
+
+    def retry_parked(self) -> int:
+        """parked 행을 쓰기 큐로 되돌림 (원인을 해결한 뒤 호출) → 되돌린 행 수"""
+        with self._cond:
+            rows, self.parked = self.parked, []
+            self._pending[:0] = rows
+            self._cond.notify()
+        return len(rows)
+
+    def insert_frame(self, df: pd.DataFrame) -> int:
+        """COLUMNS 열을 가진 DataFrame 을 한 트랜잭션으로 바로 추가 (대량 가져오기용, 호출 스레드에서 실행)"""
+        if df.empty:
+            return 0
+        cols = [np.asarray(df[c]).tolist() for c in COLUMNS]   # 열 단위로 파이썬 값 변환 후 행으로 묶음
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA synchronous=NORMAL")   # WAL 에서는 커밋 단위 일관성 유지
+            conn.executemany(f"INSERT INTO quotes VALUES ({','.join('?' * len(COLUMNS))})", zip(*cols))
+        last = df.sort_values("ts", kind="stable").groupby("days", sort=False).tail(1)   # 파일이 최신순이어도 시각 기준
+        with self._cond:
+            self._remember(list(zip(*(np.asarray(last[c]).tolist() for c in COLUMNS))))
+        return len(df)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 행이 모두 쓰일 때까지 대기 (종료·배치 작업용) — parked 행은 기다리지 않음"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    # ── 조회 ───────────────────────────────────────────────────────────────
+    def history(self, start=None, end=None, days: Optional[int] = None) -> pd.DataFrame:
+        """
+        [start, end] 날짜 범위(와 만기)의 호가 이력, 시각 오름차순 DataFrame (index: ts).
+        아직 디스크에 쓰이지 않은 최근 입력도 포함합니다 (값이 같은 호가도 입력한 만큼 모두).
+        """
+        start = pd.Timestamp(start).strftime("%Y-%m-%d") if start is not None else "0000-00-00"
+        end   = pd.Timestamp(end).strftime("%Y-%m-%d") if end is not None else "9999-12-31"
+        sql, args = "SELECT * FROM quotes WHERE date BETWEEN ? AND ?", [start, end]
+        if days is not None:
+            sql, args = sql + " AND days = ?", args + [int(days)]
+        rows, pending = self._read_with_pending(sql, args)
+        rows += [r for r in pending if start <= r[1] <= end and (days is None or r[2] == days)]
+
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df["ts"] = pd.to_datetime(df["ts"])
+        return df.set_index("ts").sort_index()
+
+    def _read_with_pending(self, sql: str, args=()) -> tuple:
+        """
+        (디스크 조회 결과, 아직 쓰이지 않은 행) — 읽는 동안 쓰기 스레드가 커밋하지 않으므로
+        같은 행이 양쪽에 모두 있거나 모두 빠지지 않음 (진행 중인 커밋이 있으면 그것만 기다림)
+        """
+        with self._io:
+            with self._cond:
+                pending = self._pending + self.parked
+            with closing(self._connect()) as conn:
+                return conn.execute(sql, args).fetchall(), pending
+
+    def latest(self) -> pd.DataFrame:
+        """만기별로 시각이 가장 늦은 호가 한 행씩 (아직 쓰이지 않은 입력 포함), 만기 오름차순"""
+        with self._cond:
+            if self._latest is None:
+                cols = ", ".join(COLUMNS)
+                with closing(self._connect()) as conn:
+                    rows = conn.execute(f"SELECT {cols} FROM (SELECT {cols}, ROW_NUMBER() OVER "
+                                        f"(PARTITION BY days ORDER BY ts DESC, rowid DESC) AS n FROM quotes) "
+                                        f"WHERE n = 1").fetchall()
+                self._latest = {}
+                _keep_newest(self._latest, rows + self._writing + self._pending + self.parked)
+            rows = [self._latest[d] for d in sorted(self._latest)]
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def tenors(self) -> list:
+        """기록된 만기 목록 (아직 쓰이지 않은 입력 포함), 오름차순"""
+        rows, pending = self._read_with_pending("SELECT DISTINCT days FROM quotes")
+        return sorted({r[0] for r in rows} | {r[2] for r in pending})
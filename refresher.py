@@ -0,0 +1,188 @@
+"""
+프로세스 단위 백그라운드 데이터 갱신기
+Process-wide background market data refresher
+
+서버 프로세스당 스레드 하나가 주기적으로 시세를 받아 불변 스냅샷으로 게시합니다.
+각 브라우저 세션은 게시된 스냅샷을 읽기만 하므로 페이지 재실행이 네트워크를 기다리지 않고,
+여러 세션이 동시에 갱신을 요청해도 실제 수집은 한 번(single flight)만 일어납니다.
+
+스냅샷의 가격 배열은 읽기 전용(market_data.freeze)이고, 세션이 기간별로 잘라 쓰는 Series 는
+이 배열의 뷰(복사 없음)이므로 세션이 늘어도 가격 데이터는 프로세스에 한 벌만 있습니다.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional
+
+import numpy as np
+
+from analysis import MarketFrame, build_market_frame, data_fingerprint
+from market_data import PRICE_DTYPE, freeze
+from metrics import METRICS
+
+REFRESH_SECONDS = 300   # 기존 st.cache_data(ttl=300) 과 같은 주기
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    data: Mapping                 # {name: 종가 Series} — 읽기 전용
+    timings: Mapping              # {name: 수집 소요 시간(초)}
+    fetched_at: datetime
+    version: int
+    frame: MarketFrame            # 공통 거래일 정렬 가격·수익률 행렬 (갱신당 1회 계산)
+    fingerprint: str              # 데이터 내용 해시 — 내용이 같으면 버전이 달라도 같은 값
+    status: Mapping               # {name: 종목별 수신 상태} — status_fn 이 없으면 빈 dict
+
+    def arrays(self) -> list:
+        """스냅샷이 가진 numpy 배열 (같은 배열은 한 번만) — 메모리 집계용"""
+        seen, out = set(), []
+        for arr in (*(a for s in self.data.values() for a in (s.to_numpy(), s.index.asi8)),
+                    self.frame.index.asi8, self.frame.prices, self.frame.returns_pct, self.frame.delta):
+            base = arr
+            while isinstance(base.base, np.ndarray):
+                base = base.base
+            if id(base) not in seen:
+                seen.add(id(base))
+                out.append(base)
+        return out
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays())
+
+
+def session_bytes(views: dict, snapshot: "MarketSnapshot") -> int:
+    """세션이 들고 있는 {name: Series} 중 스냅샷과 메모리를 공유하지 않는(복사된) 배열 크기 합"""
+    shared = snapshot.arrays()
+    total = 0
+    for s in views.values():
+        for arr in (s.to_numpy(), s.index.asi8):
+            if not any(np.may_share_memory(arr, b) for b in shared):
+                total += arr.nbytes
+    return total
+
+
+class MarketRefresher:
+    def __init__(self, fetch_fn: Callable, interval: float = REFRESH_SECONDS, status_fn: Callable = None,
+                 dtype=PRICE_DTYPE):
+        """
+        fetch_fn() → (data, timings)
+        status_fn() → {name: 수신 상태} — 게시할 때마다 스냅샷에 함께 담음 (종목별 나이 표시용)
+        dtype: 스냅샷 가격·수익률 행렬 dtype (DQ_FLOAT32)
+        """
+        self._fetch_fn  = fetch_fn
+        self.dtype      = dtype
+        self._status_fn = status_fn
+        self.interval   = interval
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._lock      = threading.Lock()
+        self._inflight: Optional[threading.Event] = None
+        self._published = threading.Event()
+        self._wake      = threading.Event()
+        self._stop      = threading.Event()
+        self._thread    = None
+        self._listeners = []
+        self.last_error: Optional[str] = None
+
+    # ── 수명 주기 ──────────────────────────────────────────────────────────
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="dq-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def subscribe(self, fn: Callable):
+        """fn(snapshot) 을 게시할 때마다 갱신 스레드에서 호출 — 이미 게시된 스냅샷이 있으면 바로 한 번 호출"""
+        self._listeners.append(fn)
+        if self._snapshot is not None:
+            self._notify(fn, self._snapshot)
+        return fn
+
+    def _notify(self, fn: Callable, snapshot: MarketSnapshot):
+        try:
+            fn(snapshot)
+        except Exception as e:
+            self.last_error = f"구독자 오류: {e!r}"
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    # ── 갱신 ───────────────────────────────────────────────────────────────
+    def refresh(self) -> Optional[MarketSnapshot]:
+        """
+        즉시 갱신 후 최신 스냅샷 반환. 이미 수집 중이면 새 요청을 보내지 않고
+        진행 중인 수집이 끝나기를 기다려 그 결과를 함께 사용합니다.
+        """
+        with self._lock:
+            flight = self._inflight
+            leader = flight is None
+            if leader:
+                flight = self._inflight = threading.Event()
+        if not leader:
+            flight.wait()
+            return self._snapshot
+
+        t0 = time.perf_counter()
+        try:
+            data, timings = self._fetch_fn()
+            if data or self._snapshot is None:
+                self._publish(data, timings)
+                self.last_error = None
+            else:
+                # 전 종목 실패 → 직전 스냅샷 유지
+                self.last_error = f"수집 실패 ({time.perf_counter() - t0:.1f}s)"
+        except Exception as e:
+            self.last_error = repr(e)
+            if self._snapshot is None:
+                self._publish({}, {})
+        finally:
+            METRICS.observe("dq_refresh_seconds", time.perf_counter() - t0)
+            with self._lock:
+                self._inflight = None
+            flight.set()
+        return self._snapshot
+
+    def _publish(self, data: dict, timings: dict):
+        prev = self._snapshot
+        data = {name: freeze(s, self.dtype) for name, s in data.items()}   # 이미 캐시에서 고정된 값이면 복사 없음
+        with METRICS.timer("dq_compute_seconds", stage="fingerprint"):
+            fingerprint = data_fingerprint(data)
+        status = MappingProxyType(self._status_fn() if self._status_fn else {})
+        if prev is not None and prev.fingerprint == fingerprint and not timings:
+            # 만료된 종목이 없어 요청하지 않았고 값도 그대로 → 같은 스냅샷 유지 (버전·수집 시각·구독자 호출 없음)
+            self._snapshot = replace(prev, status=status)
+            return
+        if prev is not None and prev.fingerprint == fingerprint:
+            frame = prev.frame   # 다시 받았지만 값이 그대로면 행렬 재계산 생략
+        else:
+            with METRICS.timer("dq_compute_seconds", stage="market_frame"):
+                frame = build_market_frame(data, dtype=self.dtype)
+        # 참조 교체 한 번으로 게시 → 읽는 쪽은 락 없이 항상 완전한 스냅샷을 봄
+        self._snapshot = MarketSnapshot(
+            data=MappingProxyType(data),
+            timings=MappingProxyType(dict(timings)),
+            fetched_at=datetime.now(),
+            version=(prev.version if prev else 0) + 1,
+            frame=frame,
+            fingerprint=fingerprint,
+            status=status,
+        )
+        self._published.set()
+        for fn in list(self._listeners):
+            self._notify(fn, self._snapshot)
+
+    # ── 조회 ───────────────────────────────────────────────────────────────
+    def snapshot(self, timeout: Optional[float] = None) -> Optional[MarketSnapshot]:
+        """최신 스냅샷. 프로세스 기동 직후 첫 수집이 끝나기 전이라면 그때까지만 대기"""
+        if self._snapshot is None:
+            self._published.wait(timeout)
+        return self._snapshot
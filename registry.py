@@ -0,0 +1,99 @@
+"""
+종목 레지스트리
+Configurable instrument registry
+
+수집 대상·표시 이름·서식·색상·표시 위치를 tickers.json 한 곳에서 정의합니다.
+수집(market_data), 계산(MarketFrame·상관계수), 화면(카드·차트·요약표)이 모두 이 목록을 읽으므로
+종목을 추가할 때는 설정 파일에 한 줄만 넣으면 됩니다.
+
+환경 변수:
+    DQ_TICKERS_FILE   종목 설정 파일 경로 (기본: ./tickers.json)
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+TICKERS_FILE = Path(os.environ.get("DQ_TICKERS_FILE", Path(__file__).resolve().parent / "tickers.json"))
+
+VIEWS = ("card", "chart", "direction", "summary")
+
+# 판정 규칙(analysis.SCORE_KEYS)과 CIP 기본 금리(IRX)가 참조하므로 설정에서 빠지면 안 되는 종목
+REQUIRED_KEYS = ("TNX", "SPX", "EEM", "EMB", "DXY", "IRX")
+
+
+@dataclass(frozen=True)
+class Instrument:
+    key: str                       # 내부 이름 (TNX) — 저장소 파일·계산 열 이름
+    symbol: str                    # 제공자 심볼 (^TNX)
+    label: str                     # 화면 표시 이름
+    short: str = ""                # 축·히트맵용 짧은 이름 (없으면 key)
+    fmt: str = "{:,.2f}"           # 현재값 서식
+    color: str = "#64748b"
+    group: str = "기타"
+    views: tuple = ("direction",)
+    rising: Optional[str] = None   # 상승이 "good" | "bad" — 없으면 신호 없음(⚪)
+    band: float = 0.0              # |변화율| 이 이 값을 넘어야 신호
+    ttl: Optional[float] = None    # 종목별 캐시 유효 시간 (없으면 market_data.DEFAULT_TTL)
+
+    @property
+    def name(self) -> str:
+        return self.short or self.key
+
+    def signal(self, d: Optional[float]) -> str:
+        """일간 변화율(%) → 🟢 / 🔴 / ⚪"""
+        if d is None or self.rising is None or abs(d) <= self.band:
+            return "⚪"
+        return "🟢" if (d > 0) == (self.rising == "good") else "🔴"
+
+
+class InstrumentRegistry:
+    def __init__(self, instruments):
+        self.instruments = tuple(instruments)
+        self._by_key = {i.key: i for i in self.instruments}
+        if len(self._by_key) != len(self.instruments):
+            raise ValueError("종목 key 중복")
+        missing = [k for k in REQUIRED_KEYS if k not in self._by_key]
+        if missing:
+            raise ValueError(f"필수 종목 없음: {', '.join(missing)}")
+
+    @classmethod
+    def load(cls, path=None) -> "InstrumentRegistry":
+        raw = json.loads(Path(path or TICKERS_FILE).read_text(encoding="utf-8"))
+        items = []
+        for d in raw["instruments"]:
+            d = {k: v for k, v in d.items() if not k.startswith("_")}
+            unknown = set(d.get("views", ())) - set(VIEWS)
+            if unknown:
+                raise ValueError(f"{d['key']}: 알 수 없는 views {sorted(unknown)}")
+            items.append(Instrument(**{**d, "views": tuple(d.get("views", ("direction",)))}))
+        return cls(items)
+
+    def __getitem__(self, key: str) -> Instrument:
+        return self._by_key[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._by_key
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def view(self, view: str) -> list:
+        """해당 위치에 표시할 종목 (설정 파일 순서)"""
+        return [i for i in self.instruments if view in i.views]
+
+    def keys(self, view: str = None) -> list:
+        return [i.key for i in (self.view(view) if view else self.instruments)]
+
+    def tickers(self, view: str = None) -> dict:
+        """{key: symbol} — fetch_prices 입력 형식"""
+        return {i.key: i.symbol for i in (self.view(view) if view else self.instruments)}
+
+    def ttl(self) -> dict:
+        """설정에 TTL 이 있는 종목만 {key: 초}"""
+        return {i.key: i.ttl for i in self.instruments if i.ttl is not None}
+
+
+REGISTRY = InstrumentRegistry.load()
@@ -0,0 +1,116 @@
+import itertools
+import random
+from types import SimpleNamespace
+
+import pandas as pd
+
+from alerts import AlertEngine, AlertStore
+from analysis import build_alerts
+
+KEYS = ("TNX", "SPX", "EEM", "EMB", "DXY")
+GRID = (-1.2, -1.0, -0.6, -0.5, 0.0, 0.5, 0.6, None)   # 알림 규칙 경계값 포함
+
+
+def legacy_alerts(deltas):
+    # 규칙 파일(alert_rules.json) 도입 전의 if/elif 그대로
+    tnx_d, spx_d = deltas.get("TNX"), deltas.get("SPX")
+    eem_d, emb_d = deltas.get("EEM"), deltas.get("EMB")
+    dxy_d        = deltas.get("DXY")
+    alerts = []
+    if tnx_d is not None and spx_d is not None:
+        if tnx_d > 0 and spx_d > 0:
+            alerts.append(("success", "✅ 성장 달러 신호: 금리↑ + 주식↑ 동반 상승 → 미국 경제 성장 기대 반영. 달러 강세는 구조적 성격."))
+        elif tnx_d > 0 and spx_d < 0:
+            alerts.append(("danger", "🚨 공포 달러 경고: 금리↑ + 주식↓ 역방향 발생 → 위험회피 국면. EM 자금 이탈 주의!"))
+        elif tnx_d < 0 and spx_d < 0:
+            alerts.append(("warning", "⚠️ 복합 약세 신호: 금리↓ + 주식↓ 동반 하락 → 경기침체 우려. 안전자산 수요 점검 필요."))
+        else:
+            alerts.append(("info", "💡 유동성 랠리 신호: 금리↓ + 주식↑ → 완화적 금융 환경. 달러 강세 지속성 불투명."))
+    if eem_d is not None and emb_d is not None:
+        if eem_d < -1.0 and emb_d < -1.0:
+            alerts.append(("danger", "🚨 EM 전면 이탈: EEM + EMB 동반 급락 → 신흥국 유동성 위기 경고!"))
+        elif eem_d < -0.5 or emb_d < -0.5:
+            alerts.append(("warning", "⚠️ EM 부분 이탈 감지: 신흥국 자산 선별적 약세. 달러 강세 압력 지속 중."))
+    if dxy_d is not None:
+        if dxy_d > 0.5:
+            alerts.append(("warning", f"📊 DXY 강세 가속 (+{dxy_d:.2f}%): 달러 지수 급등 → 원화·신흥국 통화 압박 예상."))
+        elif dxy_d < -0.5:
+            alerts.append(("info", f"📊 DXY 약세 전환 ({dxy_d:.2f}%): 달러 지수 하락 → 위험자산 숨통."))
+    if not alerts:
+        alerts.append(("info", "📡 현재 뚜렷한 방향성 신호 없음. 지속 모니터링 권장."))
+    return alerts
+
+
+def test_build_alerts_matches_legacy_rules():
+    # 그룹끼리는 독립 — 그룹별 경계값 전체 조합 + 다섯 종목을 함께 뽑은 임의 조합
+    cases = [dict(zip(keys, values)) for keys in (("TNX", "SPX"), ("EEM", "EMB"), ("DXY",))
+             for values in itertools.product(GRID, repeat=len(keys))]
+    rng = random.Random(0)
+    cases += [dict(zip(KEYS, rng.choices(GRID, k=len(KEYS)))) for _ in range(500)]
+    for deltas in [{}] + cases:
+        assert build_alerts(deltas) == legacy_alerts(deltas), deltas
+
+
+# ── 엔진 ──────────────────────────────────────────────────────────────────────
+class Frame:
+    def __init__(self, as_of, **deltas):
+        self.as_of, self._deltas = pd.Timestamp(as_of), deltas
+
+    def deltas(self):
+        return dict(self._deltas)
+
+
+def snapshot(fingerprint, as_of="2024-01-02", **deltas):
+    return SimpleNamespace(fingerprint=fingerprint, frame=Frame(as_of, **deltas))
+
+
+class RecordingSink:
+    name = "recording"
+
+    def __init__(self, engine=None):
+        self.sent, self.engine, self.lock_free = [], engine, []
+
+    def send(self, alerts):
+        self.sent.append([a.rule for a in alerts])
+        if self.engine is not None:   # 전송 중에는 엔진 잠금이 풀려 있어야 함
+            got = self.engine._lock.acquire(timeout=1)
+            self.lock_free.append(got)
+            if got:
+                self.engine._lock.release()
+
+
+def test_engine_records_and_sends_each_alert_once(tmp_path):
+    sink = RecordingSink()
+    engine = AlertEngine(store=AlertStore(tmp_path / "alerts.sqlite"), sinks=[sink])
+    snap = snapshot("a", TNX=1.0, SPX=-1.0, EEM=-2.0, EMB=-2.0, DXY=0.0)
+
+    result = engine.on_snapshot(snap)
+    assert [a.rule for a in result.alerts] == ["fear_dollar", "em_exodus"]
+    assert sink.sent == [["fear_dollar", "em_exodus"]]
+
+    # 같은 스냅샷 → 재평가 없음, 같은 봉의 다른 스냅샷 → 이미 기록된 알림은 다시 보내지 않음
+    assert engine.on_snapshot(snap) is result
+    engine.on_snapshot(snapshot("b", TNX=1.0, SPX=-1.0, EEM=-2.0, EMB=-2.0, DXY=0.7))
+    assert sink.sent[1:] == [["dxy_surge"]]
+    assert len(engine.store.recent()) == 3
+
+
+def test_result_for_reads_without_recording(tmp_path):
+    sink = RecordingSink()
+    engine = AlertEngine(store=AlertStore(tmp_path / "alerts.sqlite"), sinks=[sink])
+    current = engine.on_snapshot(snapshot("a", TNX=1.0, SPX=1.0))
+    assert engine.result_for(snapshot("a", TNX=1.0, SPX=1.0)) is current
+
+    pending = engine.result_for(snapshot("b", TNX=1.0, SPX=-1.0))   # 갱신 스레드가 아직 반영하지 않은 스냅샷
+    assert [a.rule for a in pending.alerts] == ["fear_dollar"]
+    assert engine.current is current
+    assert sink.sent == [["growth_dollar"]]
+    assert len(engine.store.recent()) == 1
+
+
+def test_sinks_run_outside_engine_lock(tmp_path):
+    engine = AlertEngine(store=AlertStore(tmp_path / "alerts.sqlite"))
+    sink = RecordingSink(engine)
+    engine.sinks = [sink]
+    engine.on_snapshot(snapshot("a", TNX=1.0, SPX=-1.0))   # 잠금을 쥔 채 전송하면 acquire 가 시간 초과
+    assert sink.lock_free == [True]
@@ -0,0 +1,139 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from analysis import (CorrelationHistory, RollingCorrelation, cip_surface, compute_cip, compute_scores,
+                      decide_verdict, downsample, lttb_indices, score_arrays, verdict_timeline)
+
+GRID = (-1.2, -1.0, -0.5, 0.0, 0.5, 0.6, None)   # 점수 규칙 경계값 포함
+
+
+def random_returns(rows=120, cols=4, seed=0, nan_frac=0.1):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(rows, cols))
+    values[rng.random(values.shape) < nan_frac] = np.nan
+    return pd.DataFrame(values, index=pd.bdate_range("2024-01-01", periods=rows),
+                        columns=[f"C{i}" for i in range(cols)])
+
+
+# ── 롤링 상관관계 ────────────────────────────────────────────────────────────
+def test_rolling_correlation_matches_dataframe_corr():
+    returns, window = random_returns(), 20
+    engine = RollingCorrelation(window, returns.shape[1], rebase_every=7)   # 재합산 경로도 함께 확인
+    for i, row in enumerate(returns.to_numpy()):
+        engine.push(row)
+        expected = returns.iloc[max(0, i - window + 1):i + 1].corr().to_numpy()
+        np.testing.assert_allclose(engine.matrix(), expected, atol=1e-9, equal_nan=True)
+
+
+def test_correlation_history_incremental_equals_full():
+    returns = random_returns(rows=80)
+    incremental = CorrelationHistory(20, returns.columns)
+    for end in (30, 31, 55, 80):
+        dates, mats = incremental.update(returns.iloc[:end])
+    full_dates, full_mats = CorrelationHistory(20, returns.columns).update(returns)
+    assert list(dates) == list(full_dates) == list(returns.index)
+    np.testing.assert_allclose(mats, full_mats, atol=1e-9, equal_nan=True)
+
+
+# ── CIP 곡면 ─────────────────────────────────────────────────────────────────
+def test_cip_surface_matches_compute_cip_at_zero_shock():
+    args = (1440.0, 3.69, 2.70, 90, -720.0, -220.0)
+    surf = cip_surface(*args)
+    cip = compute_cip(*args)
+    r = int(np.flatnonzero(surf.rate_shocks == 0)[0])
+    s = int(np.flatnonzero(surf.spot_shocks == 0)[0])
+    t = int(np.flatnonzero(surf.tenors == 90)[0])
+    assert np.isclose(surf.theoretical[r, s, t], cip.theoretical_rate)
+    assert np.isclose(surf.basis[r, s, t], cip.basis)
+    assert np.isclose(surf.friction[t], cip.friction)
+    assert np.isclose(surf.deviation_pct[r, s, t], cip.deviation_pct)
+
+
+# ── 점수 · 판정 ──────────────────────────────────────────────────────────────
+def legacy_scores(deltas, basis, friction):
+    # 배열 규칙(score_arrays) 도입 전의 스칼라 규칙 그대로
+    tnx, spx, eem, emb, dxy = (deltas.get(k) or 0 for k in analysis.SCORE_KEYS)
+    growth = fear = tight = 0
+    if tnx > 0 and spx > 0:   growth += 2
+    elif tnx > 0 and spx < 0: fear += 2
+    elif tnx < 0 and spx < 0: fear += 1
+    if eem < -1.0:   fear += 2
+    elif eem < 0:    fear += 1
+    elif eem > 0.5:  growth += 1
+    if emb < -1.0:   fear += 2
+    elif emb < 0:    fear += 1
+    if dxy > 0.5:    fear += 1
+    elif dxy < -0.5: growth += 1
+    if basis < -200:   tight += 3
+    elif basis < -50:  tight += 2
+    elif basis < 0:    tight += 1
+    if friction > 300:   tight += 2
+    elif friction > 150: tight += 1
+    return growth, fear, tight
+
+
+def legacy_verdict(growth, fear, tight):
+    if growth + fear + tight == 0:        return "neutral"
+    if tight >= 3:                        return "tight"
+    if fear > growth and fear >= 2:       return "fear"
+    if growth > fear:                     return "growth"
+    return "neutral"
+
+
+def test_scores_match_scalar_rules():
+    combos = [dict(zip(analysis.SCORE_KEYS, v)) for v in itertools.product(GRID, repeat=len(analysis.SCORE_KEYS))]
+    columns = [np.array([np.nan if d[k] is None else d[k] for d in combos]) for k in analysis.SCORE_KEYS]
+    for basis, friction in ((0.0, 0.0), (-50.0, 150.0), (-60.0, 200.0), (-250.0, 350.0)):
+        g, f, t = score_arrays(*columns, basis, friction)
+        verdicts = analysis.verdict_array(g, f, t).tolist()
+        for deltas, *scores, verdict in zip(combos, g.tolist(), f.tolist(), t.tolist(), verdicts):
+            expected = legacy_scores(deltas, basis, friction)
+            assert tuple(scores) == expected, deltas
+            assert verdict == legacy_verdict(*expected)
+        for deltas in combos[::97]:   # 스칼라 경로(탭3 오늘 판정)도 같은 규칙
+            scores = compute_scores(deltas, basis, friction)
+            assert scores == legacy_scores(deltas, basis, friction)
+            assert decide_verdict(*scores) == legacy_verdict(*scores)
+
+
+def test_verdict_timeline_matches_per_row_scores():
+    returns = random_returns(rows=200, cols=5, seed=3, nan_frac=0.05)
+    returns.columns = list(analysis.SCORE_KEYS)
+    returns.iloc[5] = np.nan   # 판정 종목 변화율이 모두 없는 행은 제외
+    basis = pd.Series(np.linspace(-300, 50, len(returns)), index=returns.index)
+    timeline = verdict_timeline(returns, basis=basis, friction=160.0)
+
+    assert returns.index[5] not in timeline.index
+    assert len(timeline) == len(returns) - 1
+    for date, row in timeline.iterrows():
+        deltas = {k: (None if np.isnan(v) else v) for k, v in returns.loc[date].items()}
+        expected = legacy_scores(deltas, basis[date], 160.0)
+        assert (row["growth"], row["fear"], row["tight"]) == expected
+        assert row["verdict"] == legacy_verdict(*expected)
+
+
+def test_score_arrays_broadcast_scalar_cip():
+    g, f, t = score_arrays([1.0, -1.0], [1.0, -1.0], 0.0, 0.0, 0.0, -250.0, 0.0)
+    assert list(g) == [2, 0] and list(f) == [0, 1] and list(t) == [3, 3]
+
+
+# ── LTTB ─────────────────────────────────────────────────────────────────────
+def test_lttb_keeps_endpoints_and_order():
+    rng = np.random.default_rng(1)
+    x = np.arange(5000, dtype=float)
+    y = rng.normal(size=5000).cumsum()
+    idx = lttb_indices(x, y, 300)
+    assert len(idx) == 300
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_downsample_keeps_short_series_and_endpoints():
+    s = pd.Series(np.sin(np.arange(1000) / 20), index=pd.date_range("2020-01-01", periods=1000))
+    assert downsample(s.iloc[:50], 100).equals(s.iloc[:50])
+    d = downsample(s, 100)
+    assert len(d) == 100
+    assert d.index[0] == s.index[0] and d.index[-1] == s.index[-1]
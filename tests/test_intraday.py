@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from intraday import IntradayStream, RingBuffer
+from providers import MarketDataProvider
+
+
+class ScriptedProvider(MarketDataProvider):
+    """history 호출마다 미리 정해 둔 Series 를 차례로 반환 (start 이후만)"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def history(self, symbol, timeout, period=None, start=None, interval="1d"):
+        self.calls.append(start)
+        s = self.responses.pop(0)
+        return s[s.index >= pd.Timestamp(start)] if start is not None else s
+
+
+def bars(*pairs):
+    return pd.Series([v for _, v in pairs], index=pd.DatetimeIndex([t for t, _ in pairs]))
+
+
+def test_ring_buffer_wraps_in_time_order():
+    buf = RingBuffer(capacity=3)
+    times = pd.date_range("2024-01-02 09:30", periods=5, freq="min")
+    for i, t in enumerate(times):
+        buf.push(np.datetime64(t), float(i))
+    s = buf.series()
+    assert len(buf) == 3
+    assert list(s.index) == list(times[-3:])
+    assert list(s) == [2.0, 3.0, 4.0]
+    assert buf.last_value == 4.0
+
+
+def test_ring_buffer_partial_fill_and_set_last():
+    buf = RingBuffer(capacity=4)
+    assert len(buf) == 0 and buf.last_time is None and buf.last_value is None
+    assert buf.series().empty
+
+    times = pd.date_range("2024-01-02 09:30", periods=2, freq="min")
+    for i, t in enumerate(times):
+        buf.push(np.datetime64(t), float(i))
+    buf.set_last(9.0)   # 진행 중인 봉만 수정
+    assert list(buf.series()) == [0.0, 9.0]
+    assert buf.last_time == np.datetime64(times[-1])
+
+
+def test_forming_bar_is_updated_in_place():
+    day0 = bars(("2024-01-02 15:59", 100.0))
+    first = bars(("2024-01-02 15:59", 100.0), ("2024-01-03 09:30", 101.0), ("2024-01-03 09:31", 101.5))
+    # 09:31 봉이 확정되며 종가가 103 으로 바뀌고 09:32 봉이 새로 생김
+    second = bars(("2024-01-03 09:31", 103.0), ("2024-01-03 09:32", 102.0))
+    provider = ScriptedProvider([pd.concat([day0, first.iloc[1:]]), second])
+    stream = IntradayStream("1m", {"X": "X"}, provider=provider)
+
+    assert stream.poll() == {"X": 3}
+    assert stream.delta_of("X") == (101.5 / 100.0 - 1) * 100
+    version = stream.version
+
+    assert stream.poll() == {"X": 2}   # 09:31 값 수정 + 09:32 추가
+    assert provider.calls[-1] == pd.Timestamp("2024-01-03 09:31")
+    s = stream.series("X")
+    assert list(s) == [101.0, 103.0, 102.0]
+    assert stream.version == version + 1
+
+
+def test_unchanged_forming_bar_does_not_bump_version():
+    s = bars(("2024-01-02 15:59", 100.0), ("2024-01-03 09:30", 101.0))
+    provider = ScriptedProvider([s, s])
+    stream = IntradayStream("1m", {"X": "X"}, provider=provider)
+    stream.poll()
+    version = stream.version
+    assert stream.poll() == {"X": 0}
+    assert stream.version == version
+
+
+def test_previous_close_uses_final_value_of_last_bar():
+    # 전일 마지막 봉이 형성 중일 때 받은 값이 아니라 확정 종가가 기준값
+    provider = ScriptedProvider([
+        bars(("2024-01-02 15:58", 99.0), ("2024-01-02 15:59", 99.5)),
+        bars(("2024-01-02 15:59", 100.0), ("2024-01-03 09:30", 105.0)),
+    ])
+    stream = IntradayStream("1m", {"X": "X"}, provider=provider)
+    stream.poll()
+    stream.poll()
+    assert stream.delta_of("X") == (105.0 / 100.0 - 1) * 100
+    assert list(stream.session_returns()["X"]) == [(105.0 / 100.0 - 1) * 100]
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from analysis import build_market_frame
+
+
+def test_deltas_use_each_series_own_last_bars():
+    days = pd.bdate_range("2024-01-01", periods=5)
+    spx = pd.Series([1.0, 2.0, 3.0, 4.0, 5.0], index=days)
+    # DXY 는 SPX 마지막 거래일 이후(아시아 장)에 새 봉이 있음
+    dxy = pd.Series([100.0, 101.0, 102.0, 103.0, 103.0, 110.0],
+                    index=days.append(pd.DatetimeIndex([days[-1] + pd.Timedelta(days=3)])))
+    frame = build_market_frame({"SPX": spx, "DXY": dxy})
+
+    assert frame.last_of("DXY") == 110.0
+    assert frame.prev_of("DXY") == 103.0
+    assert np.isclose(frame.delta_of("DXY"), (110.0 / 103.0 - 1) * 100)
+    assert np.isclose(frame.delta_of("SPX"), 25.0)
+    assert frame.as_of == dxy.index[-1]
+    # 수익률 행렬은 기준 종목 거래일에 정렬된 그대로
+    assert list(frame.returns().index) == list(days)
+
+
+def test_returns_match_as_of_aligned_pct_change():
+    days = pd.bdate_range("2024-01-01", periods=30)
+    rng = np.random.default_rng(0)
+    spx = pd.Series(100 + rng.normal(size=30).cumsum(), index=days)
+    krw = pd.Series(1300 + rng.normal(size=25).cumsum(), index=days[::-1][:25][::-1] + pd.Timedelta(hours=1))
+    frame = build_market_frame({"SPX": spx, "KRW": krw})
+    expected = pd.DataFrame({"SPX": spx, "KRW": krw.reindex(days, method="ffill")}).pct_change(fill_method=None) * 100
+    np.testing.assert_allclose(frame.returns(["SPX", "KRW"]).to_numpy(), expected.to_numpy(), equal_nan=True)
+
+
+def test_empty_frame():
+    frame = build_market_frame({})
+    assert frame.as_of is None
+    assert frame.deltas() == {}
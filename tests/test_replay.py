@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+from benchmark import synthetic_prices, write_fixtures
+from market_data import TICKERS, TickerCache, fetch_prices
+from price_store import PriceStore
+from providers import ReplayProvider
+
+
+def replay_provider(tmp_path, days=300):
+    data = synthetic_prices(days=days, end=pd.Timestamp("2024-06-28"))
+    return data, ReplayProvider(write_fixtures(data, tmp_path / "fx"))
+
+
+def test_fetch_prices_replays_fixtures_offline(tmp_path):
+    data, provider = replay_provider(tmp_path)
+    got, timings = fetch_prices("3mo", provider=provider, cache=TickerCache(), retries=0)
+
+    assert set(got) == set(TICKERS) == set(timings)
+    for name, s in got.items():
+        expected = data[name][data[name].index >= pd.Timestamp("2024-03-28")]
+        np.testing.assert_allclose(s.to_numpy(), expected.to_numpy())
+        assert s.index.equals(expected.index)
+
+
+def test_store_backed_fetch_matches_direct_fetch(tmp_path):
+    _, provider = replay_provider(tmp_path)
+    store = PriceStore(tmp_path / "prices")
+    direct, _ = fetch_prices("1y", provider=provider, cache=TickerCache(), retries=0)
+    for _ in range(2):   # 두 번째는 저장된 이력 뒤의 봉만 받아 이어 붙임
+        stored, _ = fetch_prices("1y", provider=provider, store=store, cache=TickerCache(), retries=0)
+    for name in TICKERS:
+        pd.testing.assert_series_equal(stored[name], direct[name], check_names=False, check_freq=False)
+
+
+def test_replayed_prices_drive_the_same_verdicts(tmp_path):
+    _, provider = replay_provider(tmp_path)
+    got, _ = fetch_prices("1y", provider=provider, cache=TickerCache(), retries=0)
+    frame = analysis.build_market_frame(got)
+    timeline = analysis.verdict_timeline(frame.returns(analysis.SCORE_KEYS), basis=-60.0, friction=200.0)
+
+    today = analysis.decide_verdict(*analysis.compute_scores(frame.deltas(), -60.0, 200.0))
+    assert frame.as_of == pd.Timestamp("2024-06-28")
+    assert timeline.index[-1] == frame.as_of
+    assert timeline["verdict"].iloc[-1] == today
+    assert set(timeline["verdict"]) <= set(analysis.VERDICTS)
@@ -0,0 +1,183 @@
+"""
+판정 이력 저장소
+Verdict and score snapshot history (SQLite)
+
+백그라운드 갱신 스레드가 스냅샷을 게시할 때마다 탭3과 같은 규칙으로 계산한 점수(성장·공포·경색),
+입력값(일간 변화율, 베이시스, 마찰계수)과 종합 판정을 <DATA_DIR>/verdicts.sqlite 에 한 행씩 추가합니다.
+결과가 직전 기록과 같으면 HISTORY_SECONDS 가 지날 때만 한 행을 더 남기므로 값이 바뀐 시점은 모두 남고
+변화가 없는 구간은 일정 간격으로만 기록됩니다.
+
+조회는 기간을 max_points 개 구간으로 나눠 구간마다 마지막 행과 판정이 바뀐 행만 SQL 에서 골라오므로
+몇 달치 1~5분 간격 기록도 차트에 바로 그릴 수 있습니다.
+
+실행 방법:
+    python verdict_history.py --days 30 --points 20     # 최근 30일 이력 요약
+"""
+
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from analysis import SCORE_KEYS, compute_cip, compute_scores, decide_verdict
+from metrics import METRICS
+from price_store import DATA_DIR
+
+VERDICT_DB      = DATA_DIR / "verdicts.sqlite"
+HISTORY_SECONDS = 300    # 결과가 그대로여도 이 간격마다 한 행 (기록이 끊긴 구간 = 대시보드가 멈춘 구간)
+MAX_POINTS      = 600    # 조회 기본 점 수
+
+COLUMNS = ("ts", "as_of", "fingerprint", *SCORE_KEYS, "basis", "friction", "cip_source",
+           "growth", "fear", "tight", "verdict", "changed")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS verdicts (
+    ts          REAL    NOT NULL,   -- 기록 시각 (epoch 초)
+    as_of       TEXT,               -- 스냅샷 마지막 봉 날짜
+    fingerprint TEXT,               -- 스냅샷 데이터 해시
+    {", ".join(f"{k} REAL" for k in SCORE_KEYS)},   -- 일간 변화율 (%) — 없으면 NULL
+    basis       REAL, friction REAL,
+    cip_source  TEXT,               -- quote(호가 이력 최신값) | default(기본값)
+    growth      INTEGER, fear INTEGER, tight INTEGER,
+    verdict     TEXT    NOT NULL,
+    changed     INTEGER NOT NULL    -- 직전 기록과 판정이 다르면 1
+);
+CREATE INDEX IF NOT EXISTS verdicts_ts ON verdicts (ts);
+"""
+
+
+def _epoch(t) -> float:
+    # 현지 시각(naive) → epoch 초
+    return pd.Timestamp(t).to_pydatetime().timestamp()
+
+
+def server_cip_inputs(frame, quotes=None) -> tuple:
+    """
+    갱신 스레드용 CIP 입력 (세션 위젯 값이 없으므로) → (compute_cip 인자, 출처).
+    호가 이력에 기록된 기본 만기(없으면 가장 가까운 만기) 최신 호가, 없으면 탭2 기본값과 같은 값.
+    """
+    last = quotes.latest() if quotes is not None else pd.DataFrame()
+    if not last.empty:
+        row = last.iloc[int(np.abs(last["days"].to_numpy() - analysis.DEFAULT_DAYS).argmin())]
+        return tuple(float(row[c]) for c in ("spot", "us_3m", "kr_3m", "days", "swap_bid", "swap_ask")), "quote"
+    irx = frame.last_of("IRX")
+    return (analysis.DEFAULT_SPOT, round(irx, 2) if irx else analysis.DEFAULT_US_3M, analysis.DEFAULT_KR_3M,
+            analysis.DEFAULT_DAYS, analysis.DEFAULT_SWAP_BID, analysis.DEFAULT_SWAP_ASK), "default"
+
+
+class VerdictHistory:
+    def __init__(self, path=None, quotes=None, heartbeat: float = HISTORY_SECONDS):
+        """quotes: QuoteStore — 있으면 최신 호가로 베이시스·마찰계수 계산"""
+        self.path = Path(path) if path else VERDICT_DB
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.quotes    = quotes
+        self.heartbeat = heartbeat
+        self._lock     = threading.Lock()
+        self._last     = None          # 직전 기록 행 (ts 제외 비교용)
+        self._last_ts  = 0.0
+        self.version   = 0             # 추가할 때마다 증가 (화면 캐시 키)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            last = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM verdicts ORDER BY rowid DESC LIMIT 1").fetchone()
+        if last:
+            self._last, self._last_ts = last[1:-1], last[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    # ── 기록 ───────────────────────────────────────────────────────────────
+    def evaluate(self, frame) -> tuple:
+        """스냅샷 행렬 → 기록할 행 (ts·fingerprint·changed 제외). 탭3 판정과 같은 compute_scores / decide_verdict"""
+        cip_inputs, source = server_cip_inputs(frame, self.quotes)
+        cip = compute_cip(*cip_inputs)
+        deltas = frame.deltas(SCORE_KEYS)
+        g, f, t = compute_scores(deltas, cip.basis, cip.friction)
+        as_of = f"{frame.as_of:%Y-%m-%d}" if frame.as_of is not None else None
+        return (as_of, None, *(deltas[k] for k in SCORE_KEYS), round(float(cip.basis), 4),
+                round(float(cip.friction), 4), source, int(g), int(f), int(t), decide_verdict(g, f, t))
+
+    def on_snapshot(self, snapshot) -> bool:
+        """MarketRefresher 구독 콜백 — 결과가 바뀌었거나 heartbeat 가 지났으면 한 행 추가"""
+        if not len(snapshot.frame.index):
+            return False
+        with METRICS.timer("dq_compute_seconds", stage="verdict_history"):
+            row = list(self.evaluate(snapshot.frame))
+        row[1] = snapshot.fingerprint
+        return self.record(tuple(row))
+
+    def record(self, row: tuple, ts: float = None) -> bool:
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            same = self._last is not None and self._last[:1] + self._last[2:] == row[:1] + row[2:]
+            if same and ts - self._last_ts < self.heartbeat:
+                return False
+            changed = int(self._last is None or self._last[-1] != row[-1])
+            with closing(self._connect()) as conn, conn:
+                conn.execute(f"INSERT INTO verdicts VALUES ({','.join('?' * len(COLUMNS))})", (ts, *row, changed))
+            self._last, self._last_ts = row, ts
+            self.version += 1
+        return True
+
+    # ── 조회 ───────────────────────────────────────────────────────────────
+    def history(self, start=None, end=None, max_points: Optional[int] = MAX_POINTS) -> pd.DataFrame:
+        """
+        [start, end] 기간의 기록 (index: 기록 시각). max_points 가 있으면 기간을 그만큼의 시간 구간으로 나눠
+        구간마다 마지막 행 + 판정이 바뀐 행만 반환 (판정 전환 시점은 다운샘플링해도 빠지지 않음)
+        """
+        lo = _epoch(start) if start is not None else 0.0
+        hi = _epoch(end) if end is not None else time.time() + 1
+        cols = ", ".join(COLUMNS)
+        with closing(self._connect()) as conn:
+            if max_points:
+                first, last, n = conn.execute("SELECT MIN(ts), MAX(ts), COUNT(*) FROM verdicts "
+                                              "WHERE ts BETWEEN ? AND ?", (lo, hi)).fetchone()
+            if max_points and n > max_points:
+                width = (last - first) / max_points or 1.0
+                sql = (f"SELECT {cols} FROM verdicts WHERE ts BETWEEN ? AND ? AND (changed = 1 OR rowid IN "
+                       f"(SELECT MAX(rowid) FROM verdicts WHERE ts BETWEEN ? AND ? "
+                       f"GROUP BY CAST((ts - ?) / ? AS INTEGER))) ORDER BY ts")
+                rows = conn.execute(sql, (lo, hi, lo, hi, first, width)).fetchall()
+            else:
+                rows = conn.execute(f"SELECT {cols} FROM verdicts WHERE ts BETWEEN ? AND ? ORDER BY ts",
+                                    (lo, hi)).fetchall()
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df["ts"] = pd.DatetimeIndex([datetime.fromtimestamp(t) for t in df["ts"]])   # 다른 저장소처럼 현지 시각
+        return df.set_index("ts")
+
+    def count(self, start=None) -> int:
+        lo = _epoch(start) if start is not None else 0.0
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM verdicts WHERE ts >= ?", (lo,)).fetchone()[0]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="판정 이력 조회")
+    parser.add_argument("--days", type=float, default=30, help="최근 며칠")
+    parser.add_argument("--points", type=int, default=MAX_POINTS, help="최대 점 수 (0 = 전체)")
+    args = parser.parse_args(argv)
+
+    if not VERDICT_DB.exists():
+        print(f"❌ 기록 없음: {VERDICT_DB}", file=sys.stderr)
+        return 1
+    hist = VerdictHistory()
+    start = pd.Timestamp.now() - pd.Timedelta(days=args.days)
+    df = hist.history(start=start, max_points=args.points or None)
+    print(f"{hist.count(start):,}건 중 {len(df):,}건 · 판정 전환 {int(df['changed'].sum())}회")
+    with pd.option_context("display.width", 160):
+        print(df[["as_of", *SCORE_KEYS, "basis", "friction", "growth", "fear", "tight", "verdict"]]
+              .tail(20).to_string(float_format="{:,.2f}".format))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())